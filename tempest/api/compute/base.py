@@ -610,7 +610,8 @@ class BaseV2ComputeTest(api_version_utils.BaseMicroversionTest,
             msg = ('server flavor is not same as flavor!')
             self.assertEqual(flavor_id, server_flavor['id'], msg)
         else:
-            flavor = self.flavors_client.show_flavor(flavor_id)['flavor']
+            flavor = self.flavors_client.show_flavor(
+                flavor_id, cache=True)['flavor']
             self.assertEqual(flavor['name'], server_flavor['original_name'],
                              "original_name in server flavor is not same as "
                              "flavor name!")
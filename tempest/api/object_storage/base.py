@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
 import time
 
 from tempest.common import custom_matchers
@@ -49,9 +50,14 @@ def delete_containers(containers, container_client, object_client):
             params = {'limit': 9999, 'format': 'json'}
             _, objlist = container_client.list_container_objects(cont, params)
             # delete every object in the container
-            for obj in objlist:
-                test_utils.call_and_ignore_notfound_exc(
-                    object_client.delete_object, cont, obj['name'])
+            results = object_client.map_requests(
+                [functools.partial(test_utils.call_and_ignore_notfound_exc,
+                                   object_client.delete_object, cont,
+                                   obj['name'])
+                 for obj in objlist])
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
             # sleep 2 seconds to sync the deletion of the objects
             # in HA deployment
             time.sleep(2)
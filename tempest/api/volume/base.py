@@ -121,7 +121,8 @@ class BaseVolumeTest(api_version_utils.BaseMicroversionTest,
             kwargs['size'] = CONF.volume.volume_size
 
         if 'imageRef' in kwargs:
-            image = cls.images_client.show_image(kwargs['imageRef'])
+            image = cls.images_client.show_image(kwargs['imageRef'],
+                                                 cache=True)
             min_disk = image['min_disk']
             kwargs['size'] = max(kwargs['size'], min_disk)
 
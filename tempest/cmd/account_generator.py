@@ -87,6 +87,18 @@ Optional Arguments
   a different tenant. This is required to provide isolation between test for
   running in parallel.
 
+* ``-w, --workers WORKERS`` (Optional) Number of concurrent groups of
+  accounts provisioned in parallel (default: 1). Creating the users, projects
+  and network resources of a group takes several API calls, provisioning a
+  few groups at once speeds up the generation of large accounts files.
+
+* ``--resume`` (Optional) Keeps the accounts already listed in the accounts
+  file and only creates the ones missing to reach the requested concurrency.
+  Without it, the existing file is replaced. In both cases it is first backed
+  up as ``accounts_file.yaml.bak``. If the generation fails, the accounts
+  created so far are still written to the file, so that running the command
+  again with ``--resume`` completes it.
+
 * ``--with-admin`` (Optional) Creates admin for each concurrent group
   (default: False).
 
@@ -97,7 +109,8 @@ To see help on specific argument, please do: ``tempest account-generator
 [OPTIONS] <accounts_file.yaml> -h``.
 """
 
-import argparse
+import collections
+from concurrent import futures
 import os
 import traceback
 
@@ -105,6 +118,7 @@ from cliff import command
 from oslo_log import log as logging
 import yaml
 
+from tempest.cmd import utils as cmd_utils
 from tempest.common import credentials_factory
 from tempest import config
 from tempest.lib.common import dynamic_creds
@@ -151,7 +165,7 @@ def get_credential_provider(opts):
             identity_version, admin_creds=admin_creds))
 
 
-def generate_resources(cred_provider, admin):
+def get_resources_spec(admin):
     # Create the list of resources to be provisioned for each process
     # NOTE(andreaf) get_credentials expects a string for types or a list for
     # roles. Adding all required inputs to the spec list.
@@ -161,6 +175,12 @@ def generate_resources(cred_provider, admin):
         spec.append([CONF.object_storage.reseller_admin_role])
     if admin:
         spec.append('admin')
+    return spec
+
+
+def generate_resources(cred_provider, admin, spec=None):
+    if spec is None:
+        spec = get_resources_spec(admin)
     resources = []
     for cred_type in spec:
         resources.append((cred_type, cred_provider.get_credentials(
@@ -168,8 +188,86 @@ def generate_resources(cred_provider, admin):
     return resources
 
 
-def dump_accounts(resources, identity_version, account_file):
-    accounts = []
+def _spec_kind(cred_type):
+    # primary and alt credentials are interchangeable plain accounts
+    if cred_type in ['primary', 'alt']:
+        return ()
+    if cred_type == 'admin':
+        return ('admin',)
+    return tuple(sorted(cred_type))
+
+
+def _account_kind(account):
+    if 'admin' in account.get('types', []):
+        return ('admin',)
+    return tuple(sorted(account.get('roles', [])))
+
+
+def get_missing_specs(accounts, spec, concurrency):
+    """Return the spec of the credentials missing in each concurrent group
+
+    :param accounts: the accounts already available, as listed in an
+                     accounts file
+    :param spec: the credentials of a concurrent group, as returned by
+                 `get_resources_spec`
+    :param int concurrency: the number of concurrent groups
+    :return: one list per concurrent group with missing credentials, with
+             the spec of the credentials to create for it
+    """
+    available = collections.Counter(
+        _account_kind(account) for account in accounts)
+    missing_specs = []
+    for count in range(concurrency):
+        missing = []
+        for cred_type in spec:
+            kind = _spec_kind(cred_type)
+            if available[kind] > 0:
+                available[kind] -= 1
+            else:
+                missing.append(cred_type)
+        if missing:
+            missing_specs.append(missing)
+    return missing_specs
+
+
+def load_accounts(account_file):
+    """Return the accounts listed in account_file, if it exists"""
+    if not os.path.exists(account_file):
+        return []
+    with open(account_file) as f:
+        return yaml.safe_load(f) or []
+
+
+def provision_resources(opts, specs):
+    """Create the credentials of each spec, opts.workers at a time
+
+    Each spec is provisioned with its own credential provider, so that
+    they get different sets of credentials.
+
+    :return: a tuple with the (cred_type, credentials) created, in the
+             order of the specs, and the first error raised, or None
+    """
+    def _provision(spec):
+        return generate_resources(get_credential_provider(opts), opts.admin,
+                                  spec=spec)
+
+    resources = []
+    error = None
+    with futures.ThreadPoolExecutor(max_workers=opts.workers) as executor:
+        pending = [executor.submit(_provision, spec) for spec in specs]
+        for future in pending:
+            try:
+                resources.extend(future.result())
+            except Exception as e:
+                LOG.error('Failed to provision a group of accounts: %s', e)
+                if error is None:
+                    error = e
+    return resources, error
+
+
+def dump_accounts(resources, identity_version, account_file,
+                  existing_accounts=None):
+    accounts = list(existing_accounts or [])
     for resource in resources:
         cred_type, test_resource = resource
         account = {
@@ -200,14 +298,6 @@ def dump_accounts(resources, identity_version, account_file):
     LOG.info('%s generated successfully!', account_file)
 
 
-def positive_int(number):
-    number = int(number)
-    if number <= 0:
-        raise argparse.ArgumentTypeError("Concurrency value should be a "
-                                         "positive number")
-    return number
-
-
 def _parser_add_args(parser):
     parser.add_argument('-c', '--config-file',
                         metavar='/etc/tempest.conf',
@@ -237,10 +327,22 @@ def _parser_add_args(parser):
                         help='Resources tag')
     parser.add_argument('-r', '--concurrency',
                         default=1,
-                        type=positive_int,
+                        type=cmd_utils.positive_int,
                         required=False,
                         dest='concurrency',
                         help='Concurrency count')
+    parser.add_argument('-w', '--workers',
+                        default=1,
+                        type=cmd_utils.positive_int,
+                        required=False,
+                        dest='workers',
+                        help='Number of concurrent groups of accounts '
+                             'provisioned in parallel')
+    parser.add_argument('--resume',
+                        action='store_true',
+                        dest='resume',
+                        help='Keep the accounts of the existing accounts '
+                             'file and only create the missing ones')
     parser.add_argument('--with-admin',
                         action='store_true',
                         dest='admin',
@@ -269,15 +371,22 @@ class TempestAccountGenerator(command.Command):
             if parsed_args.config_file:
                 config.CONF.set_config_path(parsed_args.config_file)
             setup_logging()
-            resources = []
-            for count in range(parsed_args.concurrency):
-                # Use N different cred_providers to obtain different
-                # sets of creds
-                cred_provider = get_credential_provider(parsed_args)
-                resources.extend(generate_resources(cred_provider,
-                                                    parsed_args.admin))
+            existing_accounts = []
+            if parsed_args.resume:
+                existing_accounts = load_accounts(parsed_args.accounts)
+            specs = get_missing_specs(existing_accounts,
+                                      get_resources_spec(parsed_args.admin),
+                                      parsed_args.concurrency)
+            LOG.info('Creating %d groups of accounts, %d at a time',
+                     len(specs), parsed_args.workers)
+            resources, error = provision_resources(parsed_args, specs)
+            # Keep the accounts created before a failure, so that they are
+            # not lost when running again with --resume
             dump_accounts(resources, parsed_args.identity_version,
-                          parsed_args.accounts)
+                          parsed_args.accounts,
+                          existing_accounts=existing_accounts)
+            if error is not None:
+                raise error
 
         except Exception:
             LOG.exception("Failure generating test accounts.")
@@ -60,6 +60,11 @@ Runtime Arguments
   parameters), running it again with ``--dry-run`` should yield an empty
   report.
 
+* ``--concurrency CONCURRENCY``: Number of projects cleaned up at the same
+  time, 1 by default. The resources of each project are still cleaned up in
+  the same order, which makes it safe to clean up many leaked projects in
+  parallel. Global objects are cleaned up once all the projects are done.
+
 * ``--help``: Print the help text for the command and parameters.
 
 .. [1] The ``_projects_to_clean`` dictionary in ``dry_run.json`` lists the
@@ -80,7 +85,9 @@ Runtime Arguments
     complicated logic.
 
 """
+from concurrent import futures
 import sys
+import threading
 import traceback
 
 from cliff import command
@@ -89,6 +96,7 @@ from oslo_serialization import jsonutils as json
 
 from tempest import clients
 from tempest.cmd import cleanup_service
+from tempest.cmd import utils as cmd_utils
 from tempest.common import credentials_factory as credentials
 from tempest.common import identity
 from tempest import config
@@ -135,6 +143,9 @@ class TempestCleanup(command.Command):
 
         cleanup_service.init_conf()
         self.options = parsed_args
+        # Protects dry_run_data and GOT_EXCEPTIONS while projects are cleaned
+        # up concurrently
+        self._lock = threading.Lock()
         self.admin_mgr = clients.Manager(
             credentials.get_configured_admin_credentials())
         self.dry_run_data = {}
@@ -179,9 +190,7 @@ class TempestCleanup(command.Command):
         projects = project_service.list()
         LOG.info("Processing %s projects", len(projects))
 
-        # Loop through list of projects and clean them up.
-        for project in projects:
-            self._clean_project(project)
+        self._clean_projects(projects)
 
         kwargs = {'data': self.dry_run_data,
                   'is_dry_run': is_dry_run,
@@ -204,28 +213,58 @@ class TempestCleanup(command.Command):
                 f.write(json.dumps(self.dry_run_data, sort_keys=True,
                                    indent=2, separators=(',', ': ')))
 
+    def _clean_projects(self, projects):
+        concurrency = self.options.concurrency
+        if concurrency <= 1 or len(projects) <= 1:
+            for project in projects:
+                self._clean_project(project)
+            return
+
+        LOG.info("Cleaning up %s projects at a time", concurrency)
+        with futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+            pending = [executor.submit(self._clean_project, project)
+                       for project in projects]
+            for future in pending:
+                try:
+                    future.result()
+                except Exception:
+                    # Stop as the serial cleanup would, without starting the
+                    # projects not picked up by a worker yet
+                    for other in pending:
+                        other.cancel()
+                    raise
+
     def _clean_project(self, project):
         LOG.debug("Cleaning project:  %s ", project['name'])
         is_dry_run = self.options.dry_run
-        dry_run_data = self.dry_run_data
         is_preserve = not self.options.delete_tempest_conf_objects
         project_id = project['id']
         project_name = project['name']
         project_data = None
         if is_dry_run:
-            project_data = dry_run_data["_projects_to_clean"][project_id] = {}
-            project_data['name'] = project_name
-
+            project_data = {'name': project_name}
+            with self._lock:
+                self.dry_run_data["_projects_to_clean"][project_id] = (
+                    project_data)
+
+        # The services of this project only report to this list, which is
+        # merged once they are done, as other projects may be cleaned up
+        # at the same time
+        got_exceptions = []
         kwargs = {'data': project_data,
                   'is_dry_run': is_dry_run,
                   'saved_state_json': self.json_data,
                   'is_preserve': is_preserve,
                   'is_save_state': False,
                   'project_id': project_id,
-                  'got_exceptions': self.GOT_EXCEPTIONS}
-        for service in self.project_associated_services:
-            svc = service(self.admin_mgr, **kwargs)
-            svc.run()
+                  'got_exceptions': got_exceptions}
+        try:
+            for service in self.project_associated_services:
+                svc = service(self.admin_mgr, **kwargs)
+                svc.run()
+        finally:
+            with self._lock:
+                self.GOT_EXCEPTIONS.extend(got_exceptions)
 
     def _init_admin_ids(self):
         pr_cl = self.admin_mgr.projects_client
@@ -269,6 +308,10 @@ class TempestCleanup(command.Command):
                             help="Generate JSON file:" + DRY_RUN_JSON +
                             ", that reports the objects that would have "
                             "been deleted had a full cleanup been run.")
+        parser.add_argument('--concurrency', type=cmd_utils.positive_int,
+                            dest='concurrency', default=1,
+                            help="Number of projects cleaned up at the same "
+                            "time. Defaults to 1.")
         return parser
 
     def get_description(self):
@@ -12,6 +12,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
+
 from oslo_log import log as logging
 from six.moves.urllib import parse as urllib
 
@@ -114,6 +116,23 @@ class BaseService(object):
         return [item for item in item_list
                 if item['tenant_id'] == self.tenant_id]
 
+    def _delete_all(self, delete, resource_ids, resource_name):
+        """Delete resources concurrently with the client of the service
+
+        :param delete: the client method deleting a resource by ID
+        :param resource_ids: the IDs of the resources to delete
+        :param resource_name: the name of the resources in the logs
+        """
+        for resource_id in resource_ids:
+            LOG.debug("Deleting %s with id %s", resource_name, resource_id)
+        results = self.client.map_requests(
+            [functools.partial(delete, resource_id)
+             for resource_id in resource_ids])
+        for resource_id, result in zip(resource_ids, results):
+            if isinstance(result, Exception):
+                LOG.exception("Delete %s %s exception.", resource_name,
+                              resource_id, exc_info=result)
+
     def list(self):
         pass
 
@@ -164,13 +183,8 @@ class SnapshotService(BaseService):
 
     def delete(self):
         snaps = self.list()
-        client = self.client
-        for snap in snaps:
-            try:
-                LOG.debug("Deleting Snapshot with id %s", snap['id'])
-                client.delete_snapshot(snap['id'])
-            except Exception:
-                LOG.exception("Delete Snapshot %s exception.", snap['id'])
+        self._delete_all(self.client.delete_snapshot,
+                         [snap['id'] for snap in snaps], 'Snapshot')
 
     def dry_run(self):
         snaps = self.list()
@@ -201,14 +215,9 @@ class ServerService(BaseService):
         return servers
 
     def delete(self):
-        client = self.client
         servers = self.list()
-        for server in servers:
-            try:
-                LOG.debug("Deleting Server with id %s", server['id'])
-                client.delete_server(server['id'])
-            except Exception:
-                LOG.exception("Delete Server %s exception.", server['id'])
+        self._delete_all(self.client.delete_server,
+                         [server['id'] for server in servers], 'Server')
 
     def dry_run(self):
         servers = self.list()
@@ -309,14 +318,9 @@ class VolumeService(BaseService):
         return vols
 
     def delete(self):
-        client = self.client
         vols = self.list()
-        for v in vols:
-            try:
-                LOG.debug("Deleting volume with id %s", v['id'])
-                client.delete_volume(v['id'])
-            except Exception:
-                LOG.exception("Delete Volume %s exception.", v['id'])
+        self._delete_all(self.client.delete_volume,
+                         [v['id'] for v in vols], 'Volume')
 
     def dry_run(self):
         vols = self.list()
@@ -114,6 +114,24 @@ By default tempest run's output to STDOUT will be generated using the
 subunit-trace output filter. But, if you would prefer a subunit v2 stream be
 output to STDOUT use the ``--subunit`` flag
 
+API Metrics
+===========
+The ``--api-metrics`` option takes the path of a file where the count and
+latency of the API requests sent by the tests are written as JSON once the
+run is complete. The requests are aggregated per service, HTTP method, URL
+template and status code, and the APIs where most time was spent are
+printed at the end of the run.
+
+Waiter Timelines
+================
+The ``--waiter-timeline`` option takes the path of a file where the state
+transitions of the servers, volumes and images observed by the waiters are
+written as JSON once the run is complete, with the time each one was
+observed and the number of polls. The transitions recorded during a test are
+also attached to its results in the subunit stream, as a
+``waiter-timeline`` detail. The states where most time was spent across the
+run are printed at the end of it.
+
 Combining Runs
 ==============
 
@@ -125,7 +143,10 @@ the current run's results with the previous runs.
 """
 
 import os
+import shutil
 import sys
+import tempfile
+import time
 
 from cliff import command
 from oslo_serialization import jsonutils as json
@@ -138,6 +159,8 @@ from tempest.cmd import init
 from tempest.cmd import workspace
 from tempest.common import credentials_factory as credentials
 from tempest import config
+from tempest.lib.common import api_metrics
+from tempest.lib.common import waiter_timeline
 
 if six.PY2:
     # Python 2 has not FileNotFoundError exception
@@ -207,6 +230,17 @@ class TempestRun(command.Command):
 
         regex = self._build_regex(parsed_args)
         return_code = 0
+        metrics_dir = None
+        if parsed_args.api_metrics and not parsed_args.list_tests:
+            # The test workers dump their metrics in this directory when
+            # they exit, see tempest.test
+            metrics_dir = tempfile.mkdtemp(prefix='tempest-api-metrics-')
+            os.environ[api_metrics.DUMP_DIR_ENV] = metrics_dir
+        timeline_dir = None
+        if parsed_args.waiter_timeline and not parsed_args.list_tests:
+            # Likewise for the timelines of the waiters
+            timeline_dir = tempfile.mkdtemp(prefix='tempest-waiter-timeline-')
+            os.environ[waiter_timeline.DUMP_DIR_ENV] = timeline_dir
         if parsed_args.list_tests:
             return_code = commands.list_command(
                 filters=regex, whitelist_file=parsed_args.whitelist_file,
@@ -215,6 +249,7 @@ class TempestRun(command.Command):
 
         else:
             serial = not parsed_args.parallel
+            start = time.time()
             return_code = commands.run_command(
                 filters=regex, subunit_out=parsed_args.subunit,
                 serial=serial, concurrency=parsed_args.concurrency,
@@ -223,6 +258,12 @@ class TempestRun(command.Command):
                 black_regex=parsed_args.black_regex,
                 worker_path=parsed_args.worker_file,
                 load_list=parsed_args.load_list, combine=parsed_args.combine)
+            if metrics_dir:
+                self._write_api_metrics(metrics_dir, parsed_args.api_metrics,
+                                        time.time() - start)
+            if timeline_dir:
+                self._write_waiter_timeline(timeline_dir,
+                                            parsed_args.waiter_timeline)
             if return_code > 0:
                 sys.exit(return_code)
         return return_code
@@ -230,6 +271,32 @@ class TempestRun(command.Command):
     def get_description(self):
         return 'Run tempest'
 
+    def _write_api_metrics(self, metrics_dir, path, elapsed):
+        try:
+            metrics = api_metrics.load_dir(metrics_dir)
+        finally:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+            del os.environ[api_metrics.DUMP_DIR_ENV]
+        if not metrics.to_list():
+            print("No API request was recorded")
+            return
+        metrics.dump(path)
+        print("API metrics written to %s" % path)
+        print(metrics.format_summary(elapsed=elapsed))
+
+    def _write_waiter_timeline(self, timeline_dir, path):
+        try:
+            timelines = waiter_timeline.load_dir(timeline_dir)
+        finally:
+            shutil.rmtree(timeline_dir, ignore_errors=True)
+            del os.environ[waiter_timeline.DUMP_DIR_ENV]
+        if not timelines.to_list():
+            print("No waiter timeline was recorded")
+            return
+        timelines.dump(path)
+        print("Waiter timelines written to %s" % path)
+        print(timelines.format_summary())
+
     def _init_state(self):
         print("Initializing saved state.")
         data = {}
@@ -319,6 +386,18 @@ class TempestRun(command.Command):
         # output args
         parser.add_argument("--subunit", action='store_true',
                             help='Enable subunit v2 output')
+        parser.add_argument('--api-metrics', dest='api_metrics',
+                            type=os.path.abspath, default=None,
+                            help='Path of a JSON file where the count and '
+                                 'latency of the API requests sent by the '
+                                 'tests are written')
+        parser.add_argument('--waiter-timeline', dest='waiter_timeline',
+                            type=os.path.abspath, default=None,
+                            help='Path of a JSON file where the state '
+                                 'transitions of the resources observed by '
+                                 'the waiters are written. The transitions '
+                                 'recorded during each test are also '
+                                 'attached to its results.')
         parser.add_argument("--combine", action='store_true',
                             help='Combine the output of this run with the '
                                  "previous run's as a combined stream in the "
@@ -235,44 +235,64 @@ def create_test_server(clients, validatable=False, validation_resources=None,
                 floating_ip=validation_resources['floating_ip']['ip'],
                 server_id=servers[0]['id'])
 
-    if wait_until:
-        for server in servers:
-            try:
+    if wait_until and servers:
+        server = servers[0]
+        try:
+            if len(servers) > 1:
+                # Poll all the servers with a single request per interval
+                waiters.wait_for_servers_status(
+                    clients.servers_client, [s['id'] for s in servers],
+                    wait_until)
+            else:
                 waiters.wait_for_server_status(
                     clients.servers_client, server['id'], wait_until)
 
-                # Multiple validatable servers are not supported for now. Their
-                # creation will fail with the condition above.
-                if CONF.validation.run_validation and validatable:
-                    if CONF.validation.connect_method == 'floating':
-                        _setup_validation_fip()
-
-            except Exception:
-                with excutils.save_and_reraise_exception():
-                    for server in servers:
-                        try:
-                            clients.servers_client.delete_server(
-                                server['id'])
-                        except Exception:
-                            LOG.exception('Deleting server %s failed',
-                                          server['id'])
-                    for server in servers:
-                        # NOTE(artom) If the servers were booted with volumes
-                        # and with delete_on_termination=False we need to wait
-                        # for the servers to go away before proceeding with
-                        # cleanup, otherwise we'll attempt to delete the
-                        # volumes while they're still attached to servers that
-                        # are in the process of being deleted.
-                        try:
-                            waiters.wait_for_server_termination(
-                                clients.servers_client, server['id'])
-                        except Exception:
-                            LOG.exception('Server %s failed to delete in time',
-                                          server['id'])
+            # Multiple validatable servers are not supported for now. Their
+            # creation will fail with the condition above.
+            if CONF.validation.run_validation and validatable:
+                if CONF.validation.connect_method == 'floating':
+                    _setup_validation_fip()
+
+        except Exception:
+            with excutils.save_and_reraise_exception():
+                for server in servers:
+                    try:
+                        clients.servers_client.delete_server(
+                            server['id'])
+                    except Exception:
+                        LOG.exception('Deleting server %s failed',
+                                      server['id'])
+                for server in servers:
+                    # NOTE(artom) If the servers were booted with volumes
+                    # and with delete_on_termination=False we need to wait
+                    # for the servers to go away before proceeding with
+                    # cleanup, otherwise we'll attempt to delete the
+                    # volumes while they're still attached to servers that
+                    # are in the process of being deleted.
+                    try:
+                        waiters.wait_for_server_termination(
+                            clients.servers_client, server['id'])
+                    except Exception:
+                        LOG.exception('Server %s failed to delete in time',
+                                      server['id'])
 
     return body, servers
 
 
+def create_test_server_async(clients, **kwargs):
+    """Create a test server in the background
+
+    `create_test_server` runs with the given parameters in the thread pool
+    of the asynchronous waiters, so that the wait for the wait_until status
+    overlaps with other work of the test. The future can be joined with the
+    ones of other waiters with `waiters.wait_for_futures`.
+
+    :return: a `concurrent.futures.Future` of the tuple returned by
+             `create_test_server`
+    """
+    return waiters.submit(create_test_server, clients, **kwargs)
+
+
 def shelve_server(servers_client, server_id, force_shelve_offload=False):
     """Common wrapper utility to shelve server.
 
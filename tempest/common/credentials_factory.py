@@ -11,6 +11,9 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import atexit
+import threading
+
 from oslo_concurrency import lockutils
 
 from tempest import clients
@@ -87,7 +90,8 @@ def get_dynamic_provider_params(identity_version, admin_creds=None):
         ('create_networks', (CONF.auth.create_isolated_networks and not
                              CONF.network.shared_physical_network)),
         ('resource_prefix', 'tempest'),
-        ('identity_admin_endpoint_type', endpoint_type)
+        ('identity_admin_endpoint_type', endpoint_type),
+        ('teardown_workers', CONF.auth.dynamic_credentials_teardown_workers)
     ]))
 
 
@@ -107,13 +111,48 @@ def get_preprov_provider_params(identity_version):
         ('accounts_lock_dir', lockutils.get_lock_path(CONF)),
         ('test_accounts_file', CONF.auth.test_accounts_file),
         ('object_storage_operator_role', CONF.object_storage.operator_role),
-        ('object_storage_reseller_admin_role', reseller_admin_role)
+        ('object_storage_reseller_admin_role', reseller_admin_role),
+        ('wait_timeout', CONF.auth.test_accounts_wait_timeout)
     ]))
 
 
+# Pools of dynamic credentials, by identity version
+_credential_pools = {}
+_credential_pools_lock = threading.Lock()
+
+
+def get_credential_pool(identity_version):
+    """Return the pool of dynamic credentials of the process
+
+    The pool is created and starts provisioning credentials the first time
+    it is requested. It is stopped at exit, which deletes the credentials
+    never handed out.
+
+    :param identity_version: 'v2' or 'v3'
+    :return: a `DynamicCredentialPool`, or None if
+             ``[auth] dynamic_credentials_pool_size`` is 0
+    """
+    if not CONF.auth.dynamic_credentials_pool_size:
+        return None
+    with _credential_pools_lock:
+        pool = _credential_pools.get(identity_version)
+        if pool is None:
+            provider = dynamic_creds.DynamicCredentialProvider(
+                name='pool', **get_dynamic_provider_params(identity_version))
+            pool = dynamic_creds.DynamicCredentialPool(
+                provider, size=CONF.auth.dynamic_credentials_pool_size,
+                workers=CONF.auth.dynamic_credentials_pool_workers,
+                timeout=CONF.auth.dynamic_credentials_pool_timeout)
+            pool.start()
+            atexit.register(pool.stop)
+            _credential_pools[identity_version] = pool
+    return pool
+
+
 def get_credentials_provider(name, network_resources=None,
                              force_tenant_isolation=False,
-                             identity_version=None):
+                             identity_version=None,
+                             use_credential_pool=False):
     """Return the right implementation of CredentialProvider based on config
 
     This helper returns the right implementation of CredentialProvider based on
@@ -128,6 +167,11 @@ def get_credentials_provider(name, network_resources=None,
                                    regardless of the configuration.
     :param identity_version: Use the specified identity API version, regardless
                              of the configuration. Valid values are 'v2', 'v3'.
+    :param use_credential_pool: Take the primary and alt dynamic credentials
+                                from the pool returned by
+                                `get_credential_pool`, if it is enabled.
+                                Credentials with custom network_resources are
+                                never pooled.
     """
     # If a test requires a new account to work, it can have it via forcing
     # dynamic credentials. A new account will be produced only for that test.
@@ -135,10 +179,15 @@ def get_credentials_provider(name, network_resources=None,
     # the test should be skipped else it would fail.
     identity_version = identity_version or CONF.identity.auth_version
     if CONF.auth.use_dynamic_credentials or force_tenant_isolation:
+        params = get_dynamic_provider_params(identity_version)
+        if use_credential_pool and network_resources is None:
+            pool = get_credential_pool(identity_version)
+            if pool is not None:
+                params['credential_pool'] = pool
         return dynamic_creds.DynamicCredentialProvider(
             name=name,
             network_resources=network_resources,
-            **get_dynamic_provider_params(identity_version))
+            **params)
     else:
         if CONF.auth.test_accounts_file:
             # Most params are not relevant for pre-created accounts
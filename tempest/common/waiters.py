@@ -10,7 +10,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from concurrent import futures
+import functools
 import re
+import threading
 import time
 
 from oslo_log import log as logging
@@ -18,19 +21,29 @@ from oslo_log import log as logging
 from tempest.common import image as common_image
 from tempest import config
 from tempest import exceptions
+from tempest.lib.common import polling
 from tempest.lib.common.utils import test_utils
+from tempest.lib.common import waiter_timeline
 from tempest.lib import exceptions as lib_exc
 from tempest.lib.services.image.v1 import images_client as images_v1_client
 
 CONF = config.CONF
 LOG = logging.getLogger(__name__)
 
+# Maximum number of waiters run at the same time in the background by the
+# *_async variants. The others are queued until a waiter completes.
+ASYNC_MAX_WORKERS = 16
+
+# The futures of the waiters running in the background, by test caller
+_async = {'executor': None, 'lock': threading.Lock(), 'futures': {}}
+
 
 def _get_task_state(body):
     return body.get('OS-EXT-STS:task_state', None)
 
 
 # NOTE(afazekas): This function needs to know a token and a subject.
+@waiter_timeline.recorded
 def wait_for_server_status(client, server_id, status, ready_wait=True,
                            extra_timeout=0, raise_on_error=True):
     """Waits for a server to reach a given status."""
@@ -40,8 +53,10 @@ def wait_for_server_status(client, server_id, status, ready_wait=True,
     body = client.show_server(server_id)['server']
     old_status = server_status = body['status']
     old_task_state = task_state = _get_task_state(body)
+    waiter_timeline.observe('server', server_id, server_status, task_state)
     start_time = int(time.time())
     timeout = client.build_timeout + extra_timeout
+    poller = polling.Poller(client.build_interval, timeout)
     while True:
         # NOTE(afazekas): Now the BUILD status only reached
         # between the UNKNOWN->ACTIVE transition.
@@ -61,10 +76,11 @@ def wait_for_server_status(client, server_id, status, ready_wait=True,
             else:
                 return
 
-        time.sleep(client.build_interval)
+        poller.sleep()
         body = client.show_server(server_id)['server']
         server_status = body['status']
         task_state = _get_task_state(body)
+        waiter_timeline.observe('server', server_id, server_status, task_state)
         if (server_status != old_status) or (task_state != old_task_state):
             LOG.info('State transition "%s" ==> "%s" after %d second wait',
                      '/'.join((old_status, str(old_task_state))),
@@ -98,23 +114,152 @@ def wait_for_server_status(client, server_id, status, ready_wait=True,
         old_task_state = task_state
 
 
+def _server_reached(body, status, ready_wait):
+    server_status = body['status']
+    if status == 'BUILD':
+        return server_status != 'UNKNOWN'
+    if server_status != status:
+        return False
+    return not ready_wait or _get_task_state(body) is None
+
+
+def _list_pages(list_resources, resources_key, params=None):
+    """Lists the resources of all the pages of a listing
+
+    :param list_resources: function taking the query parameters of a page
+                           and returning the response body of its listing
+    :param str resources_key: the key of the resources in the body, e.g.
+                              'servers', also used for the links
+    :param dict params: the query parameters of the first page
+    """
+    params = dict(params or {})
+    resources = []
+    while True:
+        body = list_resources(params)
+        resources.extend(body[resources_key])
+        links = body.get(resources_key + '_links', [])
+        if not body[resources_key] or not any(link.get('rel') == 'next'
+                                              for link in links):
+            return resources
+        params['marker'] = body[resources_key][-1]['id']
+
+
+@waiter_timeline.recorded
+def wait_for_servers_status(client, server_ids, status, ready_wait=True,
+                            raise_on_error=True):
+    """Waits for several servers to reach a given status.
+
+    The servers are polled together with a single list request per interval
+    rather than one request per server, following the pages of the listing.
+    After the first poll, only the servers updated since the previous one
+    are listed, using the ``changes-since`` filter with the last update time
+    the API reported for the servers waited on. A server missing from the
+    first listing or listed as DELETED afterwards raises NotFound, as
+    `wait_for_server_status` does.
+    """
+    waited = frozenset(server_ids)
+    pending = set(waited)
+    servers = {}
+    changes_since = None
+    start_time = int(time.time())
+    poller = polling.Poller(client.build_interval, client.build_timeout)
+    while True:
+        params = {}
+        if changes_since:
+            params['changes-since'] = changes_since
+        listed = _list_pages(
+            lambda page: client.list_servers(detail=True, **page),
+            'servers', params)
+        if not servers:
+            missing = pending - set(body['id'] for body in listed)
+            if missing:
+                raise lib_exc.NotFound('Servers %s not found' %
+                                       ', '.join(sorted(missing)))
+        for body in listed:
+            if body['id'] not in waited:
+                continue
+            if body.get('updated') and (changes_since is None or
+                                        body['updated'] > changes_since):
+                changes_since = body['updated']
+            if body['id'] not in pending:
+                continue
+            old_body = servers.get(body['id'])
+            if old_body and ((old_body['status'], _get_task_state(old_body)) !=
+                             (body['status'], _get_task_state(body))):
+                LOG.info('Server %s state transition "%s" ==> "%s" after %d '
+                         'second wait', body['id'],
+                         '/'.join((old_body['status'],
+                                   str(_get_task_state(old_body)))),
+                         '/'.join((body['status'],
+                                   str(_get_task_state(body)))),
+                         time.time() - start_time)
+            servers[body['id']] = body
+            waiter_timeline.observe('server', body['id'], body['status'],
+                                    _get_task_state(body))
+            if body['status'] == 'DELETED':
+                raise lib_exc.NotFound('Server %s not found' % body['id'])
+            if body['status'] == 'ERROR' and raise_on_error:
+                if 'fault' in body:
+                    raise exceptions.BuildErrorException(
+                        body['fault'], server_id=body['id'])
+                raise exceptions.BuildErrorException(server_id=body['id'])
+            if _server_reached(body, status, ready_wait):
+                pending.discard(body['id'])
+        # The servers left out of a changes-since listing were polled too,
+        # their state did not change
+        for server_id in sorted(pending - set(body['id'] for body in listed)):
+            waiter_timeline.observe('server', server_id,
+                                    servers[server_id]['status'],
+                                    _get_task_state(servers[server_id]))
+
+        if not pending:
+            if ready_wait and status != 'BUILD':
+                # NOTE(afazekas): without state api extension 3 sec usually
+                # enough
+                time.sleep(CONF.compute.ready_wait)
+            return
+
+        if int(time.time()) - start_time >= client.build_timeout:
+            current = ', '.join(
+                '%s (%s/%s)' % (server_id,
+                                servers.get(server_id, {}).get('status'),
+                                _get_task_state(servers.get(server_id, {})))
+                for server_id in sorted(pending))
+            message = ('Servers failed to reach %(status)s status within the '
+                       'required time (%(timeout)s s). Current status: '
+                       '%(current)s.' % {'status': status,
+                                         'timeout': client.build_timeout,
+                                         'current': current})
+            caller = test_utils.find_test_caller()
+            if caller:
+                message = '(%s) %s' % (caller, message)
+            raise lib_exc.TimeoutException(message)
+        poller.sleep()
+
+
+@waiter_timeline.recorded
 def wait_for_server_termination(client, server_id, ignore_error=False):
     """Waits for server to reach termination."""
     try:
         body = client.show_server(server_id)['server']
     except lib_exc.NotFound:
+        waiter_timeline.observe('server', server_id, 'DELETED')
         return
     old_status = body['status']
     old_task_state = _get_task_state(body)
+    waiter_timeline.observe('server', server_id, old_status, old_task_state)
     start_time = int(time.time())
+    poller = polling.Poller(client.build_interval, client.build_timeout)
     while True:
-        time.sleep(client.build_interval)
+        poller.sleep()
         try:
             body = client.show_server(server_id)['server']
         except lib_exc.NotFound:
+            waiter_timeline.observe('server', server_id, 'DELETED')
             return
         server_status = body['status']
         task_state = _get_task_state(body)
+        waiter_timeline.observe('server', server_id, server_status, task_state)
         if (server_status != old_status) or (task_state != old_task_state):
             LOG.info('State transition "%s" ==> "%s" after %d second wait',
                      '/'.join((old_status, str(old_task_state))),
@@ -137,6 +282,7 @@ def wait_for_server_termination(client, server_id, ignore_error=False):
         old_task_state = task_state
 
 
+@waiter_timeline.recorded
 def wait_for_image_status(client, image_id, status):
     """Waits for an image to reach a given status.
 
@@ -157,6 +303,7 @@ def wait_for_image_status(client, image_id, status):
 
     current_status = 'An unknown status'
     start = int(time.time())
+    poller = polling.Poller(client.build_interval, client.build_timeout)
     while int(time.time()) - start < client.build_timeout:
         image = show_image(image_id)
         # Compute image client returns response wrapped in 'image' element
@@ -165,6 +312,7 @@ def wait_for_image_status(client, image_id, status):
             image = image['image']
 
         current_status = image['status']
+        waiter_timeline.observe('image', image_id, current_status)
         if current_status == status:
             return
         if current_status.lower() == 'killed':
@@ -173,7 +321,7 @@ def wait_for_image_status(client, image_id, status):
         if current_status.lower() == 'error':
             raise exceptions.AddImageException(image_id=image_id)
 
-        time.sleep(client.build_interval)
+        poller.sleep()
 
     message = ('Image %(image_id)s failed to reach %(status)s state '
                '(current state %(current_status)s) within the required '
@@ -187,6 +335,7 @@ def wait_for_image_status(client, image_id, status):
     raise lib_exc.TimeoutException(message)
 
 
+@waiter_timeline.recorded
 def wait_for_volume_resource_status(client, resource_id, status):
     """Waits for a volume resource to reach a given status.
 
@@ -199,12 +348,15 @@ def wait_for_volume_resource_status(client, resource_id, status):
         client.resource_type)[-1].replace('-', '_')
     show_resource = getattr(client, 'show_' + resource_name)
     resource_status = show_resource(resource_id)[resource_name]['status']
+    waiter_timeline.observe(resource_name, resource_id, resource_status)
     start = int(time.time())
+    poller = polling.Poller(client.build_interval, client.build_timeout)
 
     while resource_status != status:
-        time.sleep(client.build_interval)
+        poller.sleep()
         resource_status = show_resource(resource_id)[
             '{}'.format(resource_name)]['status']
+        waiter_timeline.observe(resource_name, resource_id, resource_status)
         if resource_status == 'error' and resource_status != status:
             raise exceptions.VolumeResourceBuildErrorException(
                 resource_name=resource_name, resource_id=resource_id)
@@ -223,12 +375,66 @@ def wait_for_volume_resource_status(client, resource_id, status):
              resource_name, resource_id, status, time.time() - start)
 
 
+@waiter_timeline.recorded
+def wait_for_volumes_status(client, volume_ids, status):
+    """Waits for several volumes to reach a given status.
+
+    The volumes are polled together with a single detailed list request per
+    interval rather than one request per volume, following the pages of the
+    listing. A volume missing from the listing raises NotFound, as
+    `wait_for_volume_resource_status` does.
+    """
+    pending = set(volume_ids)
+    statuses = {}
+    start = int(time.time())
+    poller = polling.Poller(client.build_interval, client.build_timeout)
+    while True:
+        listed = _list_pages(
+            lambda page: client.list_volumes(detail=True, params=page or None),
+            'volumes')
+        missing = pending - set(volume['id'] for volume in listed)
+        if missing:
+            raise lib_exc.NotFound('Volumes %s not found' %
+                                   ', '.join(sorted(missing)))
+        for volume in listed:
+            if volume['id'] not in pending:
+                continue
+            volume_status = statuses[volume['id']] = volume['status']
+            waiter_timeline.observe('volume', volume['id'], volume_status)
+            if volume_status == status:
+                pending.discard(volume['id'])
+            elif volume_status == 'error':
+                raise exceptions.VolumeResourceBuildErrorException(
+                    resource_name='volume', resource_id=volume['id'])
+            elif volume_status == 'error_restoring':
+                raise exceptions.VolumeRestoreErrorException(
+                    volume_id=volume['id'])
+            elif volume_status == 'error_extending':
+                raise exceptions.VolumeExtendErrorException(
+                    volume_id=volume['id'])
+        if not pending:
+            LOG.info('Volumes %s reached %s after waiting for %f seconds',
+                     ', '.join(volume_ids), status, time.time() - start)
+            return
+
+        if int(time.time()) - start >= client.build_timeout:
+            current = ', '.join('%s (%s)' % (volume_id,
+                                             statuses.get(volume_id))
+                                for volume_id in sorted(pending))
+            message = ('Volumes failed to reach %s status within the '
+                       'required time (%s s). Current status: %s.' %
+                       (status, client.build_timeout, current))
+            raise lib_exc.TimeoutException(message)
+        poller.sleep()
+
+
 def wait_for_volume_attachment_remove(client, volume_id, attachment_id):
     """Waits for a volume attachment to be removed from a given volume."""
     start = int(time.time())
+    poller = polling.Poller(client.build_interval, client.build_timeout)
     attachments = client.show_volume(volume_id)['volume']['attachments']
     while any(attachment_id == a['attachment_id'] for a in attachments):
-        time.sleep(client.build_interval)
+        poller.sleep()
         if int(time.time()) - start >= client.build_timeout:
             message = ('Failed to remove attachment %s from volume %s '
                        'within the required time (%s s).' %
@@ -245,10 +451,11 @@ def wait_for_volume_migration(client, volume_id, new_host):
     host = body['os-vol-host-attr:host']
     migration_status = body['migration_status']
     start = int(time.time())
+    poller = polling.Poller(client.build_interval, client.build_timeout)
 
     # new_host is hostname@backend while current_host is hostname@backend#type
     while migration_status != 'success' or new_host not in host:
-        time.sleep(client.build_interval)
+        poller.sleep()
         body = client.show_volume(volume_id)['volume']
         host = body['os-vol-host-attr:host']
         migration_status = body['migration_status']
@@ -269,9 +476,10 @@ def wait_for_volume_retype(client, volume_id, new_volume_type):
     body = client.show_volume(volume_id)['volume']
     current_volume_type = body['volume_type']
     start = int(time.time())
+    poller = polling.Poller(client.build_interval, client.build_timeout)
 
     while current_volume_type != new_volume_type:
-        time.sleep(client.build_interval)
+        poller.sleep()
         body = client.show_volume(volume_id)['volume']
         current_volume_type = body['volume_type']
 
@@ -293,6 +501,7 @@ def wait_for_qos_operations(client, qos_id, operation, args=None):
     args = None when operation = 'disassociate-all'
     """
     start_time = int(time.time())
+    poller = polling.Poller(client.build_interval, client.build_timeout)
     while True:
         if operation == 'qos-key-unset':
             body = client.show_qos(qos_id)['qos_specs']
@@ -312,7 +521,7 @@ def wait_for_qos_operations(client, qos_id, operation, args=None):
 
         if int(time.time()) - start_time >= client.build_timeout:
             raise lib_exc.TimeoutException
-        time.sleep(client.build_interval)
+        poller.sleep()
 
 
 def wait_for_interface_status(client, server_id, port_id, status):
@@ -321,9 +530,10 @@ def wait_for_interface_status(client, server_id, port_id, status):
             ['interfaceAttachment'])
     interface_status = body['port_state']
     start = int(time.time())
+    poller = polling.Poller(client.build_interval, client.build_timeout)
 
     while(interface_status != status):
-        time.sleep(client.build_interval)
+        poller.sleep()
         body = (client.show_interface(server_id, port_id)
                 ['interfaceAttachment'])
         interface_status = body['port_state']
@@ -345,9 +555,10 @@ def wait_for_interface_detach(client, server_id, port_id):
     body = client.list_interfaces(server_id)['interfaceAttachments']
     ports = [iface['port_id'] for iface in body]
     start = int(time.time())
+    poller = polling.Poller(client.build_interval, client.build_timeout)
 
     while port_id in ports:
-        time.sleep(client.build_interval)
+        poller.sleep()
         body = client.list_interfaces(server_id)['interfaceAttachments']
         ports = [iface['port_id'] for iface in body]
         if port_id not in ports:
@@ -359,3 +570,135 @@ def wait_for_interface_detach(client, server_id, port_id):
                        'the required time (%s s)' % (port_id, server_id,
                                                      client.build_timeout))
             raise lib_exc.TimeoutException(message)
+
+
+def _get_async_executor():
+    with _async['lock']:
+        if _async['executor'] is None:
+            _async['executor'] = futures.ThreadPoolExecutor(
+                max_workers=ASYNC_MAX_WORKERS,
+                thread_name_prefix='tempest-waiter')
+        return _async['executor']
+
+
+def submit(waiter, *args, **kwargs):
+    """Run a waiter in the background
+
+    The waiter runs unchanged in a thread pool shared by the whole process,
+    so that independent waits overlap. Use `wait_for_futures` to join them::
+
+        server = waiters.wait_for_server_status_async(
+            servers_client, server_id, 'ACTIVE')
+        volume = waiters.wait_for_volume_resource_status_async(
+            volumes_client, volume_id, 'available')
+        waiters.wait_for_futures([server, volume])
+
+    The waiters a test did not join are cancelled or joined by
+    `cancel_futures` when the test ends, see `tempest.test.BaseTestCase`.
+
+    :param waiter: the function to run, usually one of the waiters of this
+                   module
+    :return: a `concurrent.futures.Future` of the result of the waiter
+    """
+    future = _get_async_executor().submit(
+        test_utils.bind_test_caller(waiter), *args, **kwargs)
+    caller = test_utils.find_test_caller()
+    with _async['lock']:
+        _async['futures'].setdefault(caller, set()).add(future)
+    future.add_done_callback(functools.partial(_forget_future, caller))
+    return future
+
+
+def _forget_future(caller, future):
+    with _async['lock']:
+        pending = _async['futures'].get(caller)
+        if pending is not None:
+            pending.discard(future)
+            if not pending:
+                del _async['futures'][caller]
+
+
+def wait_for_futures(fs, timeout=None):
+    """Wait for the waiters run in the background to complete
+
+    All of them are complete when this returns or raises, even if one of
+    them failed, so that none is left running while the test cleans up.
+    The only exception is the timeout: the waiters still running then are
+    left to `cancel_futures`.
+
+    :param fs: the futures returned by `submit` or by the *_async waiters
+    :param float timeout: the maximum number of seconds to wait for them,
+                          no limit by default
+    :return: the list of their results, in the same order
+    :raises: the error raised by the first of them which failed, in order
+    :raises TimeoutException: if some are still running after timeout
+    """
+    not_done = futures.wait(fs, timeout=timeout).not_done
+    if not_done:
+        message = ('%d of the %d waiters run in the background did not '
+                   'complete within %s s' % (len(not_done), len(fs), timeout))
+        caller = test_utils.find_test_caller()
+        if caller:
+            message = '(%s) %s' % (caller, message)
+        raise lib_exc.TimeoutException(message)
+    return [future.result() for future in fs]
+
+
+def cancel_futures(caller, timeout=None):
+    """Stop the waiters a test left running in the background
+
+    The waiters which did not start yet are cancelled, and the running ones
+    are joined: they stop polling when they reach their own timeout at the
+    latest.
+
+    :param str caller: the test caller which submitted them, as returned by
+                       `tempest.lib.common.utils.test_utils.find_test_caller`
+    :param float timeout: the maximum number of seconds to wait for the
+                          running ones, no limit by default
+    """
+    with _async['lock']:
+        fs = list(_async['futures'].get(caller, ()))
+    if not fs:
+        return
+    for future in fs:
+        future.cancel()
+    not_done = futures.wait(fs, timeout=timeout).not_done
+    if not_done:
+        LOG.warning('%d waiters of %s are still running in the background '
+                    'after %s s', len(not_done), caller, timeout)
+
+
+def wait_for_server_status_async(client, server_id, status, **kwargs):
+    """Run `wait_for_server_status` in the background, return a future"""
+    return submit(wait_for_server_status, client, server_id, status,
+                  **kwargs)
+
+
+def wait_for_servers_status_async(client, server_ids, status, **kwargs):
+    """Run `wait_for_servers_status` in the background, return a future"""
+    return submit(wait_for_servers_status, client, server_ids, status,
+                  **kwargs)
+
+
+def wait_for_server_termination_async(client, server_id, **kwargs):
+    """Run `wait_for_server_termination` in the background, return a future"""
+    return submit(wait_for_server_termination, client, server_id, **kwargs)
+
+
+def wait_for_image_status_async(client, image_id, status):
+    """Run `wait_for_image_status` in the background, return a future"""
+    return submit(wait_for_image_status, client, image_id, status)
+
+
+def wait_for_volume_resource_status_async(client, resource_id, status):
+    """Run `wait_for_volume_resource_status` in the background
+
+    :return: a future of its result
+    """
+    return submit(wait_for_volume_resource_status, client, resource_id,
+                  status)
+
+
+def wait_for_volumes_status_async(client, volume_ids, status):
+    """Run `wait_for_volumes_status` in the background, return a future"""
+    return submit(wait_for_volumes_status, client, volume_ids, status)
@@ -21,6 +21,12 @@ from oslo_config import cfg
 from oslo_config import types
 from oslo_log import log as logging
 
+from tempest.lib.common import json_codec
+from tempest.lib.common import polling
+from tempest.lib.common import response_cache
+from tempest.lib.common import retry_policy
+from tempest.lib.common import token_cache
+from tempest.lib.common import token_refresher
 from tempest.lib import exceptions
 from tempest.lib.services import clients
 from tempest.test_discover import plugins
@@ -54,6 +60,16 @@ AuthGroup = [
                     "at least `2 * CONC` distinct accounts configured in "
                     " the `test_accounts_file`, with CONC == the "
                     "number of concurrent test processes."),
+    cfg.IntOpt('test_accounts_wait_timeout',
+               default=0,
+               help="Time in seconds a test class waits for an account of "
+                    "the test_accounts_file to be released when all the "
+                    "matching accounts are in use. The test classes waiting "
+                    "get the accounts in the order they started waiting. 0 "
+                    "by default, which makes the test class fail right away "
+                    "when no account is available. Waiting allows running "
+                    "with a higher concurrency than the number of accounts "
+                    "supports."),
     cfg.BoolOpt('use_dynamic_credentials',
                 default=True,
                 help="Allows test cases to create/destroy projects and "
@@ -93,6 +109,49 @@ AuthGroup = [
                default='Default',
                help="Admin domain name for authentication (Keystone V3). "
                     "The same domain applies to user and project"),
+    cfg.StrOpt('token_cache_dir',
+               help="Directory where the Keystone tokens are cached. When "
+                    "set, the test processes of a run using the same "
+                    "credentials share one valid token instead of each "
+                    "requesting its own. The tokens are stored unencrypted, "
+                    "in files only readable by their owner. Unset by "
+                    "default, which disables the cache."),
+    cfg.IntOpt('token_refresh_margin',
+               default=0,
+               help="Time in seconds before a Keystone token would be "
+                    "considered expired when a background thread renews "
+                    "it, so that test requests do not wait for a new token. "
+                    "Only the tokens of the credentials in use are renewed. "
+                    "0 by default, which disables the background renewal."),
+    cfg.IntOpt('dynamic_credentials_pool_size',
+               default=0,
+               help="Number of dynamic credentials, with their network "
+                    "resources, each test process provisions ahead of demand "
+                    "in background threads. The primary and alt credentials "
+                    "of the test classes are then taken from this pool, "
+                    "unless the class requests custom network resources. "
+                    "The credentials never handed out are deleted when the "
+                    "test process exits. 0 by default, which disables the "
+                    "pool."),
+    cfg.IntOpt('dynamic_credentials_pool_workers',
+               default=2,
+               help="Number of threads provisioning the credentials of the "
+                    "dynamic credentials pool."),
+    cfg.FloatOpt('dynamic_credentials_pool_timeout',
+                 default=60,
+                 min=0,
+                 help="Time in seconds a test class waits for credentials "
+                      "of the dynamic credentials pool being provisioned "
+                      "when none is ready, before it creates its own. It "
+                      "does not wait until the pool provisioned credentials "
+                      "successfully, nor while its last attempt failed."),
+    cfg.IntOpt('dynamic_credentials_teardown_workers',
+               default=4,
+               min=1,
+               help="Maximum number of dynamic credentials of a test class "
+                    "whose resources are deleted concurrently when the "
+                    "class is torn down. The resources of each credentials "
+                    "are always deleted in order."),
 ]
 
 identity_group = cfg.OptGroup(name='identity',
@@ -197,7 +256,112 @@ ServiceClientsGroup = [
                help='Timeout in seconds to wait for the http request to '
                     'return'),
     cfg.StrOpt('proxy_url',
-               help='Specify an http proxy to use.')
+               help='Specify an http proxy to use.'),
+    cfg.BoolOpt('http_keep_alive',
+                default=False,
+                help='Keep HTTP connections to the API endpoints open and '
+                     'reuse them across requests, instead of closing the '
+                     'connection after each request. This avoids a new '
+                     'TCP (and TLS) handshake for every API call.'),
+    cfg.IntOpt('http_pool_maxsize',
+               default=10,
+               min=1,
+               help='Maximum number of connections kept open per host by '
+                    'each service client, or by each shared pool when '
+                    'http_shared_pool is enabled. Only used when '
+                    'http_keep_alive is enabled.'),
+    cfg.BoolOpt('http_shared_pool',
+                default=False,
+                help='Use a single, process-wide HTTP connection pool per '
+                     'endpoint for all service clients, instead of one pool '
+                     'per service client. Combined with http_keep_alive, '
+                     'this lets connections be reused across clients.'),
+    cfg.StrOpt('json_backend',
+               default='stdlib',
+               choices=['stdlib', 'orjson', 'ujson', 'auto'],
+               help='JSON library used by the service clients to serialize '
+                    'requests and parse responses. orjson and ujson are '
+                    'faster, optional libraries; if the selected one is not '
+                    'installed, the standard library is used. auto selects '
+                    'the first installed among orjson and ujson.'),
+    cfg.IntOpt('http_retries',
+               default=0,
+               min=0,
+               help='Maximum number of times an API request which failed '
+                    'because of a transient error is retried: a response '
+                    'with one of the http_retry_status_codes, or a lost '
+                    'connection. Only idempotent requests are retried, '
+                    'unless http_retry_non_idempotent is enabled. 0 '
+                    'disables retries.'),
+    cfg.ListOpt('http_retry_status_codes',
+                default=[429, 502, 503, 504],
+                item_type=types.Integer(min=100, max=599),
+                help='Status codes of the API responses which are retried '
+                     'when http_retries is set.'),
+    cfg.BoolOpt('http_retry_non_idempotent',
+                default=False,
+                help='Also retry the POST and PATCH requests, which may be '
+                     'applied twice if the first attempt reached the '
+                     'service.'),
+    cfg.FloatOpt('http_retry_backoff',
+                 default=1.0,
+                 min=0,
+                 help='Base delay in seconds before retrying an API '
+                      'request. The maximum delay doubles with each retry, '
+                      'and the actual delay is picked at random below it.'),
+    cfg.FloatOpt('http_retry_max_backoff',
+                 default=30.0,
+                 min=0,
+                 help='Maximum delay in seconds before retrying an API '
+                      'request.'),
+    cfg.FloatOpt('http_retry_deadline',
+                 min=0,
+                 help='Time in seconds after the first attempt of an API '
+                      'request past which it is not retried anymore. If not '
+                      'set, only http_retries limits the retries.'),
+    cfg.IntOpt('response_cache_ttl',
+               default=0,
+               min=0,
+               help='Time in seconds the responses of the GET requests '
+                    'which do not change during a run, such as the lists '
+                    'of API versions and extensions, are cached and shared '
+                    'by the service clients of a test worker. 0 disables '
+                    'the cache.'),
+    cfg.IntOpt('response_cache_size',
+               default=256,
+               min=1,
+               help='Maximum number of responses kept in the response '
+                    'cache. The least recently used ones are evicted '
+                    'first.'),
+    cfg.FloatOpt('poll_initial_interval',
+                 min=0,
+                 help='Delay in seconds between the first polls of the '
+                      'waiters, which wait for a resource to reach a '
+                      'status. Polling faster at first notices the quick '
+                      'transitions sooner. If not set, the waiters poll '
+                      'every build_interval of their service.'),
+    cfg.IntOpt('poll_initial_polls',
+               default=0,
+               min=0,
+               help='Number of polls made every poll_initial_interval '
+                    'before the waiters back off.'),
+    cfg.FloatOpt('poll_backoff',
+                 default=1.0,
+                 min=1,
+                 help='Factor applied to the delay between two polls of a '
+                      'waiter after each poll past the initial ones, up to '
+                      'poll_max_interval. 1 polls every build_interval of '
+                      'the service after the initial polls.'),
+    cfg.FloatOpt('poll_max_interval',
+                 min=0,
+                 help='Maximum delay in seconds between two polls of a '
+                      'waiter. If not set, the build_interval of the '
+                      'service is the maximum.'),
+    cfg.BoolOpt('poll_deadline_aware',
+                default=False,
+                help='Shorten the last sleep of a waiter before its timeout '
+                     'so that its last poll happens right at the deadline, '
+                     'rather than up to a full delay after it.'),
 ]
 
 identity_feature_group = cfg.OptGroup(name='identity-feature-enabled',
@@ -1146,7 +1310,21 @@ Expected values for this field are:
 
 If nothing is specified, this feature is not enabled. To trace everything
 specify .* as the regex.
-""")
+"""),
+    cfg.BoolOpt('deferred_request_logging',
+                default=False,
+                help="Keep the headers and body of the API requests made by "
+                     "each test in a bounded buffer, instead of logging them "
+                     "at DEBUG level as they are made. The buffer is only "
+                     "formatted, logged and attached to the test results "
+                     "if the test fails. The one line summary of each "
+                     "request is always logged."),
+    cfg.IntOpt('deferred_request_log_size',
+               default=50,
+               min=1,
+               help="Maximum number of requests kept per test when "
+                    "deferred_request_logging is enabled. Older requests "
+                    "are discarded."),
 ]
 
 
@@ -1361,6 +1539,24 @@ class TempestConfigProxy(object):
             # discover tests from plugins.
             plugins.TempestTestPluginManager()._register_service_clients()
 
+            # The JSON codec is shared by all the service clients in the
+            # process, so select its backend once the config is loaded.
+            json_codec.set_backend(
+                self._config.service_clients.json_backend)
+            # So is the cache of the static GET responses
+            if self._config.service_clients.response_cache_ttl:
+                response_cache.enable(
+                    self._config.service_clients.response_cache_ttl,
+                    self._config.service_clients.response_cache_size)
+            # The token cache is shared with the other test processes
+            if self._config.auth.token_cache_dir:
+                token_cache.enable(self._config.auth.token_cache_dir)
+            if self._config.auth.token_refresh_margin:
+                token_refresher.enable(
+                    self._config.auth.token_refresh_margin)
+            # And the polling of the waiters
+            polling.set_policy(_polling_policy(self._config.service_clients))
+
         return getattr(self._config, attr)
 
     def set_config_path(self, path):
@@ -1387,6 +1583,10 @@ def service_client_config(service_client_name=None):
         * `endpoint_type`
         * `build_timeout` (object-storage and identity default to compute)
         * `build_interval` (object-storage and identity default to compute)
+        * `http_keep_alive`
+        * `http_pool_maxsize`
+        * `http_shared_pool`
+        * `retry_policy`
 
     The following common settings are always returned, even if
     `service_client_name` is None:
@@ -1457,9 +1657,43 @@ def service_client_config(service_client_name=None):
         _parameters['region'] = getattr(options, 'region')
     # Set service
     _parameters['service'] = getattr(options, 'catalog_type')
+    # Set connection reuse settings. These are only meaningful to service
+    # clients, so they are not part of the common parameters which are also
+    # used to build credentials.
+    _parameters['http_keep_alive'] = CONF.service_clients.http_keep_alive
+    _parameters['http_pool_maxsize'] = CONF.service_clients.http_pool_maxsize
+    _parameters['http_shared_pool'] = CONF.service_clients.http_shared_pool
+    _parameters['retry_policy'] = _retry_policy()
     return _parameters
 
 
+def _retry_policy():
+    """Return the RetryPolicy configured for service clients, or None"""
+    options = CONF.service_clients
+    if not options.http_retries:
+        return None
+    methods = retry_policy.IDEMPOTENT_METHODS
+    if options.http_retry_non_idempotent:
+        methods += ('POST', 'PATCH')
+    return retry_policy.RetryPolicy(
+        max_retries=options.http_retries,
+        status_codes=options.http_retry_status_codes,
+        methods=methods,
+        backoff=options.http_retry_backoff,
+        max_backoff=options.http_retry_max_backoff,
+        deadline=options.http_retry_deadline)
+
+
+def _polling_policy(options):
+    """Return the PollingPolicy configured for the waiters"""
+    return polling.PollingPolicy(
+        initial_interval=options.poll_initial_interval,
+        initial_polls=options.poll_initial_polls,
+        backoff=options.poll_backoff,
+        max_interval=options.poll_max_interval,
+        deadline_aware=options.poll_deadline_aware)
+
+
 def _register_tempest_service_clients():
     # Register tempest own service clients using the same mechanism used
     # for external plugins.
@@ -18,11 +18,14 @@ import abc
 import copy
 import datetime
 import re
+import threading
 
 from oslo_log import log as logging
 import six
 from six.moves.urllib import parse as urlparse
 
+from tempest.lib.common import token_cache
+from tempest.lib.common import token_refresher
 from tempest.lib import exceptions
 from tempest.lib.services.identity.v2 import token_client as json_v2id
 from tempest.lib.services.identity.v3 import token_client as json_v3id
@@ -100,6 +103,8 @@ class AuthProvider(object):
         self.cache = None
         self.alt_auth_data = None
         self.alt_part = None
+        self._catalog_index = None
+        self._auth_lock = threading.Lock()
 
     def __str__(self):
         return "Creds :{creds}, cached auth data: {cache}".format(
@@ -146,10 +151,23 @@ class AuthProvider(object):
 
     def get_auth(self):
         """Returns auth from cache if available, else auth first"""
-        if self.cache is None or self.is_expired(self.cache):
-            self.set_auth()
+        auth_data = self.cache
+        if auth_data is None or self.is_expired(auth_data):
+            self.renew_auth(auth_data)
         return self.cache
 
+    def renew_auth(self, auth_data):
+        """Sets auth unless auth_data was already replaced
+
+        Threads which find out at the same time that the cached auth data
+        expired get a single new one.
+
+        :param auth_data: the cached auth data to be replaced, or None
+        """
+        with self._auth_lock:
+            if self.cache is auth_data:
+                self.set_auth()
+
     def set_auth(self):
         """Forces setting auth.
 
@@ -157,6 +175,7 @@ class AuthProvider(object):
         Refills credentials.
         """
         self.cache = self._get_auth()
+        self._catalog_index = None
         self._fill_credentials(self.cache[1])
 
     def clear_auth(self):
@@ -166,6 +185,7 @@ class AuthProvider(object):
         will fetch a new token and base_url.
         """
         self.cache = None
+        self._catalog_index = None
         self.credentials.reset()
 
     @abc.abstractmethod
@@ -238,6 +258,19 @@ class AuthProvider(object):
         """Extracts the base_url based on provided filters"""
         return
 
+    def _get_catalog_index(self, auth_data_body):
+        """Return the endpoint index of the catalog in auth_data_body
+
+        The index maps (service type, name, interface, region) to the
+        endpoint URL selected from the catalog, so that the catalog is only
+        searched once per token. It is dropped when the token changes.
+        """
+        index = self._catalog_index
+        if index is None or index[0] is not auth_data_body:
+            index = (auth_data_body, {})
+            self._catalog_index = index
+        return index[1]
+
     @scope.setter
     def scope(self, value):
         """Set the scope to be used in token requests
@@ -307,8 +340,26 @@ class KeystoneAuthProvider(AuthProvider):
 
     def _get_auth(self):
         # Bypasses the cache
-        auth_func = getattr(self.auth_client, 'get_token')
         auth_params = self._auth_params()
+        cache = token_cache.get_cache()
+        if cache is None:
+            return self._request_token(auth_params)
+        # Processes with the same credentials share a valid token
+        key = token_cache.make_key(self.__class__.__name__, self.auth_url,
+                                   self.scope, auth_params)
+        with cache.lock(key):
+            auth_data = cache.get(key)
+            # A new token is requested when the one in use is the cached one,
+            # since set_auth was called to replace it
+            if (auth_data is None or self.is_expired(auth_data) or
+                    (self.cache is not None and
+                     self.cache[0] == auth_data[0])):
+                auth_data = self._request_token(auth_params)
+                cache.set(key, *auth_data)
+        return auth_data
+
+    def _request_token(self, auth_params):
+        auth_func = getattr(self.auth_client, 'get_token')
 
         # returns token, auth_data
         token, auth_data = auth_func(**auth_params)
@@ -329,6 +380,17 @@ class KeystoneAuthProvider(AuthProvider):
                     data=expiry_string, formats=self.EXPIRY_DATE_FORMATS))
         return expiry
 
+    def get_auth(self):
+        refresher = token_refresher.get_refresher()
+        if refresher is not None:
+            refresher.touch(self)
+        return super(KeystoneAuthProvider, self).get_auth()
+
+    def is_expired(self, auth_data):
+        expiry = self.get_expiry(auth_data)
+        return (expiry - self.token_expiry_threshold <=
+                datetime.datetime.utcnow())
+
     def get_token(self):
         return self.get_auth()[0]
 
@@ -400,6 +462,18 @@ class KeystoneV2AuthProvider(KeystoneAuthProvider):
         if service is None:
             raise exceptions.EndpointNotFound("No service provided")
 
+        index = self._get_catalog_index(_auth_data)
+        key = (service, name, endpoint_type, region)
+        _base_url = index.get(key)
+        if _base_url is None:
+            _base_url = self._find_base_url(_auth_data, service, region, name,
+                                            endpoint_type)
+            index[key] = _base_url
+        return apply_url_filters(_base_url, filters)
+
+    def _find_base_url(self, _auth_data, service, region, name,
+                       endpoint_type):
+        """Search the catalog for the URL of an endpoint"""
         _base_url = None
         for ep in _auth_data['serviceCatalog']:
             if ep["type"] == service:
@@ -416,13 +490,12 @@ class KeystoneV2AuthProvider(KeystoneAuthProvider):
             raise exceptions.EndpointNotFound(
                 "service: %s, region: %s, endpoint_type: %s, name: %s" %
                 (service, region, endpoint_type, name))
-        return apply_url_filters(_base_url, filters)
+        return _base_url
 
-    def is_expired(self, auth_data):
+    def get_expiry(self, auth_data):
+        """Expiry time of the token in auth_data, as a UTC datetime"""
         _, access = auth_data
-        expiry = self._parse_expiry_time(access['token']['expires'])
-        return (expiry - self.token_expiry_threshold <=
-                datetime.datetime.utcnow())
+        return self._parse_expiry_time(access['token']['expires'])
 
 
 class KeystoneV3AuthProvider(KeystoneAuthProvider):
@@ -535,7 +608,18 @@ class KeystoneV3AuthProvider(KeystoneAuthProvider):
 
         if 'URL' in endpoint_type:
             endpoint_type = endpoint_type.replace('URL', '')
-        _base_url = None
+        index = self._get_catalog_index(_auth_data)
+        key = (service, name, endpoint_type, region)
+        _base_url = index.get(key)
+        if _base_url is None:
+            _base_url = self._find_base_url(_auth_data, service, region, name,
+                                            endpoint_type)
+            index[key] = _base_url
+        return apply_url_filters(_base_url, filters)
+
+    def _find_base_url(self, _auth_data, service, region, name,
+                       endpoint_type):
+        """Search the catalog for the URL of an endpoint"""
         catalog = _auth_data.get('catalog', [])
 
         # Select entries with matching service type
@@ -558,7 +642,7 @@ class KeystoneV3AuthProvider(KeystoneAuthProvider):
                 msg = ('Got an empty catalog. Scope: %s. '
                        'Falling back to configured URL for %s: %s')
                 LOG.debug(msg, self.scope, service, self.auth_url)
-                return apply_url_filters(self.auth_url, filters)
+                return self.auth_url
             else:
                 # No matching service
                 msg = ('No matching service found in the catalog.\n'
@@ -585,13 +669,12 @@ class KeystoneV3AuthProvider(KeystoneAuthProvider):
         _base_url = filtered_catalog[0].get('url', None)
         if _base_url is None:
             raise exceptions.EndpointNotFound(service)
-        return apply_url_filters(_base_url, filters)
+        return _base_url
 
-    def is_expired(self, auth_data):
+    def get_expiry(self, auth_data):
+        """Expiry time of the token in auth_data, as a UTC datetime"""
         _, access = auth_data
-        expiry = self._parse_expiry_time(access['expires_at'])
-        return (expiry - self.token_expiry_threshold <=
-                datetime.datetime.utcnow())
+        return self._parse_expiry_time(access['expires_at'])
 
 
 def is_identity_version_supported(identity_version):
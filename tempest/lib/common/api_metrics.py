@@ -0,0 +1,242 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""In memory metrics of the API requests sent by the service clients
+
+When enabled with `enable`, `RestClient` records the latency of every
+request, aggregated per service, HTTP method, URL template and status code.
+The URL template is the path of the request with the IDs and the random
+names generated by tempest replaced by ``{id}`` and ``{name}``, so that for
+example all the ``GET /v2.1/servers/<uuid>`` requests end up together.
+
+Each test worker dumps its metrics as JSON in the directory set in the
+``TEMPEST_API_METRICS_DIR`` environment variable when it exits, and
+``tempest run --api-metrics`` merges the dumps of all the workers.
+"""
+
+import collections
+import glob
+import json
+import os
+import re
+import threading
+
+from six.moves import urllib
+
+# Environment variable set to the directory where workers dump their metrics
+DUMP_DIR_ENV = 'TEMPEST_API_METRICS_DIR'
+DUMP_FILE_PATTERN = 'api-metrics-*.json'
+
+# Upper bounds, in seconds, of the buckets of the latency histograms. The
+# last bucket of each histogram counts the requests slower than all of them.
+HISTOGRAM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_ID_SEGMENT = re.compile(
+    r'^([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|'
+    r'[0-9a-f]{32}|[0-9a-f]{40}|[0-9a-f]{64}|\d+)$', re.IGNORECASE)
+# Random names generated by data_utils.rand_name
+_NAME_SEGMENT = re.compile(r'^.+-\d{4,}$')
+
+_StatsKey = collections.namedtuple('_StatsKey',
+                                   ['service', 'method', 'url', 'status'])
+
+_active = {'metrics': None}
+
+
+def normalize_url(url):
+    """Return the template of a request URL
+
+    The scheme, host, query string and fragment are removed, and the path
+    segments which are IDs or random names are replaced by placeholders.
+
+    :param str url: the URL of the request
+    :rtype: str
+    """
+    path = urllib.parse.urlsplit(url).path
+    segments = []
+    for segment in path.split('/'):
+        if _ID_SEGMENT.match(segment):
+            segment = '{id}'
+        elif _NAME_SEGMENT.match(segment):
+            segment = '{name}'
+        segments.append(segment)
+    return '/'.join(segments)
+
+
+class APIMetrics(object):
+    """Latency and count of API requests, per API
+
+    Instances are safe to use from several threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _get_stats(self, key):
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = {
+                'count': 0,
+                'total_time': 0.0,
+                'min_time': None,
+                'max_time': 0.0,
+                'histogram': [0] * (len(HISTOGRAM_BUCKETS) + 1),
+            }
+        return stats
+
+    def record(self, service, method, url, status, secs):
+        """Record a request
+
+        :param str service: the name of the service, e.g. 'compute'
+        :param str method: the HTTP method
+        :param str url: the URL of the request, it is normalized with
+                        `normalize_url`
+        :param int status: the status code of the response
+        :param float secs: the time it took to get the response
+        """
+        key = _StatsKey(service or '', method, normalize_url(url),
+                        int(status))
+        bucket = len(HISTOGRAM_BUCKETS)
+        for index, bound in enumerate(HISTOGRAM_BUCKETS):
+            if secs <= bound:
+                bucket = index
+                break
+        with self._lock:
+            stats = self._get_stats(key)
+            stats['count'] += 1
+            stats['total_time'] += secs
+            if stats['min_time'] is None or secs < stats['min_time']:
+                stats['min_time'] = secs
+            stats['max_time'] = max(stats['max_time'], secs)
+            stats['histogram'][bucket] += 1
+
+    def merge(self, entries):
+        """Add the metrics of another collector to this one
+
+        :param list entries: metrics as returned by `to_list`
+        """
+        with self._lock:
+            for entry in entries:
+                key = _StatsKey(*[entry[field]
+                                  for field in _StatsKey._fields])
+                stats = self._get_stats(key)
+                stats['count'] += entry['count']
+                stats['total_time'] += entry['total_time']
+                if (stats['min_time'] is None or
+                        entry['min_time'] < stats['min_time']):
+                    stats['min_time'] = entry['min_time']
+                stats['max_time'] = max(stats['max_time'],
+                                        entry['max_time'])
+                stats['histogram'] = [
+                    a + b for a, b in zip(stats['histogram'],
+                                          entry['histogram'])]
+
+    def to_list(self):
+        """Return the metrics as a list of JSON serializable dicts
+
+        The list is sorted by total time spent, slowest first.
+        """
+        with self._lock:
+            entries = [dict(key._asdict(), **stats)
+                       for key, stats in self._stats.items()]
+        for entry in entries:
+            entry['histogram'] = list(entry['histogram'])
+        return sorted(entries, key=lambda e: e['total_time'], reverse=True)
+
+    def dump(self, path):
+        """Write the metrics as JSON to path"""
+        data = {'buckets': list(HISTOGRAM_BUCKETS), 'apis': self.to_list()}
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+
+    @classmethod
+    def load(cls, paths):
+        """Create a collector with the merged metrics of JSON dumps
+
+        :param list paths: the paths of files written by `dump`
+        """
+        metrics = cls()
+        for path in paths:
+            with open(path) as f:
+                metrics.merge(json.load(f)['apis'])
+        return metrics
+
+    def format_summary(self, limit=10, elapsed=None):
+        """Return a text table of the APIs where most time was spent
+
+        :param int limit: the maximum number of APIs listed
+        :param float elapsed: the duration of the run, in seconds. If set,
+                              the throughput of each API is included.
+        """
+        header = '%-10s %-7s %-50s %6s %6s %8s %8s %8s' % (
+            'Service', 'Method', 'URL', 'Status', 'Count', 'Total', 'Mean',
+            'Max')
+        lines = [header + (' %8s' % 'Req/s' if elapsed else '')]
+        for entry in self.to_list()[:limit]:
+            line = '%-10s %-7s %-50s %6d %6d %7.2fs %7.3fs %7.3fs' % (
+                entry['service'], entry['method'], entry['url'],
+                entry['status'], entry['count'], entry['total_time'],
+                entry['total_time'] / entry['count'], entry['max_time'])
+            if elapsed:
+                line += ' %8.2f' % (entry['count'] / elapsed)
+            lines.append(line)
+        return '\n'.join(lines)
+
+
+def enable():
+    """Start recording the API requests of all the service clients
+
+    :return: the active `APIMetrics`
+    """
+    if _active['metrics'] is None:
+        _active['metrics'] = APIMetrics()
+    return _active['metrics']
+
+
+def disable():
+    """Stop recording API requests
+
+    :return: the `APIMetrics` which was active, or None
+    """
+    metrics = _active['metrics']
+    _active['metrics'] = None
+    return metrics
+
+
+def get_collector():
+    """Return the active `APIMetrics`, or None if recording is disabled"""
+    return _active['metrics']
+
+
+def dump_to_dir(directory):
+    """Dump the active metrics in directory, in a file unique to the process
+
+    Nothing is written if recording is disabled or no request was sent.
+    """
+    metrics = get_collector()
+    if metrics is None or not metrics.to_list():
+        return
+    metrics.dump(os.path.join(
+        directory, DUMP_FILE_PATTERN.replace('*', str(os.getpid()))))
+
+
+def load_dir(directory):
+    """Merge the metrics dumped in directory by `dump_to_dir`
+
+    :rtype: APIMetrics
+    """
+    return APIMetrics.load(
+        sorted(glob.glob(os.path.join(directory, DUMP_FILE_PATTERN))))
@@ -0,0 +1,93 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import asyncio
+from concurrent import futures
+import functools
+
+from tempest.lib.common.utils import test_utils
+
+# Default number of requests in flight at the same time for a client
+DEFAULT_MAX_WORKERS = 10
+
+
+class AsyncRestClient(object):
+    """Asyncio counterpart of a RestClient
+
+    Wraps a `RestClient`, or any service client built on top of it, and
+    exposes all of its public methods as coroutines, so that many API calls
+    can be awaited concurrently from a single event loop::
+
+        servers = AsyncRestClient(manager.servers_client)
+        bodies = await asyncio.gather(
+            *[servers.show_server(server_id) for server_id in server_ids])
+
+    The HTTP layer used by RestClient is blocking, so each call runs the
+    wrapped method unchanged in a bounded thread pool. Authentication via
+    `AuthProvider.auth_request`, rate limit handling, `_error_checker`,
+    `validate_response` and the `ResponseBody` return types are therefore
+    exactly the ones of the synchronous client.
+
+    When keep-alive is enabled, `http_pool_maxsize` should be at least
+    `max_workers` for all the connections to be reused.
+
+    :param client: the `RestClient` instance to wrap
+    :param executor: a `concurrent.futures.Executor` used to run the
+                     requests. If not provided, a thread pool owned by this
+                     object is created.
+    :param int max_workers: maximum number of requests in flight, used when
+                            no executor is provided
+    """
+
+    def __init__(self, client, executor=None,
+                 max_workers=DEFAULT_MAX_WORKERS):
+        self.client = client
+        self._own_executor = executor is None
+        if executor is None:
+            executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+        self._executor = executor
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def _async_call(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+        return _async_call
+
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking callable in the executor and await its result
+
+        :param func: the callable to run, usually a method of the client
+        :return: the value returned by func
+        :raises: any exception raised by func
+        """
+        loop = asyncio.get_event_loop()
+        func = test_utils.bind_test_caller(func)
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs))
+
+    def close(self):
+        """Shut down the executor, if it is owned by this object"""
+        if self._own_executor:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -12,7 +12,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+from concurrent import futures
 import ipaddress
+import threading
+import time
 
 import netaddr
 from oslo_log import log as logging
@@ -21,6 +25,7 @@ import six
 from tempest.lib.common import cred_client
 from tempest.lib.common import cred_provider
 from tempest.lib.common.utils import data_utils
+from tempest.lib.common.utils import test_utils
 from tempest.lib import exceptions as lib_exc
 from tempest.lib.services import clients
 
@@ -64,6 +69,14 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
     :param identity_admin_endpoint_type: The endpoint type for identity
                                          admin clients. Defaults to public.
     :param identity_uri: Identity URI of the target cloud
+    :param DynamicCredentialPool credential_pool: pool the primary and alt
+                                                  credentials are taken
+                                                  from. It must create the
+                                                  same network resources as
+                                                  this provider.
+    :param int teardown_workers: maximum number of credentials whose
+                                 resources `clear_creds` deletes
+                                 concurrently
     """
 
     def __init__(self, identity_version, name=None, network_resources=None,
@@ -73,7 +86,8 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
                  neutron_available=False, create_networks=True,
                  project_network_cidr=None, project_network_mask_bits=None,
                  public_network_id=None, resource_prefix=None,
-                 identity_admin_endpoint_type='public', identity_uri=None):
+                 identity_admin_endpoint_type='public', identity_uri=None,
+                 credential_pool=None, teardown_workers=4):
         super(DynamicCredentialProvider, self).__init__(
             identity_version=identity_version, identity_uri=identity_uri,
             admin_role=admin_role, name=name,
@@ -81,6 +95,8 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
             network_resources=network_resources)
         self.network_resources = network_resources
         self._creds = {}
+        # Protects _creds from the threads of a DynamicCredentialPool
+        self._creds_lock = threading.Lock()
         self.ports = []
         self.resource_prefix = resource_prefix or ''
         self.neutron_available = neutron_available
@@ -93,6 +109,8 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
         self.identity_admin_role = identity_admin_role or 'admin'
         self.identity_admin_endpoint_type = identity_admin_endpoint_type
         self.extra_roles = extra_roles or []
+        self.credential_pool = credential_pool
+        self.teardown_workers = teardown_workers
         (self.identity_admin_client,
          self.tenants_admin_client,
          self.users_admin_client,
@@ -329,9 +347,20 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
         self.routers_admin_client.add_router_interface(router_id,
                                                        subnet_id=subnet_id)
 
+    def _create_creds_network_resources(self, credentials):
+        if (self.neutron_available and self.create_networks):
+            network, subnet, router = self._create_network_resources(
+                credentials.tenant_id)
+            credentials.set_resources(network=network, subnet=subnet,
+                                      router=router)
+            LOG.info("Created isolated network resources for:\n"
+                     " credentials: %s", credentials)
+
     def get_credentials(self, credential_type):
         if self._creds.get(str(credential_type)):
             credentials = self._creds[str(credential_type)]
+        elif self._get_pooled_creds(credential_type):
+            credentials = self._creds[str(credential_type)]
         else:
             if credential_type in ['primary', 'alt', 'admin']:
                 is_admin = (credential_type == 'admin')
@@ -342,15 +371,55 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
             # Maintained until tests are ported
             LOG.info("Acquired dynamic creds:\n"
                      " credentials: %s", credentials)
-            if (self.neutron_available and self.create_networks):
-                network, subnet, router = self._create_network_resources(
-                    credentials.tenant_id)
-                credentials.set_resources(network=network, subnet=subnet,
-                                          router=router)
-                LOG.info("Created isolated network resources for:\n"
-                         " credentials: %s", credentials)
+            self._create_creds_network_resources(credentials)
         return credentials
 
+    def _get_pooled_creds(self, credential_type):
+        """Take credentials of credential_type from the pool, if possible
+
+        Only primary and alt credentials are pooled. Returns True if
+        credentials were taken from the pool.
+        """
+        if (self.credential_pool is None or
+                credential_type not in ['primary', 'alt']):
+            return False
+        credentials = self.credential_pool.get()
+        if credentials is None:
+            return False
+        self._creds[str(credential_type)] = credentials
+        LOG.info("Acquired pooled dynamic creds:\n"
+                 " credentials: %s", credentials)
+        return True
+
+    def provision_credentials(self, key):
+        """Create primary credentials, with their network resources
+
+        The credentials are registered under key, so that `clear_creds`
+        deletes them, even if creating their network resources fails, until
+        they are taken with `take_credentials`. `DynamicCredentialPool`
+        provisions its credentials with this.
+
+        :param str key: the name the credentials are registered under
+        :return: the credentials
+        """
+        credentials = self._create_creds()
+        with self._creds_lock:
+            self._creds[key] = credentials
+        self._create_creds_network_resources(credentials)
+        return credentials
+
+    def take_credentials(self, key):
+        """Unregister the credentials of key, and return them
+
+        The credentials are not deleted by `clear_creds` anymore, whoever
+        takes them is responsible for deleting them.
+
+        :param str key: the name the credentials are registered under
+        :return: the credentials, or None if none are registered under key
+        """
+        with self._creds_lock:
+            return self._creds.pop(key, None)
+
     def get_primary_creds(self):
         return self.get_credentials('primary')
 
@@ -410,63 +479,79 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
                 LOG.warning('Security group %s, id %s not found for clean-up',
                             secgroup['name'], secgroup['id'])
 
-    def _clear_isolated_net_resources(self):
+    def _clear_creds_net_resources(self, creds):
         client = self.routers_admin_client
-        for cred in self._creds:
-            creds = self._creds.get(cred)
-            if (not creds or not any([creds.router, creds.network,
-                                      creds.subnet])):
-                continue
-            LOG.debug("Clearing network: %(network)s, "
-                      "subnet: %(subnet)s, router: %(router)s",
-                      {'network': creds.network, 'subnet': creds.subnet,
-                       'router': creds.router})
-            if (not self.network_resources or
-                    (self.network_resources.get('router') and creds.subnet)):
-                try:
-                    client.remove_router_interface(
-                        creds.router['id'],
-                        subnet_id=creds.subnet['id'])
-                except lib_exc.NotFound:
-                    LOG.warning('router with name: %s not found for delete',
-                                creds.router['name'])
-                self._clear_isolated_router(creds.router['id'],
-                                            creds.router['name'])
-            if (not self.network_resources or
-                self.network_resources.get('subnet')):
-                self._clear_isolated_subnet(creds.subnet['id'],
-                                            creds.subnet['name'])
-            if (not self.network_resources or
-                self.network_resources.get('network')):
-                self._clear_isolated_network(creds.network['id'],
-                                             creds.network['name'])
+        if (not creds or not any([creds.router, creds.network,
+                                  creds.subnet])):
+            return
+        LOG.debug("Clearing network: %(network)s, "
+                  "subnet: %(subnet)s, router: %(router)s",
+                  {'network': creds.network, 'subnet': creds.subnet,
+                   'router': creds.router})
+        if (not self.network_resources or
+                (self.network_resources.get('router') and creds.subnet)):
+            try:
+                client.remove_router_interface(
+                    creds.router['id'],
+                    subnet_id=creds.subnet['id'])
+            except lib_exc.NotFound:
+                LOG.warning('router with name: %s not found for delete',
+                            creds.router['name'])
+            self._clear_isolated_router(creds.router['id'],
+                                        creds.router['name'])
+        if (not self.network_resources or
+            self.network_resources.get('subnet')):
+            self._clear_isolated_subnet(creds.subnet['id'],
+                                        creds.subnet['name'])
+        if (not self.network_resources or
+            self.network_resources.get('network')):
+            self._clear_isolated_network(creds.network['id'],
+                                         creds.network['name'])
+
+    def _clear_creds_resources(self, creds):
+        """Delete the resources of one set of credentials, in order"""
+        self._clear_creds_net_resources(creds)
+        try:
+            self.creds_client.delete_user(creds.user_id)
+        except lib_exc.NotFound:
+            LOG.warning("user with name: %s not found for delete",
+                        creds.username)
+        # NOTE(zhufl): Only when neutron's security_group ext is
+        # enabled, _cleanup_default_secgroup will not raise error. But
+        # here cannot use test_utils.is_extension_enabled for it will cause
+        # "circular dependency". So here just use try...except to
+        # ensure tenant deletion without big changes.
+        try:
+            if self.neutron_available:
+                self._cleanup_default_secgroup(creds.tenant_id)
+        except lib_exc.NotFound:
+            LOG.warning("failed to cleanup tenant %s's secgroup",
+                        creds.tenant_name)
+        try:
+            self.creds_client.delete_project(creds.tenant_id)
+        except lib_exc.NotFound:
+            LOG.warning("tenant with name: %s not found for delete",
+                        creds.tenant_name)
 
     def clear_creds(self):
         if not self._creds:
             return
-        self._clear_isolated_net_resources()
-        for creds in six.itervalues(self._creds):
-            try:
-                self.creds_client.delete_user(creds.user_id)
-            except lib_exc.NotFound:
-                LOG.warning("user with name: %s not found for delete",
-                            creds.username)
-            # NOTE(zhufl): Only when neutron's security_group ext is
-            # enabled, _cleanup_default_secgroup will not raise error. But
-            # here cannot use test_utils.is_extension_enabled for it will cause
-            # "circular dependency". So here just use try...except to
-            # ensure tenant deletion without big changes.
-            try:
-                if self.neutron_available:
-                    self._cleanup_default_secgroup(creds.tenant_id)
-            except lib_exc.NotFound:
-                LOG.warning("failed to cleanup tenant %s's secgroup",
-                            creds.tenant_name)
-            try:
-                self.creds_client.delete_project(creds.tenant_id)
-            except lib_exc.NotFound:
-                LOG.warning("tenant with name: %s not found for delete",
-                            creds.tenant_name)
+        all_creds = [creds for creds in six.itervalues(self._creds) if creds]
+        max_workers = min(self.teardown_workers, len(all_creds))
+        if max_workers > 1:
+            # The resources of each set of credentials are deleted in order,
+            # the sets of credentials concurrently. All the sets are
+            # cleared before the first error, if any, is raised.
+            clear = test_utils.bind_test_caller(self._clear_creds_resources)
+            with futures.ThreadPoolExecutor(
+                    max_workers=max_workers) as executor:
+                results = [executor.submit(clear, creds)
+                           for creds in all_creds]
+            for result in results:
+                result.result()
+        else:
+            for creds in all_creds:
+                self._clear_creds_resources(creds)
         self._creds = {}
 
     def is_multi_user(self):
@@ -477,3 +562,123 @@ class DynamicCredentialProvider(cred_provider.CredentialProvider):
 
     def is_role_available(self, role):
         return True
+
+
+class DynamicCredentialPool(object):
+    """Dynamic credentials provisioned ahead of demand
+
+    Background threads keep ``size`` credentials ready, with their network
+    resources, so that the `DynamicCredentialProvider` using the pool can
+    hand them out without waiting for Keystone and Neutron. The providers
+    taking credentials from the pool delete them in ``clear_creds``, as
+    those they create themselves.
+
+    The pool fails fast: until credentials were provisioned successfully,
+    and as long as the last attempt failed, `get` does not wait and the
+    providers create their credentials themselves.
+
+    :param DynamicCredentialProvider provider: provider creating the pooled
+                                               credentials. It deletes those
+                                               never taken from the pool
+                                               when the pool is stopped.
+    :param int size: number of credentials kept ready
+    :param int workers: number of threads provisioning credentials
+    :param float timeout: time in seconds `get` waits for credentials being
+                          provisioned when none is ready
+    :param float retry_delay: time in seconds a thread waits after it
+                              failed to provision credentials
+    """
+
+    def __init__(self, provider, size=4, workers=2, timeout=60,
+                 retry_delay=5):
+        self.provider = provider
+        self.size = size
+        self.workers = workers
+        self.timeout = timeout
+        self.retry_delay = retry_delay
+        self._ready = collections.deque()
+        self._free_slots = threading.Semaphore(size)
+        self._stopped = threading.Event()
+        self._cond = threading.Condition()
+        # Whether the last attempt to provision credentials succeeded,
+        # None until the first attempt completes
+        self._last_succeeded = None
+        self._threads = []
+        self._count = 0
+
+    def start(self):
+        """Start provisioning credentials in background threads"""
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._run, name='credential-pool-%d' % i)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def _provision(self):
+        with self._cond:
+            self._count += 1
+            key = 'pool-%d' % self._count
+        # Registered with the provider, so that they are deleted on stop
+        # if they are not handed out, or if the network resources fail
+        self.provider.provision_credentials(key)
+        with self._cond:
+            self._ready.append(key)
+            self._last_succeeded = True
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            self._free_slots.acquire()
+            if self._stopped.is_set():
+                return
+            try:
+                self._provision()
+            except Exception:
+                LOG.exception('Failed to provision pooled credentials')
+                with self._cond:
+                    self._last_succeeded = False
+                    # Let the waiting providers create their credentials
+                    self._cond.notify_all()
+                self._free_slots.release()
+                self._stopped.wait(self.retry_delay)
+
+    def get(self):
+        """Take provisioned credentials from the pool
+
+        Waits up to ``timeout`` seconds when none are ready, unless no
+        credentials were provisioned yet or the last attempt failed.
+
+        :return: the credentials, or None if the pool is stopped or none
+                 could be provisioned in time
+        """
+        if self._stopped.is_set():
+            return None
+        deadline = None
+        with self._cond:
+            while not self._ready:
+                if self._stopped.is_set() or not self._last_succeeded:
+                    return None
+                if deadline is None:
+                    deadline = time.time() + self.timeout
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    LOG.warning('No pooled credentials were ready after %s '
+                                'seconds', self.timeout)
+                    return None
+                self._cond.wait(remaining)
+            key = self._ready.popleft()
+        self._free_slots.release()
+        return self.provider.take_credentials(key)
+
+    def stop(self):
+        """Stop provisioning, and delete the credentials not handed out"""
+        self._stopped.set()
+        with self._cond:
+            self._cond.notify_all()
+        for _ in self._threads:
+            self._free_slots.release()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self.provider.clear_creds()
@@ -13,14 +13,24 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
+
 import six
 import urllib3
 
+# Maximum number of hosts a shared pool manager keeps connection pools for
+SHARED_NUM_POOLS = 50
+
+_shared_http = {}
+_shared_http_lock = threading.Lock()
+
 
 class ClosingProxyHttp(urllib3.ProxyManager):
     def __init__(self, proxy_url, disable_ssl_certificate_validation=False,
-                 ca_certs=None, timeout=None, follow_redirects=True):
+                 ca_certs=None, timeout=None, follow_redirects=True,
+                 keep_alive=False, pool_maxsize=None, num_pools=None):
         self.follow_redirects = follow_redirects
+        self.keep_alive = keep_alive
         kwargs = {}
 
         if disable_ssl_certificate_validation:
@@ -33,6 +43,13 @@ class ClosingProxyHttp(urllib3.ProxyManager):
         if timeout:
             kwargs['timeout'] = timeout
 
+        if keep_alive and pool_maxsize:
+            # Bound the number of idle connections kept open per host
+            kwargs['maxsize'] = pool_maxsize
+
+        if num_pools:
+            kwargs['num_pools'] = num_pools
+
         super(ClosingProxyHttp, self).__init__(proxy_url, **kwargs)
 
     def request(self, url, method, *args, **kwargs):
@@ -48,7 +65,12 @@ class ClosingProxyHttp(urllib3.ProxyManager):
                 self['content-location'] = url
 
         original_headers = kwargs.get('headers', {})
-        new_headers = dict(original_headers, connection='close')
+        if self.keep_alive:
+            # Let urllib3 return the connection to the pool once the body
+            # has been read, so that it is reused by the next request.
+            new_headers = dict(original_headers)
+        else:
+            new_headers = dict(original_headers, connection='close')
         new_kwargs = dict(kwargs, headers=new_headers)
 
         if self.follow_redirects:
@@ -61,13 +83,18 @@ class ClosingProxyHttp(urllib3.ProxyManager):
             retry = urllib3.util.Retry(redirect=False)
         r = super(ClosingProxyHttp, self).request(method, url, retries=retry,
                                                   *args, **new_kwargs)
+        if not new_kwargs.get('preload_content', True):
+            # Streaming: the caller reads the body from the response object
+            return Response(r), r
         return Response(r), r.data
 
 
 class ClosingHttp(urllib3.poolmanager.PoolManager):
     def __init__(self, disable_ssl_certificate_validation=False,
-                 ca_certs=None, timeout=None, follow_redirects=True):
+                 ca_certs=None, timeout=None, follow_redirects=True,
+                 keep_alive=False, pool_maxsize=None, num_pools=None):
         self.follow_redirects = follow_redirects
+        self.keep_alive = keep_alive
         kwargs = {}
 
         if disable_ssl_certificate_validation:
@@ -80,6 +107,13 @@ class ClosingHttp(urllib3.poolmanager.PoolManager):
         if timeout:
             kwargs['timeout'] = timeout
 
+        if keep_alive and pool_maxsize:
+            # Bound the number of idle connections kept open per host
+            kwargs['maxsize'] = pool_maxsize
+
+        if num_pools:
+            kwargs['num_pools'] = num_pools
+
         super(ClosingHttp, self).__init__(**kwargs)
 
     def request(self, url, method, *args, **kwargs):
@@ -97,7 +131,12 @@ class ClosingHttp(urllib3.poolmanager.PoolManager):
                 self['content-location'] = url
 
         original_headers = kwargs.get('headers', {})
-        new_headers = dict(original_headers, connection='close')
+        if self.keep_alive:
+            # Let urllib3 return the connection to the pool once the body
+            # has been read, so that it is reused by the next request.
+            new_headers = dict(original_headers)
+        else:
+            new_headers = dict(original_headers, connection='close')
         new_kwargs = dict(kwargs, headers=new_headers)
 
         if self.follow_redirects:
@@ -110,4 +149,86 @@ class ClosingHttp(urllib3.poolmanager.PoolManager):
             retry = urllib3.util.Retry(redirect=False)
         r = super(ClosingHttp, self).request(method, url, retries=retry,
                                              *args, **new_kwargs)
+        if not new_kwargs.get('preload_content', True):
+            # Streaming: the caller reads the body from the response object
+            return Response(r), r
         return Response(r), r.data
+
+
+def get_shared_http(proxy_url=None, disable_ssl_certificate_validation=False,
+                    ca_certs=None, timeout=None, follow_redirects=True,
+                    keep_alive=False, pool_maxsize=None):
+    """Return a process-wide pool manager for the given settings
+
+    Pool managers are shared by all callers asking for the same proxy, TLS,
+    timeout, redirect and keep-alive settings. Each shared pool manager keeps
+    one connection pool per (scheme, host, port), so connections to an
+    endpoint are reused by all the service clients talking to it.
+
+    :param proxy_url: http proxy url to use, if any
+    :param disable_ssl_certificate_validation: pass-through to the manager
+    :param ca_certs: pass-through to the manager
+    :param timeout: pass-through to the manager
+    :param follow_redirects: pass-through to the manager
+    :param keep_alive: pass-through to the manager
+    :param pool_maxsize: pass-through to the manager
+    :return: a `ClosingHttp` or `ClosingProxyHttp` instance
+    """
+    key = (proxy_url, bool(disable_ssl_certificate_validation), ca_certs,
+           timeout, follow_redirects, keep_alive, pool_maxsize)
+    with _shared_http_lock:
+        http_obj = _shared_http.get(key)
+        if http_obj is None:
+            kwargs = dict(
+                disable_ssl_certificate_validation=(
+                    disable_ssl_certificate_validation),
+                ca_certs=ca_certs, timeout=timeout,
+                follow_redirects=follow_redirects, keep_alive=keep_alive,
+                pool_maxsize=pool_maxsize, num_pools=SHARED_NUM_POOLS)
+            if proxy_url:
+                http_obj = ClosingProxyHttp(proxy_url, **kwargs)
+            else:
+                http_obj = ClosingHttp(**kwargs)
+            _shared_http[key] = http_obj
+        return http_obj
+
+
+def get_shared_http_stats():
+    """Return limits and usage of the process-wide pool managers
+
+    :return: a list with a dict for each shared pool manager, containing the
+             manager limits and a list of its per host connection pools
+    """
+    with _shared_http_lock:
+        managers = list(_shared_http.values())
+    stats = []
+    for manager in managers:
+        pools = []
+        for pool_key in manager.pools.keys():
+            pool = manager.pools.get(pool_key)
+            if pool is None:
+                # The pool has been evicted in the meanwhile
+                continue
+            pools.append({
+                'scheme': pool.scheme,
+                'host': pool.host,
+                'port': pool.port,
+                'num_connections': pool.num_connections,
+                'num_requests': pool.num_requests,
+            })
+        stats.append({
+            'keep_alive': manager.keep_alive,
+            'num_pools': SHARED_NUM_POOLS,
+            'pool_maxsize': manager.connection_pool_kw.get('maxsize', 1),
+            'pools': pools,
+        })
+    return stats
+
+
+def clear_shared_http():
+    """Close and forget all the process-wide pool managers"""
+    with _shared_http_lock:
+        managers = list(_shared_http.values())
+        _shared_http.clear()
+    for manager in managers:
+        manager.clear()
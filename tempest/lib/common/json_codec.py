@@ -0,0 +1,135 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""JSON codec used by the service clients
+
+Service clients import this module as ``json`` and use its `loads` and
+`dumps` functions to (de)serialize the body of API requests and responses.
+The backend doing the work is selected process-wide with `set_backend`:
+
+* ``stdlib``: oslo.serialization jsonutils, based on the json module of the
+  standard library. This is the default.
+* ``orjson`` and ``ujson``: faster implementations, used if the matching
+  optional package is installed, otherwise ``stdlib`` is used.
+* ``auto``: the first installed of ``orjson`` and ``ujson``, or ``stdlib``.
+
+Calls with extra keyword arguments, and objects a fast backend cannot
+serialize, are always handled by ``stdlib``.
+"""
+
+import importlib
+
+from oslo_log import log as logging
+from oslo_serialization import jsonutils
+
+from tempest.lib import exceptions
+
+LOG = logging.getLogger(__name__)
+
+BACKENDS = ('stdlib', 'orjson', 'ujson', 'auto')
+
+_codec = {
+    'name': 'stdlib',
+    'loads': jsonutils.loads,
+    'dumps': jsonutils.dumps,
+}
+
+
+def _orjson_codec(orjson):
+    # Let jsonutils.to_primitive format datetime objects, for the output to
+    # match the one of the stdlib backend.
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def _loads(s):
+        return orjson.loads(s)
+
+    def _dumps(obj):
+        return orjson.dumps(obj, default=jsonutils.to_primitive,
+                            option=options).decode('utf-8')
+    return _loads, _dumps
+
+
+def _ujson_codec(ujson):
+    def _loads(s):
+        return ujson.loads(s)
+
+    def _dumps(obj):
+        return ujson.dumps(obj, escape_forward_slashes=False)
+    return _loads, _dumps
+
+
+_FAST_CODECS = {
+    'orjson': _orjson_codec,
+    'ujson': _ujson_codec,
+}
+
+
+def set_backend(name):
+    """Select the backend used by loads and dumps
+
+    :param name: one of `BACKENDS`
+    :return: the name of the backend actually in use, which is 'stdlib' if
+             the requested backend is not installed
+    :raises InvalidConfiguration: if the backend name is not valid
+    """
+    if name not in BACKENDS:
+        raise exceptions.InvalidConfiguration(
+            'Unknown JSON backend %s, valid values are: %s' % (
+                name, ', '.join(BACKENDS)))
+    candidates = list(_FAST_CODECS) if name == 'auto' else [name]
+    for candidate in candidates:
+        if candidate == 'stdlib':
+            break
+        try:
+            module = importlib.import_module(candidate)
+        except ImportError:
+            if name != 'auto':
+                LOG.warning('JSON backend %s is not installed, falling '
+                            'back to stdlib', candidate)
+            continue
+        loads, dumps = _FAST_CODECS[candidate](module)
+        _codec.update(name=candidate, loads=loads, dumps=dumps)
+        return candidate
+    _codec.update(name='stdlib', loads=jsonutils.loads,
+                  dumps=jsonutils.dumps)
+    return 'stdlib'
+
+
+def get_backend():
+    """Return the name of the backend in use"""
+    return _codec['name']
+
+
+def loads(s, **kwargs):
+    """Deserialize a JSON document, like `json.loads`
+
+    :raises ValueError: if s is not a valid JSON document
+    """
+    if kwargs:
+        return jsonutils.loads(s, **kwargs)
+    return _codec['loads'](s)
+
+
+def dumps(obj, **kwargs):
+    """Serialize obj to a JSON formatted str, like `json.dumps`"""
+    if kwargs:
+        return jsonutils.dumps(obj, **kwargs)
+    try:
+        return _codec['dumps'](obj)
+    except (TypeError, ValueError, OverflowError):
+        if _codec['name'] == 'stdlib':
+            raise
+        # Let the standard library deal with (or report) the odd ones
+        return jsonutils.dumps(obj)
@@ -12,6 +12,9 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+import collections
+import threading
+
 import jsonschema
 from oslo_serialization import base64
 from oslo_utils import timeutils
@@ -21,6 +24,12 @@ import six
 JSONSCHEMA_VALIDATOR = jsonschema.Draft4Validator
 FORMAT_CHECKER = jsonschema.draft4_format_checker
 
+# Maximum number of compiled validators kept by validate()
+VALIDATOR_CACHE_SIZE = 1024
+
+_validators = collections.OrderedDict()
+_validators_lock = threading.Lock()
+
 
 # NOTE(gmann): Add customized format checker for 'date-time' format because:
 # 1. jsonschema needs strict_rfc3339 or isodate module to be installed
@@ -52,3 +61,49 @@ def _validate_base64_format(instance):
         return False
 
     return True
+
+
+def _get_validator(schema, cls, format_checker):
+    # NOTE: Schemas are keyed by identity, since they are mostly module level
+    # constants and hashing their content would cost about as much as
+    # building the validator. The schema is kept in the cache next to its
+    # validator, so that its id cannot be reused while the entry exists.
+    key = (id(schema), cls, id(format_checker))
+    with _validators_lock:
+        entry = _validators.get(key)
+        if entry is not None and entry[0] is schema:
+            _validators.move_to_end(key)
+            return entry[1]
+    cls.check_schema(schema)
+    validator = cls(schema, format_checker=format_checker)
+    with _validators_lock:
+        _validators[key] = (schema, validator)
+        while len(_validators) > VALIDATOR_CACHE_SIZE:
+            _validators.popitem(last=False)
+    return validator
+
+
+def validate(instance, schema, cls=JSONSCHEMA_VALIDATOR,
+             format_checker=FORMAT_CHECKER):
+    """Validate an instance against a schema, like `jsonschema.validate`
+
+    The schema is checked and the validator is built only the first time a
+    given schema object is used, after which the validator is reused.
+
+    :param instance: the instance to validate
+    :param schema: the schema to validate with
+    :param cls: the validator class
+    :param format_checker: the format checker used by the validator
+    :raises jsonschema.ValidationError: if the instance is invalid
+    :raises jsonschema.SchemaError: if the schema itself is invalid
+    """
+    validator = _get_validator(schema, cls, format_checker)
+    error = jsonschema.exceptions.best_match(validator.iter_errors(instance))
+    if error is not None:
+        raise error
+
+
+def clear_validator_cache():
+    """Forget all the validators built by validate()"""
+    with _validators_lock:
+        _validators.clear()
@@ -0,0 +1,138 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Delays between the polls of the waiters
+
+The waiters poll the status of a resource until it reaches the expected one,
+sleeping between two polls with a `Poller`. How long they sleep is decided
+by the `PollingPolicy` set with `set_policy`, which by default polls every
+``build_interval`` of the client, as the waiters always did. Tempest sets it
+from the ``[service-clients] poll_*`` options.
+"""
+
+import time
+
+_active = {'policy': None}
+
+
+class PollingPolicy(object):
+    """Decide how long a waiter sleeps between two polls
+
+    The first initial_polls polls are made every initial_interval seconds,
+    so that fast transitions are noticed quickly. The delay is then
+    multiplied by backoff after each poll, up to max_interval, so that slow
+    transitions do not load the API with needless requests. Without
+    backoff, the next polls are made every interval of the client again.
+    With the default values, the waiters poll every interval of their
+    client.
+
+    :param float initial_interval: Delay in seconds before the first polls.
+                                   None for the interval of the client.
+    :param int initial_polls: Number of polls made every initial_interval
+                              before the delay increases
+    :param float backoff: Factor applied to the delay after each poll past
+                          the initial ones
+    :param float max_interval: Maximum delay in seconds between two polls.
+                               None for the interval of the client.
+    :param bool deadline_aware: Set to true to shorten the last sleep before
+                                the timeout of a waiter, so that the last
+                                poll happens right at its deadline rather
+                                than up to a full delay after it
+    """
+
+    def __init__(self, initial_interval=None, initial_polls=0, backoff=1.0,
+                 max_interval=None, deadline_aware=False):
+        self.initial_interval = initial_interval
+        self.initial_polls = initial_polls
+        self.backoff = backoff
+        self.max_interval = max_interval
+        self.deadline_aware = deadline_aware
+
+    def __repr__(self):
+        return ('PollingPolicy(initial_interval=%s, initial_polls=%s, '
+                'backoff=%s, max_interval=%s, deadline_aware=%s)' % (
+                    self.initial_interval, self.initial_polls, self.backoff,
+                    self.max_interval, self.deadline_aware))
+
+    def get_delay(self, poll, interval):
+        """Return the time in seconds to sleep before a poll
+
+        :param int poll: the number of the poll, starting at 1 for the first
+                         one after the initial request
+        :param float interval: the interval of the client polling
+        """
+        delay = (interval if self.initial_interval is None
+                 else self.initial_interval)
+        if poll <= self.initial_polls:
+            return delay
+        max_interval = (interval if self.max_interval is None
+                        else self.max_interval)
+        if self.backoff == 1:
+            # The fast initial polls are over, back to the client interval
+            return min(interval, max_interval)
+        return min(delay * self.backoff ** (poll - self.initial_polls),
+                   max_interval)
+
+
+# Polls every interval of the client
+_DEFAULT_POLICY = PollingPolicy()
+
+
+class Poller(object):
+    """Sleep between the polls of a waiter according to a polling policy
+
+    :param float interval: the interval of the client polling, usually its
+                           ``build_interval``
+    :param float timeout: the time in seconds the waiter waits at most,
+                          usually the ``build_timeout`` of its client
+    :param policy: the `PollingPolicy` to follow, by default the one set
+                   with `set_policy`
+    """
+
+    def __init__(self, interval, timeout, policy=None):
+        self.interval = interval
+        self.policy = policy or get_policy()
+        self.polls = 0
+        self.deadline = None
+        if self.policy.deadline_aware:
+            self.deadline = time.time() + timeout
+
+    def sleep(self):
+        """Sleep until the next poll"""
+        self.polls += 1
+        delay = self.policy.get_delay(self.polls, self.interval)
+        if self.deadline is not None:
+            remaining = self.deadline - time.time()
+            # Past the deadline, the waiter is about to time out: keep the
+            # full delay rather than polling in a tight loop
+            if 0 < remaining < delay:
+                delay = remaining
+        time.sleep(delay)
+
+
+def set_policy(policy):
+    """Set the polling policy of the waiters of this process
+
+    :param policy: a `PollingPolicy`, or None for the default one
+    :return: the policy which was set before, or None
+    """
+    previous = _active['policy']
+    _active['policy'] = policy
+    return previous
+
+
+def get_policy():
+    """Return the polling policy of the waiters of this process"""
+    return _active['policy'] or _DEFAULT_POLICY
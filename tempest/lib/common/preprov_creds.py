@@ -14,8 +14,10 @@
 
 import hashlib
 import os
+import random
+import threading
+import time
 
-from oslo_concurrency import lockutils
 from oslo_log import log as logging
 import six
 import yaml
@@ -45,9 +47,10 @@ class PreProvisionedCredentialProvider(cred_provider.CredentialProvider):
 
     This credentials provider loads the details of pre-provisioned
     accounts from a YAML file, in the format specified by
-    ``etc/accounts.yaml.sample``. It locks accounts while in use, using the
-    external locking mechanism, allowing for multiple python processes
-    to share a single account file, and thus running tests in parallel.
+    ``etc/accounts.yaml.sample``. It locks accounts while in use, creating
+    a lock file per account atomically, allowing for multiple python
+    processes to share a single account file, and thus running tests in
+    parallel.
 
     The accounts_lock_dir must be generated using `lockutils.get_lock_path`
     from the oslo.concurrency library. For instance::
@@ -69,17 +72,29 @@ class PreProvisionedCredentialProvider(cred_provider.CredentialProvider):
     :param object_storage_operator_role: name of the role
     :param object_storage_reseller_admin_role: name of the role
     :param identity_uri: Identity URI of the target cloud
+    :param float wait_timeout: time in seconds to wait for an account to be
+                               released when all the matching accounts are
+                               in use. The waiting processes get the
+                               accounts in the order they started waiting.
+                               By default, InvalidCredentials is raised
+                               right away.
     """
 
     # Exclude from the hash fields specific to v2 or v3 identity API
     # i.e. only include user*, project*, tenant* and password
     HASH_CRED_FIELDS = (set(auth.KeystoneV2Credentials.ATTRIBUTES) &
                         set(auth.KeystoneV3Credentials.ATTRIBUTES))
+    # Number of attempts to create a lock file while the lock dir is being
+    # removed by other processes
+    LOCK_FILE_ATTEMPTS = 10
+    # Time in seconds between two checks for a released account
+    WAIT_POLL_INTERVAL = 0.5
 
     def __init__(self, identity_version, test_accounts_file,
                  accounts_lock_dir, name=None, credentials_domain=None,
                  admin_role=None, object_storage_operator_role=None,
-                 object_storage_reseller_admin_role=None, identity_uri=None):
+                 object_storage_reseller_admin_role=None, identity_uri=None,
+                 wait_timeout=0):
         super(PreProvisionedCredentialProvider, self).__init__(
             identity_version=identity_version, name=name,
             admin_role=admin_role, credentials_domain=credentials_domain,
@@ -93,6 +108,9 @@ class PreProvisionedCredentialProvider(cred_provider.CredentialProvider):
             accounts, admin_role, object_storage_operator_role,
             object_storage_reseller_admin_role)
         self.accounts_dir = accounts_lock_dir
+        # Not in accounts_dir, which is removed when no account is in use
+        self.waiters_dir = accounts_lock_dir.rstrip(os.sep) + '-waiters'
+        self.wait_timeout = wait_timeout
         self._creds = {}
 
     @classmethod
@@ -172,32 +190,125 @@ class PreProvisionedCredentialProvider(cred_provider.CredentialProvider):
         return self.is_multi_user()
 
     def _create_hash_file(self, hash_string):
-        path = os.path.join(os.path.join(self.accounts_dir, hash_string))
-        if not os.path.isfile(path):
-            with open(path, 'w') as fd:
-                fd.write(self.name)
+        """Lock an account, creating its lock file atomically
+
+        :return: True if the account was locked, False if it is in use
+        """
+        path = os.path.join(self.accounts_dir, hash_string)
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL
+        for attempt in range(self.LOCK_FILE_ATTEMPTS, 0, -1):
+            try:
+                fd = os.open(path, flags, 0o644)
+                break
+            except FileExistsError:
+                return False
+            except FileNotFoundError:
+                # The lock dir does not exist yet, or another process
+                # removed it in remove_hash after its last lock file
+                if attempt == 1:
+                    raise
+                os.makedirs(self.accounts_dir, exist_ok=True)
+        with os.fdopen(fd, 'w') as lock_file:
+            lock_file.write(self.name)
+        return True
+
+    def _lock_free_hash(self, hashes):
+        # Start from a random account, so that concurrent processes do not
+        # all compete for the first accounts. No global lock is needed since
+        # each lock file is created atomically.
+        start = random.randrange(len(hashes))
+        for _hash in hashes[start:] + hashes[:start]:
+            if self._create_hash_file(_hash):
+                return _hash
+        return None
+
+    @staticmethod
+    def _is_process_alive(pid):
+        if os.name != 'posix':
             return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def _get_queue_dir(self, hashes):
+        queue_key = hashlib.md5(
+            ','.join(sorted(hashes)).encode('utf-8')).hexdigest()
+        return os.path.join(self.waiters_dir, queue_key)
+
+    def _is_first_waiter(self, queue_dir, ticket):
+        for waiter in sorted(os.listdir(queue_dir)):
+            if waiter == ticket:
+                return True
+            pid = int(waiter.split('-')[1])
+            if self._is_process_alive(pid):
+                return False
+            # Left behind by a process which did not exit cleanly
+            try:
+                os.remove(os.path.join(queue_dir, waiter))
+            except FileNotFoundError:
+                pass
         return False
 
-    @lockutils.synchronized('test_accounts_io', external=True)
+    def _wait_free_hash(self, hashes):
+        """Wait for one of hashes to be released, first come first served
+
+        Each waiting process and thread adds a ticket, named after the time
+        it started waiting, to the queue of the accounts it requests. Only
+        the oldest ticket holder may lock a released account.
+
+        :return: the locked hash, or None if none was released in time
+        """
+        queue_dir = self._get_queue_dir(hashes)
+        os.makedirs(queue_dir, exist_ok=True)
+        ticket = '%017.6f-%d-%d' % (time.time(), os.getpid(),
+                                    threading.current_thread().ident)
+        ticket_path = os.path.join(queue_dir, ticket)
+        open(ticket_path, 'w').close()
+        LOG.info('%s waiting up to %s seconds for a free account',
+                 self.name, self.wait_timeout)
+        deadline = time.time() + self.wait_timeout
+        try:
+            while True:
+                if self._is_first_waiter(queue_dir, ticket):
+                    free_hash = self._lock_free_hash(hashes)
+                    if free_hash is not None:
+                        return free_hash
+                if time.time() >= deadline:
+                    return None
+                time.sleep(self.WAIT_POLL_INTERVAL)
+        finally:
+            os.remove(ticket_path)
+
+    def _has_waiters(self, hashes):
+        try:
+            return bool(os.listdir(self._get_queue_dir(hashes)))
+        except FileNotFoundError:
+            return False
+
     def _get_free_hash(self, hashes):
         # Cast as a list because in some edge cases a set will be passed in
         hashes = list(hashes)
-        if not os.path.isdir(self.accounts_dir):
-            os.mkdir(self.accounts_dir)
-            # Create File from first hash (since none are in use)
-            self._create_hash_file(hashes[0])
-            return hashes[0]
+        free_hash = None
+        # Do not jump the queue of the processes waiting for an account
+        if not self.wait_timeout or not self._has_waiters(hashes):
+            free_hash = self._lock_free_hash(hashes)
+        if free_hash is None and self.wait_timeout:
+            free_hash = self._wait_free_hash(hashes)
+        if free_hash is not None:
+            return free_hash
         names = []
         for _hash in hashes:
-            res = self._create_hash_file(_hash)
-            if res:
-                return _hash
-            else:
-                path = os.path.join(os.path.join(self.accounts_dir,
-                                                 _hash))
+            path = os.path.join(self.accounts_dir, _hash)
+            try:
                 with open(path, 'r') as fd:
                     names.append(fd.read())
+            except IOError:
+                # Released in the meantime
+                pass
         msg = ('Insufficient number of users provided. %s have allocated all '
                'the credentials for this allocation request' % ','.join(names))
         raise lib_exc.InvalidCredentials(msg)
@@ -251,16 +362,20 @@ class PreProvisionedCredentialProvider(cred_provider.CredentialProvider):
         LOG.info('%s allocated creds:\n%s', self.name, clean_creds)
         return self._wrap_creds_with_network(free_hash)
 
-    @lockutils.synchronized('test_accounts_io', external=True)
     def remove_hash(self, hash_string):
         hash_path = os.path.join(self.accounts_dir, hash_string)
-        if not os.path.isfile(hash_path):
+        try:
+            os.remove(hash_path)
+        except FileNotFoundError:
             LOG.warning('Expected an account lock file %s to remove, but '
                         'one did not exist', hash_path)
-        else:
-            os.remove(hash_path)
-            if not os.listdir(self.accounts_dir):
-                os.rmdir(self.accounts_dir)
+            return
+        try:
+            os.rmdir(self.accounts_dir)
+        except OSError:
+            # Other accounts are still locked, or another process removed
+            # the directory after releasing the last one
+            pass
 
     def get_hash(self, creds):
         for _hash in self.hash_dict['creds']:
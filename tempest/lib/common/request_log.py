@@ -0,0 +1,163 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Deferred logging of the full API requests and responses
+
+By default `RestClient` logs the headers and body of every request and
+response at DEBUG level, as soon as the response is received. When a
+buffer is started with `start`, the details of the requests are instead
+kept in a bounded buffer, with the tokens masked and the bodies truncated
+to the length they would be logged with, and only formatted and logged if
+the test fails. The one line summary of each request is still logged right
+away.
+
+Tests run one after the other in a worker process, so a single buffer is
+active at a time, shared by all the threads of the process.
+"""
+
+import collections
+import threading
+
+import six
+
+DEFAULT_SIZE = 50
+
+# The length of the bodies as logged by RestClient._safe_body
+_BODY_MAXLEN = 4096
+
+_RequestEntry = collections.namedtuple(
+    '_RequestEntry', ['client', 'caller_name', 'method', 'req_url', 'resp',
+                      'req_headers', 'req_body', 'resp_body', 'extra'])
+
+_active = {'buffer': None}
+
+
+class RequestLogBuffer(object):
+    """Bounded buffer of the full details of API requests
+
+    Only the last `size` requests are kept, older ones are discarded.
+    Instances are safe to use from several threads.
+
+    :param int size: the maximum number of requests kept
+    """
+
+    def __init__(self, size=DEFAULT_SIZE):
+        self._lock = threading.Lock()
+        self._entries = collections.deque(maxlen=size)
+        self.discarded = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def append(self, client, caller_name, method, req_url, resp,
+               req_headers=None, req_body=None, resp_body=None, extra=None):
+        """Record a request, without formatting anything
+
+        Shallow copies of the headers are kept with the tokens masked, and
+        the text bodies are truncated to the length they are logged with.
+
+        :param client: the `RestClient` which sent the request, used to
+                       format and log the entry
+        """
+        entry = _RequestEntry(
+            client, caller_name, method, req_url,
+            _mask(resp, ('x-subject-token',)),
+            _mask(req_headers or {}, ('X-Auth-Token', 'X-Subject-Token')),
+            _truncate(req_body), _truncate(resp_body), extra)
+        with self._lock:
+            if len(self._entries) == self._entries.maxlen:
+                self.discarded += 1
+            self._entries.append(entry)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.discarded = 0
+
+    def format(self):
+        """Format the recorded requests as text, oldest first
+
+        :rtype: str
+        """
+        with self._lock:
+            entries = list(self._entries)
+            discarded = self.discarded
+        lines = []
+        if discarded:
+            lines.append('%d older requests discarded' % discarded)
+        for entry in entries:
+            lines.append('Request (%s): %s %s %s' % (
+                entry.caller_name, entry.resp['status'], entry.method,
+                entry.req_url))
+            lines.append(_format_details(entry))
+        return '\n'.join(lines)
+
+    def flush(self):
+        """Log the recorded requests at DEBUG level and empty the buffer"""
+        with self._lock:
+            entries = list(self._entries)
+            self._entries.clear()
+            self.discarded = 0
+        for entry in entries:
+            entry.client.LOG.debug('%s', _format_details(entry),
+                                   extra=entry.extra)
+
+
+def _mask(headers, names):
+    headers = headers.copy()
+    for name in names:
+        if name in headers:
+            headers[name] = '<omitted>'
+    return headers
+
+
+def _truncate(body):
+    if isinstance(body, (six.text_type, six.binary_type)):
+        return body[:_BODY_MAXLEN]
+    return body
+
+
+def _format_details(entry):
+    return entry.client._format_request_full(
+        entry.resp, entry.req_headers, entry.req_body, entry.resp_body)
+
+
+def start(size=DEFAULT_SIZE):
+    """Start buffering the full details of API requests
+
+    Any buffer previously active is replaced.
+
+    :param int size: the maximum number of requests kept
+    :return: the new active `RequestLogBuffer`
+    """
+    buf = RequestLogBuffer(size)
+    _active['buffer'] = buf
+    return buf
+
+
+def stop():
+    """Stop buffering, the requests are logged at DEBUG again
+
+    :return: the buffer which was active, or None
+    """
+    buf = _active['buffer']
+    _active['buffer'] = None
+    return buf
+
+
+def get_buffer():
+    """Return the active `RequestLogBuffer`, or None"""
+    return _active['buffer']
@@ -0,0 +1,109 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Process-wide cache of the responses of effectively static GET requests
+
+Service clients mark the requests which can be cached by passing
+``cache=True`` to `RestClient.get`, for example to list the API versions or
+extensions of a service. Those requests are only cached once the cache is
+enabled with `enable`, which tempest does when
+``[service-clients] response_cache_ttl`` is set.
+"""
+
+import collections
+import copy
+import threading
+import time
+
+DEFAULT_MAXSIZE = 256
+
+_active = {'cache': None}
+
+
+class ResponseCache(object):
+    """LRU cache of responses, expiring after a time to live
+
+    Instances are safe to use from several threads.
+
+    :param int maxsize: maximum number of responses kept, the least recently
+                        used ones are evicted first
+    :param float ttl: time in seconds after which a response expires
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return a copy of the cached (resp, body) for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, resp, body = entry
+                if expires > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    # Callers may update the response headers
+                    return copy.copy(resp), body
+                del self._entries[key]
+            self.misses += 1
+        return None
+
+    def set(self, key, resp, body):
+        """Cache the (resp, body) of a request"""
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, copy.copy(resp),
+                                  body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def enable(ttl, maxsize=DEFAULT_MAXSIZE):
+    """Enable the process-wide response cache
+
+    :param float ttl: time in seconds after which a response expires
+    :param int maxsize: maximum number of responses kept
+    :return: the active `ResponseCache`
+    """
+    cache = ResponseCache(maxsize=maxsize, ttl=ttl)
+    _active['cache'] = cache
+    return cache
+
+
+def disable():
+    """Disable the process-wide response cache
+
+    :return: the `ResponseCache` which was active, or None
+    """
+    cache = _active['cache']
+    _active['cache'] = None
+    return cache
+
+
+def get_cache():
+    """Return the active `ResponseCache`, or None if caching is disabled"""
+    return _active['cache']
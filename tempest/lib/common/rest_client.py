@@ -15,6 +15,7 @@
 #    under the License.
 
 import collections
+from concurrent import futures
 import email.utils
 import re
 import time
@@ -22,19 +23,26 @@ import time
 import jsonschema
 from oslo_log import log as logging
 from oslo_log import versionutils
-from oslo_serialization import jsonutils as json
 import six
 from six.moves import urllib
 
+from tempest.lib.common import api_metrics
 from tempest.lib.common import http
+from tempest.lib.common import json_codec as json
 from tempest.lib.common import jsonschema_validator
+from tempest.lib.common import polling
 from tempest.lib.common import profiler
+from tempest.lib.common import request_log
+from tempest.lib.common import response_cache
 from tempest.lib.common.utils import test_utils
 from tempest.lib import exceptions
 
 # redrive rate limited calls at most twice
 MAX_RECURSION_DEPTH = 2
 
+# maximum number of requests in flight at the same time in map_requests
+MAP_REQUESTS_MAX_WORKERS = 8
+
 # All the successful HTTP status codes from RFC 7231 & 4918
 HTTP_SUCCESS = (200, 201, 202, 203, 204, 205, 206, 207)
 
@@ -73,6 +81,16 @@ class RestClient(object):
                              return
     :param str proxy_url: http proxy url to use.
     :param bool follow_redirects: Set to false to stop following redirects.
+    :param bool http_keep_alive: Set to true to reuse pooled connections
+                                 instead of closing them after each request.
+    :param int http_pool_maxsize: Maximum number of connections kept open per
+                                  host when http_keep_alive is set.
+    :param bool http_shared_pool: Set to true to use the process-wide pool
+                                  manager shared by all the clients with the
+                                  same http settings.
+    :param retry_policy: A `tempest.lib.common.retry_policy.RetryPolicy`
+                         used to retry requests which failed because of
+                         transient errors. None to disable retries.
     """
 
     # The version of the API this client implements
@@ -85,7 +103,9 @@ class RestClient(object):
                  build_interval=1, build_timeout=60,
                  disable_ssl_certificate_validation=False, ca_certs=None,
                  trace_requests='', name=None, http_timeout=None,
-                 proxy_url=None, follow_redirects=True):
+                 proxy_url=None, follow_redirects=True,
+                 http_keep_alive=False, http_pool_maxsize=None,
+                 http_shared_pool=False, retry_policy=None):
         self.auth_provider = auth_provider
         self.service = service
         self.region = region
@@ -94,6 +114,7 @@ class RestClient(object):
         self.build_interval = build_interval
         self.build_timeout = build_timeout
         self.trace_requests = trace_requests
+        self.retry_policy = retry_policy
 
         self._skip_path = False
         self.general_header_lc = set(('cache-control', 'connection',
@@ -106,15 +127,23 @@ class RestClient(object):
                                        'vary', 'www-authenticate'))
         dscv = disable_ssl_certificate_validation
 
-        if proxy_url:
+        if http_shared_pool:
+            self.http_obj = http.get_shared_http(
+                proxy_url=proxy_url,
+                disable_ssl_certificate_validation=dscv, ca_certs=ca_certs,
+                timeout=http_timeout, follow_redirects=follow_redirects,
+                keep_alive=http_keep_alive, pool_maxsize=http_pool_maxsize)
+        elif proxy_url:
             self.http_obj = http.ClosingProxyHttp(
                 proxy_url,
                 disable_ssl_certificate_validation=dscv, ca_certs=ca_certs,
-                timeout=http_timeout, follow_redirects=follow_redirects)
+                timeout=http_timeout, follow_redirects=follow_redirects,
+                keep_alive=http_keep_alive, pool_maxsize=http_pool_maxsize)
         else:
             self.http_obj = http.ClosingHttp(
                 disable_ssl_certificate_validation=dscv, ca_certs=ca_certs,
-                timeout=http_timeout, follow_redirects=follow_redirects)
+                timeout=http_timeout, follow_redirects=follow_redirects,
+                keep_alive=http_keep_alive, pool_maxsize=http_pool_maxsize)
 
     def get_headers(self, accept_type=None, send_type=None):
         """Return the default headers which will be used with outgoing requests
@@ -297,7 +326,8 @@ class RestClient(object):
         """
         return self.request('POST', url, extra_headers, headers, body, chunked)
 
-    def get(self, url, headers=None, extra_headers=False):
+    def get(self, url, headers=None, extra_headers=False, stream=False,
+            cache=False):
         """Send a HTTP GET request using keystone service catalog and auth
 
         :param str url: the relative url to send the get request to
@@ -306,12 +336,47 @@ class RestClient(object):
                                    returned by the get_headers() method are to
                                    be used but additional headers are needed in
                                    the request pass them in as a dict.
+        :param bool stream: do not load the response body in memory. The
+                            body returned is a file-like object the data can
+                            be read from in chunks, see `ResponseBodyData`.
+        :param bool cache: the response does not change during a run, so it
+                           can be served from the response cache, if it is
+                           enabled, see `tempest.lib.common.response_cache`.
         :return: a tuple with the first entry containing the response headers
                  and the second the response body
         :rtype: tuple
         """
+        if stream:
+            return self.request('GET', url, extra_headers, headers,
+                                stream=True)
+        cached_responses = response_cache.get_cache() if cache else None
+        if cached_responses is not None:
+            key = self._get_cache_key(url, headers, extra_headers)
+            cached = cached_responses.get(key)
+            if cached is not None:
+                return cached
+            resp, body = self.request('GET', url, extra_headers, headers)
+            cached_responses.set(key, resp, body)
+            return resp, body
+        # NOTE: stream is only passed when set, so that subclasses which
+        # override request() without the stream parameter keep working.
         return self.request('GET', url, extra_headers, headers)
 
+    def _get_cache_key(self, url, headers=None, extra_headers=False):
+        """Identify a GET request in the response cache
+
+        Responses are only shared by the requests to the same endpoint with
+        the same credentials and headers.
+        """
+        if headers is None:
+            headers = self.get_headers()
+        elif extra_headers:
+            headers = dict(headers, **self.get_headers())
+        return (str(self.auth_provider.credentials),
+                tuple(sorted(self.filters.items())),
+                url,
+                tuple(sorted(headers.items())))
+
     def delete(self, url, headers=None, body=None, extra_headers=False):
         """Send a HTTP DELETE request using keystone service catalog and auth
 
@@ -402,7 +467,7 @@ class RestClient(object):
         :return: tuple with response headers and list of version numbers
         :rtype: tuple
         """
-        resp, body = self.get('')
+        resp, body = self.get('', cache=True)
         body = self._parse_resp(body)
         versions = map(lambda x: x['id'], body)
         return resp, versions
@@ -431,8 +496,10 @@ class RestClient(object):
             self.LOG.debug('Starting Request (%s): %s %s', caller_name,
                            method, req_url)
 
-    def _log_request_full(self, resp, req_headers=None, req_body=None,
-                          resp_body=None, extra=None):
+    def _format_request_full(self, resp, req_headers=None, req_body=None,
+                             resp_body=None):
+        if req_headers is None:
+            req_headers = {}
         if 'X-Auth-Token' in req_headers:
             req_headers['X-Auth-Token'] = '<omitted>'
         if 'X-Subject-Token' in req_headers:
@@ -446,12 +513,18 @@ class RestClient(object):
     Response - Headers: %s
         Body: %s"""
 
-        self.LOG.debug(
-            log_fmt,
+        return log_fmt % (
             str(req_headers),
             self._safe_body(req_body),
             str(resp_log),
-            self._safe_body(resp_body),
+            self._safe_body(resp_body))
+
+    def _log_request_full(self, resp, req_headers=None, req_body=None,
+                          resp_body=None, extra=None):
+        self.LOG.debug(
+            '%s',
+            self._format_request_full(resp, req_headers, req_body,
+                                      resp_body),
             extra=extra)
 
     def _log_request(self, method, req_url, resp,
@@ -477,9 +550,16 @@ class RestClient(object):
             secs,
             extra=extra)
 
+        # When a request log buffer is active, keep the details to only
+        # log them if the test fails.
+        request_log_buffer = request_log.get_buffer()
+        if request_log_buffer is not None:
+            request_log_buffer.append(self, caller_name, method, req_url,
+                                      resp, req_headers, req_body,
+                                      resp_body, extra)
         # Also look everything at DEBUG if you want to filter this
         # out, don't run at debug.
-        if self.LOG.isEnabledFor(logging.DEBUG):
+        elif self.LOG.isEnabledFor(logging.DEBUG):
             self._log_request_full(resp, req_headers, req_body,
                                    resp_body, extra)
 
@@ -556,7 +636,8 @@ class RestClient(object):
         if method != 'HEAD' and not resp_body and resp.status >= 400:
             self.LOG.warning("status >= 400 response with empty body")
 
-    def _request(self, method, url, headers=None, body=None, chunked=False):
+    def _request(self, method, url, headers=None, body=None, chunked=False,
+                 stream=False):
         """A simple HTTP request interface."""
         # Authenticate the request with the auth provider
         req_url, req_headers, req_body = self.auth_provider.auth_request(
@@ -564,7 +645,7 @@ class RestClient(object):
 
         resp, resp_body = self.raw_request(
             req_url, method, headers=req_headers, body=req_body,
-            chunked=chunked
+            chunked=chunked, stream=stream
         )
         # Verify HTTP response codes
         self.response_checker(method, resp, resp_body)
@@ -572,7 +653,7 @@ class RestClient(object):
         return resp, resp_body
 
     def raw_request(self, url, method, headers=None, body=None, chunked=False,
-                    log_req_body=None):
+                    log_req_body=None, stream=False):
         """Send a raw HTTP request without the keystone catalog or auth
 
         This method sends a HTTP request in the same manner as the request()
@@ -593,27 +674,48 @@ class RestClient(object):
                                  body is safe to log otherwise pass any string
                                  you want to log in place of request body.
                                  For example: '<omitted>'
+        :param bool stream: Do not load the response body of successful
+                            responses in memory, return a `ResponseBodyData`
+                            to read it from instead.
         :rtype: tuple
         :return: a tuple with the first entry containing the response headers
                  and the second the response body
         """
         if headers is None:
             headers = self.get_headers()
+        http_kwargs = {}
+        if stream:
+            http_kwargs['preload_content'] = False
         # Do the actual request, and time it
         start = time.time()
         self._log_request_start(method, url)
         resp, resp_body = self.http_obj.request(
             url, method, headers=headers,
-            body=body, chunked=chunked)
+            body=body, chunked=chunked, **http_kwargs)
         end = time.time()
+        metrics = api_metrics.get_collector()
+        if metrics is not None:
+            metrics.record(self.service, method, url, resp.status,
+                           end - start)
+        if stream:
+            if resp.status in HTTP_SUCCESS and resp.status not in (204, 205):
+                resp_body = ResponseBodyData(resp, resp_body)
+                log_resp_body = '<stream>'
+            else:
+                # There is no payload to stream: read the body at once, so
+                # that the connection is released and the response can be
+                # checked as usual.
+                resp_body = log_resp_body = resp_body.data
+        else:
+            log_resp_body = resp_body
         req_body = body if log_req_body is None else log_req_body
         self._log_request(method, url, resp, secs=(end - start),
                           req_headers=headers, req_body=req_body,
-                          resp_body=resp_body)
+                          resp_body=log_resp_body)
         return resp, resp_body
 
     def request(self, method, url, extra_headers=False, headers=None,
-                body=None, chunked=False):
+                body=None, chunked=False, stream=False):
         """Send a HTTP request with keystone auth and using the catalog
 
         This method will send an HTTP request using keystone auth in the
@@ -626,7 +728,8 @@ class RestClient(object):
 
         This method will also handle rate-limiting, if a 413 response code is
         received it will retry the request after waiting the 'retry-after'
-        duration from the header.
+        duration from the header. Requests which fail because of transient
+        errors are retried as defined by the retry_policy of the client.
 
         :param str method: The HTTP verb to use for the request
         :param str url: Relative url to send the request to
@@ -640,6 +743,9 @@ class RestClient(object):
                              explicitly requires no headers use an empty dict.
         :param str body: Body to send with the request
         :param bool chunked: sends the body with chunked encoding
+        :param bool stream: Do not load the response body of successful
+                            responses in memory, return a `ResponseBodyData`
+                            to read it from instead.
         :rtype: tuple
         :return: a tuple with the first entry containing the response headers
                  and the second the response body
@@ -683,8 +789,9 @@ class RestClient(object):
             except (ValueError, TypeError):
                 headers = self.get_headers()
 
-        resp, resp_body = self._request(method, url, headers=headers,
-                                        body=body, chunked=chunked)
+        resp, resp_body = self._request_with_retries(
+            method, url, headers=headers, body=body, chunked=chunked,
+            stream=stream)
 
         while (resp.status == 413 and
                'retry-after' in resp and
@@ -697,11 +804,86 @@ class RestClient(object):
                 "Sleeping %s seconds based on retry-after header", delay
             )
             time.sleep(delay)
-            resp, resp_body = self._request(method, url,
-                                            headers=headers, body=body)
+            resp, resp_body = self._request_with_retries(
+                method, url, headers=headers, body=body, stream=stream)
         self._error_checker(resp, resp_body)
         return resp, resp_body
 
+    def _request_with_retries(self, method, url, headers=None, body=None,
+                              chunked=False, stream=False):
+        """Send a request, retrying it as defined by the retry policy
+
+        Chunked requests are never retried, since their body may be an
+        iterator which can only be consumed once.
+        """
+        policy = self.retry_policy
+        if policy is None or chunked:
+            return self._request(method, url, headers=headers, body=body,
+                                 chunked=chunked, stream=stream)
+        start = time.time()
+        retry = 0
+        while True:
+            retry += 1
+            try:
+                resp, resp_body = self._request(method, url, headers=headers,
+                                                body=body, stream=stream)
+            except Exception as exc:
+                delay = policy.retry_exception(method, exc, retry,
+                                               time.time() - start)
+                if delay is None:
+                    raise
+                reason = '%s: %s' % (exc.__class__.__name__, exc)
+            else:
+                delay = policy.retry_response(method, resp, retry,
+                                              time.time() - start)
+                if delay is None:
+                    return resp, resp_body
+                reason = 'status %s' % resp.status
+            self.LOG.warning('Retrying %s %s in %.1f seconds after %s '
+                             '(retry %d of %d)', method, url, delay, reason,
+                             retry, policy.max_retries)
+            time.sleep(delay)
+
+    def map_requests(self, requests, max_workers=MAP_REQUESTS_MAX_WORKERS):
+        """Send a batch of independent HTTP requests concurrently
+
+        The requests are run on a bounded thread pool, each one going
+        through request(), so that auth, error checking and the handling of
+        rate limited (413) responses are the same as for a single request.
+
+        Example::
+
+            results = client.map_requests(
+                [functools.partial(client.delete_server, server_id)
+                 for server_id in server_ids])
+
+        :param list requests: The requests to send. Each item is either a
+                              dict with the keyword arguments of request(),
+                              e.g. {'method': 'GET', 'url': 'servers/id'}, or
+                              a callable with no arguments, typically a
+                              functools.partial of a service client method.
+        :param int max_workers: Maximum number of requests in flight
+        :rtype: list
+        :return: a list in the same order as requests. Each item is what the
+                 corresponding request returned or, if it failed, the
+                 exception it raised.
+        """
+        def _send(req):
+            try:
+                if callable(req):
+                    return req()
+                return self.request(**req)
+            except Exception as exc:
+                return exc
+
+        if not requests:
+            return []
+        # Log the requests with the caller of the current thread
+        _send = test_utils.bind_test_caller(_send)
+        max_workers = min(max_workers, len(requests))
+        with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_send, requests))
+
     def _get_retry_after_delay(self, resp):
         """Extract the delay from the retry-after header.
 
@@ -900,6 +1082,7 @@ class RestClient(object):
                                   resource still hasn't been deleted
         """
         start_time = int(time.time())
+        poller = polling.Poller(self.build_interval, self.build_timeout)
         while True:
             if self.is_resource_deleted(id):
                 return
@@ -912,7 +1095,7 @@ class RestClient(object):
                 if caller:
                     message = '(%s) %s' % (caller, message)
                 raise exceptions.TimeoutException(message)
-            time.sleep(self.build_interval)
+            poller.sleep()
 
     def wait_for_resource_activation(self, id):
         """Waits for a resource to become active
@@ -926,6 +1109,7 @@ class RestClient(object):
                                   resource still hasn't been active
         """
         start_time = int(time.time())
+        poller = polling.Poller(self.build_interval, self.build_timeout)
         while True:
             if self.is_resource_active(id):
                 return
@@ -938,7 +1122,7 @@ class RestClient(object):
                 if caller:
                     message = '(%s) %s' % (caller, message)
                 raise exceptions.TimeoutException(message)
-            time.sleep(self.build_interval)
+            poller.sleep()
 
     def is_resource_deleted(self, id):
         """Subclasses override with specific deletion detection."""
@@ -971,9 +1155,9 @@ class RestClient(object):
             body_schema = schema.get('response_body')
             if body_schema:
                 try:
-                    jsonschema.validate(body, body_schema,
-                                        cls=JSONSCHEMA_VALIDATOR,
-                                        format_checker=FORMAT_CHECKER)
+                    jsonschema_validator.validate(
+                        body, body_schema, cls=JSONSCHEMA_VALIDATOR,
+                        format_checker=FORMAT_CHECKER)
                 except jsonschema.ValidationError as ex:
                     msg = ("HTTP response body is invalid (%s)" % ex)
                     raise exceptions.InvalidHTTPResponseBody(msg)
@@ -986,9 +1170,9 @@ class RestClient(object):
             header_schema = schema.get('response_header')
             if header_schema:
                 try:
-                    jsonschema.validate(resp, header_schema,
-                                        cls=JSONSCHEMA_VALIDATOR,
-                                        format_checker=FORMAT_CHECKER)
+                    jsonschema_validator.validate(
+                        resp, header_schema, cls=JSONSCHEMA_VALIDATOR,
+                        format_checker=FORMAT_CHECKER)
                 except jsonschema.ValidationError as ex:
                     msg = ("HTTP response header is invalid (%s)" % ex)
                     raise exceptions.InvalidHTTPResponseHeader(msg)
@@ -1024,14 +1208,81 @@ class ResponseBody(dict):
 class ResponseBodyData(object):
     """Class that wraps an http response and string data into a single value.
 
+    The data can also be a file-like object, typically a streamed HTTP
+    response. In that case it can be read in chunks with read() or by
+    iterating over this object, without loading it all in memory. Accessing
+    `data` reads whatever is left of the stream at once.
     """
 
+    # Default size of the chunks yielded when iterating over the data
+    CHUNK_SIZE = 65536
+
     def __init__(self, response, data):
         self.response = response
-        self.data = data
+        self._offset = 0
+        if hasattr(data, 'read'):
+            self._stream = data
+            self._data = None
+        else:
+            self._stream = None
+            self._data = data
+
+    @property
+    def data(self):
+        if self._stream is not None:
+            self._data = self._stream.read()
+            self.close()
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self.close()
+        self._data = data
+
+    def read(self, amt=None):
+        """Read up to amt bytes of data, or all of it if amt is None"""
+        if self._stream is None:
+            data = self._data or b''
+            end = len(data) if amt is None else self._offset + amt
+            chunk = data[self._offset:end]
+            self._offset += len(chunk)
+            return chunk
+        chunk = self._stream.read(amt)
+        if not chunk or amt is None:
+            self.close()
+        return chunk
+
+    def iter_chunks(self, chunk_size=CHUNK_SIZE):
+        """Yield the data in chunks of at most chunk_size bytes"""
+        while True:
+            chunk = self.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def __iter__(self):
+        return self.iter_chunks()
+
+    def close(self):
+        """Release the connection of a streamed response, if any"""
+        if self._stream is not None:
+            stream, self._stream = self._stream, None
+            release_conn = getattr(stream, 'release_conn', None)
+            if release_conn is not None:
+                release_conn()
+            else:
+                stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def __str__(self):
-        return "response: %s\nBody: %s" % (self.response, self.data)
+        if self._stream is not None:
+            return "response: %s\nBody: <stream>" % self.response
+        return "response: %s\nBody: %s" % (self.response, self._data)
 
 
 class ResponseBodyList(list):
@@ -0,0 +1,133 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import random
+
+import urllib3
+
+# Status codes of the responses of busy or restarting services
+DEFAULT_STATUS_CODES = (429, 502, 503, 504)
+# Methods which can be sent again without changing the outcome
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'TRACE')
+
+# Errors raised by the HTTP layer when the connection to the API endpoint
+# could not be established or was lost
+CONNECTION_ERRORS = (
+    ConnectionError,
+    urllib3.exceptions.MaxRetryError,
+    urllib3.exceptions.NewConnectionError,
+    urllib3.exceptions.ProtocolError,
+    urllib3.exceptions.TimeoutError,
+)
+
+
+class RetryPolicy(object):
+    """Decide when and after how long a failed request is sent again
+
+    The delay before the n-th retry is drawn at random between 0 and
+    ``min(max_backoff, backoff * 2 ** (n - 1))`` ("full jitter"), so that
+    clients hitting a busy service at the same time do not retry in lock
+    step. If the response carries a ``retry-after`` header, the delay is at
+    least the one requested by the server, up to max_backoff.
+
+    :param int max_retries: Maximum number of times a request is retried
+    :param status_codes: Status codes of the responses which are retried
+    :param methods: HTTP methods of the requests which are retried. Only
+                    idempotent methods are retried by default.
+    :param bool retry_connection_errors: Set to true to retry the requests
+                                         which failed with one of the
+                                         `CONNECTION_ERRORS`
+    :param float backoff: Base delay in seconds
+    :param float max_backoff: Maximum delay in seconds before a retry
+    :param float deadline: Time in seconds after the first attempt past
+                           which a request is not retried anymore. None for
+                           no limit.
+    """
+
+    def __init__(self, max_retries=3, status_codes=DEFAULT_STATUS_CODES,
+                 methods=IDEMPOTENT_METHODS, retry_connection_errors=True,
+                 backoff=1.0, max_backoff=30.0, deadline=None):
+        self.max_retries = max_retries
+        self.status_codes = frozenset(int(code) for code in status_codes)
+        self.methods = frozenset(method.upper() for method in methods)
+        self.retry_connection_errors = retry_connection_errors
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+
+    def __repr__(self):
+        return ('RetryPolicy(max_retries=%s, status_codes=%s, methods=%s, '
+                'retry_connection_errors=%s, backoff=%s, max_backoff=%s, '
+                'deadline=%s)' % (
+                    self.max_retries, sorted(self.status_codes),
+                    sorted(self.methods), self.retry_connection_errors,
+                    self.backoff, self.max_backoff, self.deadline))
+
+    def _can_retry(self, method, retry, elapsed, delay):
+        if retry > self.max_retries or method.upper() not in self.methods:
+            return False
+        return self.deadline is None or elapsed + delay <= self.deadline
+
+    def get_delay(self, retry, resp=None):
+        """Return the time in seconds to wait before a retry
+
+        :param int retry: the number of the retry, starting at 1
+        :param resp: the response of the failed attempt, if any
+        """
+        delay = random.uniform(
+            0, min(self.max_backoff, self.backoff * 2 ** (retry - 1)))
+        if resp is not None:
+            try:
+                delay = max(delay, float(resp['retry-after']))
+            except (KeyError, ValueError, TypeError):
+                pass
+        return min(delay, self.max_backoff)
+
+    def retry_response(self, method, resp, retry, elapsed):
+        """Return the delay before retrying a request, or None
+
+        :param str method: the HTTP method of the request
+        :param resp: the response received
+        :param int retry: the number of the retry being considered,
+                          starting at 1
+        :param float elapsed: the time in seconds since the first attempt
+        :return: the delay in seconds to wait before the retry, or None if
+                 the request must not be retried
+        """
+        if resp.status not in self.status_codes:
+            return None
+        delay = self.get_delay(retry, resp)
+        if not self._can_retry(method, retry, elapsed, delay):
+            return None
+        return delay
+
+    def retry_exception(self, method, exc, retry, elapsed):
+        """Return the delay before retrying a request, or None
+
+        :param str method: the HTTP method of the request
+        :param Exception exc: the error raised sending the request
+        :param int retry: the number of the retry being considered,
+                          starting at 1
+        :param float elapsed: the time in seconds since the first attempt
+        :return: the delay in seconds to wait before the retry, or None if
+                 the request must not be retried
+        """
+        if (not self.retry_connection_errors or
+                not isinstance(exc, CONNECTION_ERRORS)):
+            return None
+        delay = self.get_delay(retry)
+        if not self._can_retry(method, retry, elapsed, delay):
+            return None
+        return delay
@@ -0,0 +1,131 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Token cache shared on disk by the processes of a test run
+
+When the cache is enabled with `enable`, the Keystone auth providers look
+for a valid token in it before requesting a new one, so that parallel test
+workers using the same credentials share a single token. Tempest enables it
+when ``[auth] token_cache_dir`` is set.
+
+The cached tokens are stored unencrypted, in files only readable by their
+owner.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from oslo_concurrency import lockutils
+from oslo_log import log as logging
+
+LOG = logging.getLogger(__name__)
+
+_active = {'cache': None}
+
+
+def make_key(*parts):
+    """Return the cache key of a token
+
+    :param parts: JSON serializable values identifying the token, such as
+                  the auth URL, the credentials and the scope. Secrets can
+                  be part of it, only a hash of the parts is stored.
+    """
+    data = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class TokenCache(object):
+    """Tokens stored as one file per key in a directory
+
+    The files are written atomically, and `lock` serializes the processes
+    and threads requesting a token for the same key, so that only one of
+    them gets a new token from Keystone.
+
+    :param str directory: the directory where the tokens are stored. It is
+                          created if it does not exist.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        if not os.path.isdir(directory):
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, 'token-%s.json' % key)
+
+    def lock(self, key):
+        """Return a context manager holding the inter-process lock of key"""
+        return lockutils.lock(key, lock_file_prefix='token-', external=True,
+                              lock_path=self.directory, do_log=False)
+
+    def get(self, key):
+        """Return the cached (token, auth_data) for key, or None"""
+        try:
+            with open(self._path(key)) as fd:
+                entry = json.load(fd)
+            return entry['token'], entry['auth_data']
+        except (IOError, OSError):
+            return None
+        except (ValueError, KeyError, TypeError):
+            LOG.warning('Ignoring the invalid cached token %s', key)
+            return None
+
+    def set(self, key, token, auth_data):
+        """Cache the (token, auth_data) for key"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as tmp_file:
+                json.dump({'token': token, 'auth_data': auth_data}, tmp_file)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def delete(self, key):
+        """Remove the cached token for key, if any"""
+        try:
+            os.unlink(self._path(key))
+        except OSError:
+            pass
+
+
+def enable(directory):
+    """Enable the on-disk token cache for this process
+
+    :param str directory: the directory where the tokens are stored. The
+                          processes using the same directory share their
+                          tokens.
+    :return: the active `TokenCache`
+    """
+    cache = TokenCache(directory)
+    _active['cache'] = cache
+    return cache
+
+
+def disable():
+    """Disable the on-disk token cache for this process
+
+    :return: the `TokenCache` which was active, or None
+    """
+    cache = _active['cache']
+    _active['cache'] = None
+    return cache
+
+
+def get_cache():
+    """Return the active `TokenCache`, or None if the cache is disabled"""
+    return _active['cache']
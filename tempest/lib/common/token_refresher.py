@@ -0,0 +1,138 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Renewal of the Keystone tokens in a background thread
+
+Without it, the token of an auth provider is renewed by the first request
+made once it is about to expire, which then waits for Keystone. When the
+refresher is enabled with `enable`, the tokens of the auth providers in use
+are renewed ahead of time by a daemon thread instead. Tempest enables it
+when ``[auth] token_refresh_margin`` is set.
+"""
+
+import datetime
+import threading
+import time
+import weakref
+
+from oslo_log import log as logging
+
+LOG = logging.getLogger(__name__)
+
+_active = {'refresher': None}
+
+
+class TokenRefresher(object):
+    """Renew the tokens of the active auth providers before they expire
+
+    Auth providers are tracked with `touch`, which the Keystone auth
+    providers call each time their auth data is used. Only weak references
+    to them are kept.
+
+    :param float margin: time in seconds before a token is considered
+                         expired by its auth provider when it is renewed
+    :param float interval: time in seconds between two checks of the tokens
+    :param float idle_timeout: time in seconds after which the tokens of an
+                               auth provider which was not used anymore are
+                               not renewed
+    """
+
+    def __init__(self, margin, interval=5, idle_timeout=600):
+        self.margin = datetime.timedelta(seconds=margin)
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._last_used = weakref.WeakKeyDictionary()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def touch(self, auth_provider):
+        """Record that the auth data of auth_provider is being used"""
+        with self._lock:
+            self._last_used[auth_provider] = time.time()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='token-refresher')
+                self._thread.daemon = True
+                self._thread.start()
+
+    def _expires_soon(self, auth_provider, auth_data):
+        expiry = auth_provider.get_expiry(auth_data)
+        return (expiry - auth_provider.token_expiry_threshold - self.margin <=
+                datetime.datetime.utcnow())
+
+    def refresh(self):
+        """Renew the tokens about to expire of the active auth providers"""
+        now = time.time()
+        with self._lock:
+            active = [provider for provider, last_used
+                      in list(self._last_used.items())
+                      if now - last_used < self.idle_timeout]
+        for provider in active:
+            auth_data = provider.cache
+            try:
+                if (auth_data is not None and
+                        self._expires_soon(provider, auth_data)):
+                    LOG.debug('Renewing the token of %s before it expires',
+                              provider.credentials)
+                    provider.renew_auth(auth_data)
+            except Exception:
+                # The request path will raise the error if it is persistent,
+                # e.g. the credentials were deleted. Stop tracking them.
+                LOG.warning('Failed to renew the token of %s',
+                            provider.credentials, exc_info=True)
+                with self._lock:
+                    self._last_used.pop(provider, None)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.refresh()
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def enable(margin, interval=5):
+    """Renew the tokens in a background thread
+
+    :param float margin: time in seconds before a token is considered
+                         expired by its auth provider when it is renewed
+    :param float interval: time in seconds between two checks of the tokens
+    :return: the active `TokenRefresher`
+    """
+    disable()
+    refresher = TokenRefresher(margin, interval=interval)
+    _active['refresher'] = refresher
+    return refresher
+
+
+def disable():
+    """Stop renewing the tokens in a background thread
+
+    :return: the `TokenRefresher` which was active, or None
+    """
+    refresher = _active['refresher']
+    _active['refresher'] = None
+    if refresher is not None:
+        refresher.stop()
+    return refresher
+
+
+def get_refresher():
+    """Return the active `TokenRefresher`, or None if it is disabled"""
+    return _active['refresher']
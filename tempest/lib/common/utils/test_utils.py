@@ -12,26 +12,114 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+import contextlib
+import functools
 import inspect
 import re
+import threading
 import time
 
 from oslo_log import log as logging
 
 from tempest.lib import exceptions
 
+try:
+    import contextvars
+except ImportError:  # Python 3.6
+    contextvars = None
+
 LOG = logging.getLogger(__name__)
 
 
+class _ThreadLocalVar(threading.local):
+    """Minimal stand-in for contextvars.ContextVar on Python 3.6"""
+
+    value = None
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        token = self.value
+        self.value = value
+        return token
+
+    def reset(self, token):
+        self.value = token
+
+
+if contextvars is not None:
+    _test_caller = contextvars.ContextVar('tempest_test_caller',
+                                          default=None)
+else:
+    _test_caller = _ThreadLocalVar()
+
+
+def set_test_caller(caller_name):
+    """Publish the caller name returned by find_test_caller
+
+    The test base classes call this when entering a test, setUpClass or
+    tearDownClass, so that find_test_caller does not need to walk the call
+    stack on every API request. The value is local to the current thread
+    and asyncio task.
+
+    :param str caller_name: the caller name, in the "Class:method" format
+    :return: a token to pass to reset_test_caller
+    """
+    return _test_caller.set(caller_name)
+
+
+def reset_test_caller(token):
+    """Restore the caller name in place before set_test_caller
+
+    :param token: the value returned by set_test_caller
+    """
+    _test_caller.reset(token)
+
+
+@contextlib.contextmanager
+def test_caller_context(caller_name):
+    """Context manager publishing caller_name while its block runs"""
+    token = set_test_caller(caller_name)
+    try:
+        yield
+    finally:
+        reset_test_caller(token)
+
+
+def bind_test_caller(func):
+    """Bind func to the caller name published in the current context
+
+    New threads do not inherit the context of the thread starting them, so
+    callables submitted to a thread pool should be wrapped with this for
+    their API requests to be logged with the right caller.
+
+    :param func: the callable to bind
+    :return: a callable running func with the current caller name published
+    """
+    caller_name = _test_caller.get()
+    if caller_name is None:
+        return func
+
+    @functools.wraps(func)
+    def _bound(*args, **kwargs):
+        with test_caller_context(caller_name):
+            return func(*args, **kwargs)
+    return _bound
+
+
 def find_test_caller():
     """Find the caller class and test name.
 
-    Because we know that the interesting things that call us are
-    test_* methods, and various kinds of setUp / tearDown, we
+    The name published with set_test_caller is returned when there is one.
+    Otherwise, because we know that the interesting things that call us
+    are test_* methods, and various kinds of setUp / tearDown, we
     can look through the call stack to find appropriate methods,
     and the class we were in when those were called.
     """
-    caller_name = None
+    caller_name = _test_caller.get()
+    if caller_name is not None:
+        return caller_name
     names = []
     frame = inspect.currentframe()
     is_cleanup = False
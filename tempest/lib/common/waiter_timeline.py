@@ -0,0 +1,318 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Timelines of the state transitions observed by the waiters
+
+When enabled with `enable`, the waiters decorated with `recorded` record the
+states a resource went through while they waited for it, as reported with
+`observe`: each change of its status (and task state for servers) with the
+time it was observed, the number of polls and the outcome of the wait. The
+timelines recorded during a test are attached to its results, and each test
+worker dumps all its timelines as JSON in the directory set in the
+``TEMPEST_WAITER_TIMELINE_DIR`` environment variable when it exits.
+``tempest run --waiter-timeline`` merges the dumps of all the workers and
+summarizes the time spent in each state.
+"""
+
+import collections
+import functools
+import glob
+import json
+import os
+import threading
+import time
+
+from tempest.lib.common.utils import test_utils
+from tempest.lib import exceptions
+
+# Environment variable set to the directory where workers dump timelines
+DUMP_DIR_ENV = 'TEMPEST_WAITER_TIMELINE_DIR'
+DUMP_FILE_PATTERN = 'waiter-timeline-*.json'
+
+_active = {'collector': None}
+
+# The recorders of the waiters running in each thread
+_running = threading.local()
+
+
+class Recorder(object):
+    """Timeline of the states of a resource observed by a waiter
+
+    Nothing is recorded when no `TimelineCollector` is active when the
+    recorder is created.
+
+    :param str resource_type: the type of the resource, e.g. 'server'
+    :param str resource_id: the ID of the resource
+    :param float start: the time the wait started, now by default
+    """
+
+    def __init__(self, resource_type, resource_id, start=None):
+        self.resource_type = resource_type
+        self.resource_id = resource_id
+        self.collector = get_collector()
+        self.polls = 0
+        self.transitions = []
+        if self.collector is not None:
+            self.caller = test_utils.find_test_caller()
+            self.start = time.time() if start is None else start
+
+    def observe(self, status, task_state=None):
+        """Record a poll of the resource, and its state if it changed"""
+        if self.collector is None:
+            return
+        self.polls += 1
+        if (self.transitions and
+                (self.transitions[-1]['status'],
+                 self.transitions[-1]['task_state']) == (status, task_state)):
+            return
+        self.transitions.append({'time': time.time() - self.start,
+                                 'status': status,
+                                 'task_state': task_state})
+
+    def finish(self, outcome):
+        """Add the timeline to the collector
+
+        :param str outcome: how the wait ended: 'reached', 'timeout' or
+                            'error'
+        """
+        if self.collector is None:
+            return
+        self.collector.add({'resource_type': self.resource_type,
+                            'resource_id': self.resource_id,
+                            'caller': self.caller,
+                            'start': self.start,
+                            'duration': time.time() - self.start,
+                            'polls': self.polls,
+                            'outcome': outcome,
+                            'transitions': self.transitions})
+
+
+def _outcome(exc_type):
+    if exc_type is None:
+        return 'reached'
+    if issubclass(exc_type, exceptions.TimeoutException):
+        return 'timeout'
+    return 'error'
+
+
+class _WaiterRecorders(object):
+    """The recorders of the resources observed by a running waiter"""
+
+    def __init__(self):
+        self.start = time.time()
+        self.recorders = collections.OrderedDict()
+
+    def get(self, resource_type, resource_id):
+        key = (resource_type, resource_id)
+        if key not in self.recorders:
+            self.recorders[key] = Recorder(resource_type, resource_id,
+                                           start=self.start)
+        return self.recorders[key]
+
+    def finish(self, outcome):
+        for recorder in self.recorders.values():
+            recorder.finish(outcome)
+
+
+def recorded(waiter):
+    """Decorator recording the timelines of the resources a waiter observes
+
+    The waiter reports each state it polls with `observe`. The timelines
+    are added to the active collector when the waiter returns or raises,
+    with the outcome of the wait. The waiter is called as is when recording
+    is disabled.
+    """
+    @functools.wraps(waiter)
+    def _recorded(*args, **kwargs):
+        if get_collector() is None:
+            return waiter(*args, **kwargs)
+        stack = _running.__dict__.setdefault('stack', [])
+        recorders = _WaiterRecorders()
+        stack.append(recorders)
+        try:
+            result = waiter(*args, **kwargs)
+        except BaseException as e:
+            recorders.finish(_outcome(type(e)))
+            raise
+        finally:
+            stack.pop()
+        recorders.finish(_outcome(None))
+        return result
+    return _recorded
+
+
+def observe(resource_type, resource_id, status, task_state=None):
+    """Record a poll of a resource by the running waiter
+
+    Nothing is recorded outside of a waiter decorated with `recorded`, or
+    when recording is disabled.
+
+    :param str resource_type: the type of the resource, e.g. 'server'
+    :param str resource_id: the ID of the resource
+    :param str status: the status of the resource
+    :param str task_state: the task state of the resource, if any
+    """
+    stack = getattr(_running, 'stack', None)
+    if stack:
+        stack[-1].get(resource_type, resource_id).observe(status, task_state)
+
+
+def get_state_durations(timeline):
+    """Return the time spent in each state of a timeline
+
+    The last state observed is left out, since the waiter stopped watching
+    the resource when it was reached.
+
+    :param dict timeline: a timeline recorded by a `Recorder`
+    :return: a list of (state, seconds) tuples, where the state is the
+             status, followed by the task state if any
+    """
+    durations = []
+    transitions = timeline['transitions']
+    for current, following in zip(transitions, transitions[1:]):
+        state = current['status']
+        if current['task_state'] is not None:
+            state = '%s/%s' % (state, current['task_state'])
+        durations.append((state, following['time'] - current['time']))
+    return durations
+
+
+class TimelineCollector(object):
+    """Timelines recorded by the waiters
+
+    Instances are safe to use from several threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timelines = []
+
+    def add(self, timeline):
+        """Add a timeline, as recorded by a `Recorder`"""
+        with self._lock:
+            self._timelines.append(timeline)
+
+    def mark(self):
+        """Return a marker to get the timelines recorded after this call"""
+        with self._lock:
+            return len(self._timelines)
+
+    def to_list(self, since=0):
+        """Return the timelines as a list of JSON serializable dicts
+
+        :param int since: a marker returned by `mark`, to only return the
+                          timelines recorded after it
+        """
+        with self._lock:
+            return list(self._timelines[since:])
+
+    def dump(self, path):
+        """Write the timelines as JSON to path"""
+        with open(path, 'w') as f:
+            json.dump({'timelines': self.to_list()}, f, indent=2,
+                      sort_keys=True)
+
+    @classmethod
+    def load(cls, paths):
+        """Create a collector with the timelines of JSON dumps
+
+        :param list paths: the paths of files written by `dump`
+        """
+        collector = cls()
+        for path in paths:
+            with open(path) as f:
+                for timeline in json.load(f)['timelines']:
+                    collector.add(timeline)
+        return collector
+
+    def get_summary(self):
+        """Return statistics of the time spent in each state
+
+        :return: a list of dicts with the resource_type, state, count,
+                 total_time and max_time of each state, sorted by total time
+                 spent, longest first
+        """
+        stats = {}
+        for timeline in self.to_list():
+            for state, secs in get_state_durations(timeline):
+                key = (timeline['resource_type'], state)
+                entry = stats.setdefault(key, {
+                    'resource_type': key[0], 'state': key[1], 'count': 0,
+                    'total_time': 0.0, 'max_time': 0.0})
+                entry['count'] += 1
+                entry['total_time'] += secs
+                entry['max_time'] = max(entry['max_time'], secs)
+        return sorted(stats.values(), key=lambda e: e['total_time'],
+                      reverse=True)
+
+    def format_summary(self, limit=10):
+        """Return a text table of the states where most time was spent
+
+        :param int limit: the maximum number of states listed
+        """
+        lines = ['%-10s %-40s %6s %8s %8s %8s' % (
+            'Type', 'State', 'Count', 'Total', 'Mean', 'Max')]
+        for entry in self.get_summary()[:limit]:
+            lines.append('%-10s %-40s %6d %7.1fs %7.2fs %7.2fs' % (
+                entry['resource_type'], entry['state'], entry['count'],
+                entry['total_time'], entry['total_time'] / entry['count'],
+                entry['max_time']))
+        return '\n'.join(lines)
+
+
+def enable():
+    """Start recording the timelines of the waiters
+
+    :return: the active `TimelineCollector`
+    """
+    if _active['collector'] is None:
+        _active['collector'] = TimelineCollector()
+    return _active['collector']
+
+
+def disable():
+    """Stop recording the timelines of the waiters
+
+    :return: the `TimelineCollector` which was active, or None
+    """
+    collector = _active['collector']
+    _active['collector'] = None
+    return collector
+
+
+def get_collector():
+    """Return the active `TimelineCollector`, or None if it is disabled"""
+    return _active['collector']
+
+
+def dump_to_dir(directory):
+    """Dump the active timelines in directory, in a file unique to the process
+
+    Nothing is written if recording is disabled or no timeline was recorded.
+    """
+    collector = get_collector()
+    if collector is None or not collector.to_list():
+        return
+    collector.dump(os.path.join(
+        directory, DUMP_FILE_PATTERN.replace('*', str(os.getpid()))))
+
+
+def load_dir(directory):
+    """Merge the timelines dumped in directory by `dump_to_dir`
+
+    :rtype: TimelineCollector
+    """
+    return TimelineCollector.load(
+        sorted(glob.glob(os.path.join(directory, DUMP_FILE_PATTERN))))
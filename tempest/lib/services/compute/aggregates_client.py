@@ -13,12 +13,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from oslo_serialization import jsonutils as json
-
 from tempest.lib.api_schema.response.compute.v2_1 \
     import aggregates as schema
 from tempest.lib.api_schema.response.compute.v2_41 \
     import aggregates as schemav241
+from tempest.lib.common import json_codec as json
 from tempest.lib.common import rest_client
 from tempest.lib import exceptions as lib_exc
 from tempest.lib.services.compute import base_compute_client
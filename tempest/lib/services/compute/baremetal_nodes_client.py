@@ -12,11 +12,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from oslo_serialization import jsonutils as json
 from six.moves.urllib import parse as urllib
 
 from tempest.lib.api_schema.response.compute.v2_1 import baremetal_nodes \
     as schema
+from tempest.lib.common import json_codec as json
 from tempest.lib.common import rest_client
 from tempest.lib.services.compute import base_compute_client
 
@@ -13,7 +13,6 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from oslo_serialization import jsonutils as json
 from six.moves.urllib import parse as urllib
 
 from tempest.lib.api_schema.response.compute.v2_1 import flavors as schema
@@ -25,6 +24,7 @@ from tempest.lib.api_schema.response.compute.v2_55 import flavors \
     as schemav255
 from tempest.lib.api_schema.response.compute.v2_61 import flavors \
     as schemav261
+from tempest.lib.common import json_codec as json
 from tempest.lib.common import rest_client
 from tempest.lib.services.compute import base_compute_client
 
@@ -59,14 +59,18 @@ class FlavorsClient(base_compute_client.BaseComputeClient):
         self.validate_response(_schema, resp, body)
         return rest_client.ResponseBody(resp, body)
 
-    def show_flavor(self, flavor_id):
+    def show_flavor(self, flavor_id, cache=False):
         """Shows details for a flavor.
 
         For a full list of available parameters, please refer to the official
         API reference:
         https://docs.openstack.org/api-ref/compute/#show-flavor-details
+
+        :param bool cache: allow the response to be served from the response
+                           cache. Only for flavors which are not modified or
+                           deleted during the run.
         """
-        resp, body = self.get("flavors/%s" % flavor_id)
+        resp, body = self.get("flavors/%s" % flavor_id, cache=cache)
         body = json.loads(body)
         schema = self.get_schema(self.schema_versions_info)
         self.validate_response(schema.create_update_get_flavor_details,
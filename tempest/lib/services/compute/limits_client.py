@@ -13,12 +13,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from oslo_serialization import jsonutils as json
-
 from tempest.lib.api_schema.response.compute.v2_1 import limits as schemav21
 from tempest.lib.api_schema.response.compute.v2_36 import limits as schemav236
 from tempest.lib.api_schema.response.compute.v2_39 import limits as schemav239
 from tempest.lib.api_schema.response.compute.v2_57 import limits as schemav257
+from tempest.lib.common import json_codec as json
 from tempest.lib.common import rest_client
 from tempest.lib.services.compute import base_compute_client
 
@@ -10,9 +10,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from oslo_serialization import jsonutils as json
 from six.moves.urllib import parse as urllib
 
+from tempest.lib.common import json_codec as json
 from tempest.lib.common import rest_client
 
 
@@ -42,7 +42,7 @@ class IdentityClient(rest_client.RestClient):
 
     def list_extensions(self):
         """List all the extensions."""
-        resp, body = self.get('/extensions')
+        resp, body = self.get('/extensions', cache=True)
         self.expected_success(200, resp.status)
         body = json.loads(body)
         return rest_client.ResponseBody(resp, body)
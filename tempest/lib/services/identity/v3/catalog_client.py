@@ -14,8 +14,7 @@
 https://docs.openstack.org/api-ref/identity/v3/index.html#get-service-catalog
 """
 
-from oslo_serialization import jsonutils as json
-
+from tempest.lib.common import json_codec as json
 from tempest.lib.common import rest_client
 
 
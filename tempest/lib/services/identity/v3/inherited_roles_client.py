@@ -12,8 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from oslo_serialization import jsonutils as json
-
+from tempest.lib.common import json_codec as json
 from tempest.lib.common import rest_client
 
 
@@ -22,8 +22,7 @@ import time
 import six
 from six.moves.urllib import parse as urlparse
 
-from oslo_serialization import jsonutils as json
-
+from tempest.lib.common import json_codec as json
 from tempest.lib.common import rest_client
 
 
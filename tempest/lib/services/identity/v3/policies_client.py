@@ -17,8 +17,7 @@
 https://docs.openstack.org/api-ref/identity/v3/index.html#policies
 """
 
-from oslo_serialization import jsonutils as json
-
+from tempest.lib.common import json_codec as json
 from tempest.lib.common import rest_client
 
 
@@ -15,9 +15,9 @@
 
 import functools
 
-from oslo_serialization import jsonutils as json
 from six.moves.urllib import parse as urllib
 
+from tempest.lib.common import json_codec as json
 from tempest.lib.common import rest_client
 from tempest.lib import exceptions as lib_exc
 
@@ -108,15 +108,19 @@ class ImagesClient(rest_client.RestClient):
         body = json.loads(body)
         return rest_client.ResponseBody(resp, body)
 
-    def show_image(self, image_id):
+    def show_image(self, image_id, cache=False):
         """Show image details.
 
         For a full list of available parameters, please refer to the official
         API reference:
         https://docs.openstack.org/api-ref/image/v2/#show-image
+
+        :param bool cache: allow the response to be served from the response
+                           cache. Only for images which are not modified or
+                           deleted during the run.
         """
         url = 'images/%s' % image_id
-        resp, body = self.get(url)
+        resp, body = self.get(url, cache=cache)
         self.expected_success(200, resp.status)
         body = json.loads(body)
         return rest_client.ResponseBody(resp, body)
@@ -238,16 +242,24 @@ class ImagesClient(rest_client.RestClient):
         self.expected_success(202, resp.status)
         return rest_client.ResponseBody(resp)
 
-    def show_image_file(self, image_id):
+    def show_image_file(self, image_id, stream=False):
         """Download binary image data.
 
         For a full list of available parameters, please refer to the official
         API reference:
         https://docs.openstack.org/api-ref/image/v2/#download-binary-image-data
+
+        :param stream: do not load the image data in memory. The data can
+                       then be read in chunks from the returned object.
         """
         url = 'images/%s/file' % image_id
-        resp, body = self.get(url)
+        if stream:
+            resp, body = self.get(url, stream=True)
+        else:
+            resp, body = self.get(url)
         self.expected_success([200, 204, 206], resp.status)
+        if isinstance(body, rest_client.ResponseBodyData):
+            return body
         return rest_client.ResponseBodyData(resp, body)
 
     def add_image_tag(self, image_id, tag):
@@ -10,9 +10,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from oslo_serialization import jsonutils as json
 from six.moves.urllib import parse as urllib
 
+from tempest.lib.common import json_codec as json
 from tempest.lib.common import rest_client
 
 
@@ -28,10 +28,19 @@ class BaseNetworkClient(rest_client.RestClient):
     uri_prefix = "v2.0"
 
     def list_resources(self, uri, **filters):
+        return self._list_resources(uri, filters)
+
+    def _list_resources_cached(self, uri, **filters):
+        # Like list_resources, for static resources the response of which
+        # can be served from the response cache
+        return self._list_resources(uri, filters, cache=True)
+
+    def _list_resources(self, uri, filters, **get_kwargs):
+        # get_kwargs are passed to get, e.g. cache=True
         req_uri = self.uri_prefix + uri
         if filters:
             req_uri += '?' + urllib.urlencode(filters, doseq=1)
-        resp, body = self.get(req_uri)
+        resp, body = self.get(req_uri, **get_kwargs)
         body = json.loads(body)
         self.expected_success(200, resp.status)
         return rest_client.ResponseBody(resp, body)
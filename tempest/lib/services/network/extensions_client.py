@@ -33,4 +33,4 @@ class ExtensionsClient(base.BaseNetworkClient):
         https://docs.openstack.org/api-ref/network/v2/index.html#list-extensions
         """
         uri = '/extensions'
-        return self.list_resources(uri, **filters)
+        return self._list_resources_cached(uri, **filters)
@@ -16,9 +16,9 @@
 from xml.etree import ElementTree as etree
 
 import debtcollector.moves
-from oslo_serialization import jsonutils as json
 from six.moves.urllib import parse as urllib
 
+from tempest.lib.common import json_codec as json
 from tempest.lib.common import rest_client
 
 
@@ -71,8 +71,13 @@ class ObjectClient(rest_client.RestClient):
         self.expected_success(200, resp.status)
         return resp, body
 
-    def get_object(self, container, object_name, metadata=None, params=None):
-        """Retrieve object's data."""
+    def get_object(self, container, object_name, metadata=None, params=None,
+                   stream=False):
+        """Retrieve object's data.
+
+        When stream is set, the object data is not loaded in memory, and
+        the returned body is a `ResponseBodyData` to read it from in chunks.
+        """
 
         headers = {}
         if metadata:
@@ -82,7 +87,10 @@ class ObjectClient(rest_client.RestClient):
         url = "{0}/{1}".format(container, object_name)
         if params:
             url += '?%s' % urlparse.urlencode(params)
-        resp, body = self.get(url, headers=headers)
+        if stream:
+            resp, body = self.get(url, headers=headers, stream=True)
+        else:
+            resp, body = self.get(url, headers=headers)
         self.expected_success([200, 206], resp.status)
         return resp, body
 
@@ -13,8 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from oslo_serialization import jsonutils as json
-
+from tempest.lib.common import json_codec as json
 from tempest.lib.common import rest_client
 
 
@@ -23,7 +22,7 @@ class ExtensionsClient(rest_client.RestClient):
 
     def list_extensions(self):
         url = 'extensions'
-        resp, body = self.get(url)
+        resp, body = self.get(url, cache=True)
         body = json.loads(body)
         self.expected_success(200, resp.status)
         return rest_client.ResponseBody(resp, body)
@@ -12,9 +12,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from oslo_serialization import jsonutils
 from six.moves.urllib import parse as urllib
 
+from tempest.lib.common import json_codec as json
 from tempest.lib.common import rest_client
 
 
@@ -27,7 +27,7 @@ class QuotasClient(rest_client.RestClient):
         url = 'os-quota-sets/%s/defaults' % tenant_id
         resp, body = self.get(url)
         self.expected_success(200, resp.status)
-        body = jsonutils.loads(body)
+        body = json.loads(body)
         return rest_client.ResponseBody(resp, body)
 
     def show_quota_set(self, tenant_id, params=None):
@@ -39,7 +39,7 @@ class QuotasClient(rest_client.RestClient):
 
         resp, body = self.get(url)
         self.expected_success(200, resp.status)
-        body = jsonutils.loads(body)
+        body = json.loads(body)
         return rest_client.ResponseBody(resp, body)
 
     def update_quota_set(self, tenant_id, **kwargs):
@@ -49,10 +49,10 @@ class QuotasClient(rest_client.RestClient):
         API reference:
         https://docs.openstack.org/api-ref/block-storage/v2/#update-quotas
         """
-        put_body = jsonutils.dumps({'quota_set': kwargs})
+        put_body = json.dumps({'quota_set': kwargs})
         resp, body = self.put('os-quota-sets/%s' % tenant_id, put_body)
         self.expected_success(200, resp.status)
-        body = jsonutils.loads(body)
+        body = json.loads(body)
         return rest_client.ResponseBody(resp, body)
 
     def delete_quota_set(self, tenant_id):
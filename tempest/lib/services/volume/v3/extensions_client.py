@@ -13,9 +13,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from oslo_serialization import jsonutils as json
-
 from tempest.lib.api_schema.response.volume import extensions as schema
+from tempest.lib.common import json_codec as json
 from tempest.lib.common import rest_client
 
 
@@ -24,7 +23,7 @@ class ExtensionsClient(rest_client.RestClient):
 
     def list_extensions(self):
         url = 'extensions'
-        resp, body = self.get(url)
+        resp, body = self.get(url, cache=True)
         body = json.loads(body)
         self.validate_response(schema.list_extensions, resp, body)
         return rest_client.ResponseBody(resp, body)
@@ -13,9 +13,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from oslo_serialization import jsonutils as json
-
 from tempest.lib.api_schema.response.volume import quota_classes as schema
+from tempest.lib.common import json_codec as json
 from tempest.lib.common import rest_client
 
 
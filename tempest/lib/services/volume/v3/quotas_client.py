@@ -13,10 +13,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-from oslo_serialization import jsonutils
 from six.moves.urllib import parse as urllib
 
 from tempest.lib.api_schema.response.volume import quotas as schema
+from tempest.lib.common import json_codec as json
 from tempest.lib.common import rest_client
 
 
@@ -28,7 +28,7 @@ class QuotasClient(rest_client.RestClient):
 
         url = 'os-quota-sets/%s/defaults' % tenant_id
         resp, body = self.get(url)
-        body = jsonutils.loads(body)
+        body = json.loads(body)
         self.validate_response(schema.show_quota_set, resp, body)
         return rest_client.ResponseBody(resp, body)
 
@@ -40,7 +40,7 @@ class QuotasClient(rest_client.RestClient):
             url += '?%s' % urllib.urlencode(params)
 
         resp, body = self.get(url)
-        body = jsonutils.loads(body)
+        body = json.loads(body)
         if params and params.get('usage', False):
             self.validate_response(schema.show_quota_set_usage, resp, body)
         else:
@@ -54,9 +54,9 @@ class QuotasClient(rest_client.RestClient):
         API reference:
         https://docs.openstack.org/api-ref/block-storage/v3/index.html#update-quotas-for-a-project
         """
-        put_body = jsonutils.dumps({'quota_set': kwargs})
+        put_body = json.dumps({'quota_set': kwargs})
         resp, body = self.put('os-quota-sets/%s' % tenant_id, put_body)
-        body = jsonutils.loads(body)
+        body = json.loads(body)
         self.validate_response(schema.update_quota_set, resp, body)
         return rest_client.ResponseBody(resp, body)
 
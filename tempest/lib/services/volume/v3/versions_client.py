@@ -14,9 +14,8 @@
 
 from six.moves.urllib.parse import urljoin
 
-from oslo_serialization import jsonutils as json
-
 from tempest.lib.api_schema.response.volume import versions as schema
+from tempest.lib.common import json_codec as json
 from tempest.lib.common import rest_client
 from tempest.lib.services.volume import base_client
 
@@ -16,10 +16,11 @@
 import re
 import time
 
-from oslo_serialization import jsonutils as json
 from six.moves.urllib import parse as urllib
 
 from tempest import exceptions
+from tempest.lib.common import json_codec as json
+from tempest.lib.common import polling
 from tempest.lib.common import rest_client
 from tempest.lib import exceptions as lib_exc
 
@@ -155,6 +156,7 @@ class OrchestrationClient(rest_client.RestClient):
                               failure_pattern='^.*_FAILED$'):
         """Waits for a Stack to reach a given status."""
         start = int(time.time())
+        poller = polling.Poller(self.build_interval, self.build_timeout)
         fail_regexp = re.compile(failure_pattern)
 
         while True:
@@ -179,7 +181,7 @@ class OrchestrationClient(rest_client.RestClient):
                            (stack_name, status, stack_status,
                             self.build_timeout))
                 raise lib_exc.TimeoutException(message)
-            time.sleep(self.build_interval)
+            poller.sleep()
 
     def show_resource_metadata(self, stack_identifier, resource_name):
         """Returns the resource's metadata."""
@@ -26,11 +26,16 @@ import testtools
 from tempest import clients
 from tempest.common import credentials_factory as credentials
 from tempest.common import utils
+from tempest.common import waiters
 from tempest import config
 from tempest.lib import base as lib_base
+from tempest.lib.common import api_metrics
 from tempest.lib.common import fixed_network
 from tempest.lib.common import profiler
+from tempest.lib.common import request_log
+from tempest.lib.common.utils import test_utils
 from tempest.lib.common import validation_resources as vr
+from tempest.lib.common import waiter_timeline
 from tempest.lib import decorators
 from tempest.lib import exceptions as lib_exc
 
@@ -77,6 +82,19 @@ def validate_tearDownClass():
 
 atexit.register(validate_tearDownClass)
 
+# Record the metrics of the API requests when run by tempest run --api-metrics
+if os.environ.get(api_metrics.DUMP_DIR_ENV):
+    api_metrics.enable()
+    atexit.register(api_metrics.dump_to_dir,
+                    os.environ[api_metrics.DUMP_DIR_ENV])
+
+# Record the timelines of the waiters when run by tempest run
+# --waiter-timeline
+if os.environ.get(waiter_timeline.DUMP_DIR_ENV):
+    waiter_timeline.enable()
+    atexit.register(waiter_timeline.dump_to_dir,
+                    os.environ[waiter_timeline.DUMP_DIR_ENV])
+
 
 class BaseTestCase(testtools.testcase.WithAttributes,
                    testtools.TestCase):
@@ -161,6 +179,9 @@ class BaseTestCase(testtools.testcase.WithAttributes,
         # The below workaround can be removed once testtools fix issue# 272.
         orig_skip_exception = testtools.TestCase.skipException
         lib_base._handle_skip_exception()
+        caller_token = test_utils.set_test_caller(cls.__name__ + ':setUpClass')
+        if CONF.debug.deferred_request_logging:
+            request_log.start(CONF.debug.deferred_request_log_size)
         try:
             cls.skip_checks()
 
@@ -183,6 +204,7 @@ class BaseTestCase(testtools.testcase.WithAttributes,
             etype, value, trace = sys.exc_info()
             LOG.info("%s raised in %s.setUpClass. Invoking tearDownClass.",
                      etype, cls.__name__)
+            cls._flush_request_log()
             cls.tearDownClass()
             try:
                 six.reraise(etype, value, trace)
@@ -190,12 +212,24 @@ class BaseTestCase(testtools.testcase.WithAttributes,
                 del trace  # to avoid circular refs
         finally:
             testtools.TestCase.skipException = orig_skip_exception
+            test_utils.reset_test_caller(caller_token)
+            request_log.stop()
 
     @classmethod
     def tearDownClass(cls):
         # insert pdb breakpoint when pause_teardown is enabled
         if CONF.pause_teardown:
             cls.insert_pdb_breakpoint()
+        with test_utils.test_caller_context(cls.__name__ + ':tearDownClass'):
+            if CONF.debug.deferred_request_logging:
+                request_log.start(CONF.debug.deferred_request_log_size)
+            try:
+                cls._tear_down_class()
+            finally:
+                request_log.stop()
+
+    @classmethod
+    def _tear_down_class(cls):
         at_exit_set.discard(cls)
         # It should never be overridden by descendants
         if hasattr(super(BaseTestCase, cls), 'tearDownClass'):
@@ -235,6 +269,8 @@ class BaseTestCase(testtools.testcase.WithAttributes,
                     LOG.exception("teardown of %s failed: %s", name, te)
                 if not etype:
                     etype, value, trace = sys_exec_info
+        if etype is not None:
+            cls._flush_request_log()
         # If exceptions were raised during teardown, and not before, re-raise
         # the first one
         if re_raise and etype is not None:
@@ -243,6 +279,30 @@ class BaseTestCase(testtools.testcase.WithAttributes,
             finally:
                 del trace  # to avoid circular refs
 
+    @staticmethod
+    def _flush_request_log():
+        """Log the API requests kept in the request log buffer, if any"""
+        buf = request_log.get_buffer()
+        if buf is not None:
+            buf.flush()
+
+    def _attach_request_log(self, exc_info):
+        """Attach the API requests of a failed test to its results"""
+        buf = request_log.get_buffer()
+        if (buf is None or not len(buf) or
+                issubclass(exc_info[0], self.skipException)):
+            return
+        self.addDetailUniqueName(
+            'request-log', testtools.content.text_content(buf.format()))
+        buf.flush()
+
+    def _attach_waiter_timeline(self, timelines, marker):
+        """Attach the timelines recorded by the waiters to the results"""
+        recorded = timelines.to_list(since=marker)
+        if recorded:
+            self.addDetailUniqueName(
+                'waiter-timeline', testtools.content.json_content(recorded))
+
     def tearDown(self):
         super(BaseTestCase, self).tearDown()
         # insert pdb breakpoint when pause_teardown is enabled
@@ -603,6 +663,26 @@ class BaseTestCase(testtools.testcase.WithAttributes,
 
     def setUp(self):
         super(BaseTestCase, self).setUp()
+        caller_name = '%s:%s' % (self.__class__.__name__,
+                                 self._testMethodName)
+        caller_token = test_utils.set_test_caller(caller_name)
+        self.addCleanup(test_utils.reset_test_caller, caller_token)
+        # Runs after the cleanups of the test, so that no waiter it left
+        # running in the background keeps polling once it is over. They are
+        # only given a few polls to complete rather than their whole
+        # timeout, the resources they poll are deleted by then.
+        self.addCleanup(waiters.cancel_futures, caller_name,
+                        timeout=CONF.compute.build_interval * 3)
+        if CONF.debug.deferred_request_logging:
+            request_log.start(CONF.debug.deferred_request_log_size)
+            self.addCleanup(request_log.stop)
+            self.addOnException(self._attach_request_log)
+        timelines = waiter_timeline.get_collector()
+        if timelines is not None:
+            # Runs after the cleanups of the test, so that the waits for
+            # the deletion of its resources are included
+            self.addCleanup(self._attach_waiter_timeline, timelines,
+                            timelines.mark())
         if not self.__setupclass_called:
             raise RuntimeError("setUpClass does not calls the super's "
                                "setUpClass in the " +
@@ -658,7 +738,8 @@ class BaseTestCase(testtools.testcase.WithAttributes,
 
             cls._creds_provider = credentials.get_credentials_provider(
                 name=cls.__name__, network_resources=cls._network_resources,
-                force_tenant_isolation=force_tenant_isolation)
+                force_tenant_isolation=force_tenant_isolation,
+                use_credential_pool=True)
         return cls._creds_provider
 
     @classmethod
@@ -12,6 +12,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import os
+import shutil
+import tempfile
 from unittest import mock
 
 import fixtures
@@ -32,7 +35,10 @@ class FakeOpts(object):
         self.os_domain_name = 'fake_domain'
         self.tag = 'fake'
         self.concurrency = 2
+        self.workers = 2
         self.with_admin = True
+        self.admin = False
+        self.resume = False
         self.identity_version = version
         self.accounts = 'fake_accounts.yml'
 
@@ -239,6 +245,30 @@ class TestGenerateResourcesV2(base.TestCase, MockHelpersMixin):
             self.assertIsNotNone(resource[1].router)
             self.assertIsNotNone(resource[1].subnet)
 
+    def test_provision_resources(self):
+        cfg.CONF.set_default('swift', False, group='service_available')
+        resources, error = account_generator.provision_resources(
+            self.opts, [['primary', 'alt'], ['alt']])
+        self.assertIsNone(error)
+        self.assertEqual(['primary', 'alt', 'alt'],
+                         [k for k, _ in resources])
+        self.assertEqual(3, self.user_create_fixture.mock.call_count)
+        # Each group has its own credential provider
+        self.assertIsNot(resources[1][1], resources[2][1])
+
+    def test_provision_resources_failure(self):
+        cfg.CONF.set_default('swift', False, group='service_available')
+        error = Exception('fake error')
+        self.user_create_fixture.mock.side_effect = [
+            error, dict(id='id', name='name')]
+        self.opts.workers = 1
+        account_generator.setup_logging()
+        resources, raised = account_generator.provision_resources(
+            self.opts, [['primary'], ['alt']])
+        self.assertIs(error, raised)
+        # The other groups are still provisioned
+        self.assertEqual(['alt'], [k for k, _ in resources])
+
 
 class TestGenerateResourcesV3(TestGenerateResourcesV2):
 
@@ -327,6 +357,24 @@ class TestDumpAccountsV2(base.TestCase, MockHelpersMixin):
             self.assertIn('resources', account)
             self.assertIn('network', account.get('resources'))
 
+    def test_dump_accounts_existing_accounts(self):
+        self.useFixture(fixtures.MockPatch('os.path.exists',
+                                           return_value=False))
+        existing_accounts = [{'username': 'existing',
+                              'project_name': 'existing',
+                              'password': 'password'}]
+        mocked_open = mock.mock_open()
+        with mock.patch('{}.open'.format(account_generator.__name__),
+                        mocked_open, create=True):
+            with mock.patch('yaml.safe_dump') as yaml_dump_mock:
+                account_generator.setup_logging()
+                account_generator.dump_accounts(
+                    self.resources, self.opts.identity_version,
+                    self.opts.accounts, existing_accounts=existing_accounts)
+        accounts, f = yaml_dump_mock.call_args[0]
+        self.assertEqual(6, len(accounts))
+        self.assertEqual(existing_accounts[0], accounts[0])
+
 
 class TestDumpAccountsV3(TestDumpAccountsV2):
 
@@ -353,8 +401,59 @@ class TestAccountGeneratorCliCheck(base.TestCase):
                 ['-r', '0', 'accounts_file.yaml']))
         self.assertTrue(error.code != 0)
 
+    def test_account_generator_zero_workers(self):
+        error = self.assertRaises(
+            SystemExit, lambda: self.parser.parse_args(
+                ['-w', '0', 'accounts_file.yaml']))
+        self.assertTrue(error.code != 0)
+
+    def test_account_generator_workers_resume(self):
+        args = self.parser.parse_args(
+            ['-w', '4', '--resume', 'accounts_file.yaml'])
+        self.assertEqual(4, args.workers)
+        self.assertTrue(args.resume)
+
     def test_account_generator_negative_concurrency(self):
         error = self.assertRaises(
             SystemExit, lambda: self.parser.parse_args(
                 ['-r', '-1', 'accounts_file.yaml']))
         self.assertTrue(error.code != 0)
+
+
+class TestMissingSpecs(base.TestCase):
+
+    spec = ['primary', 'alt', ['operator'], 'admin']
+
+    def test_no_accounts(self):
+        self.assertEqual(
+            [self.spec] * 3,
+            account_generator.get_missing_specs([], self.spec, 3))
+
+    def test_complete(self):
+        accounts = [{'username': 'primary'}, {'username': 'alt'},
+                    {'username': 'operator', 'roles': ['operator']},
+                    {'username': 'admin', 'types': ['admin']}]
+        self.assertEqual(
+            [], account_generator.get_missing_specs(accounts, self.spec, 1))
+        self.assertEqual(
+            [self.spec],
+            account_generator.get_missing_specs(accounts, self.spec, 2))
+
+    def test_partial(self):
+        accounts = [{'username': 'primary'},
+                    {'username': 'operator', 'roles': ['operator']},
+                    {'username': 'other', 'roles': ['other']},
+                    {'username': 'operator2', 'roles': ['operator']}]
+        self.assertEqual(
+            [['alt', 'admin'], ['primary', 'alt', 'admin']],
+            account_generator.get_missing_specs(accounts, self.spec, 2))
+
+    def test_load_accounts(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        accounts_file = os.path.join(directory, 'accounts.yaml')
+        self.assertEqual([], account_generator.load_accounts(accounts_file))
+        with open(accounts_file, 'w') as f:
+            f.write('- username: fake\n')
+        self.assertEqual([{'username': 'fake'}],
+                         account_generator.load_accounts(accounts_file))
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import threading
 from unittest import mock
 
 from tempest.cmd import cleanup
@@ -40,3 +41,73 @@ class TestTempestCleanup(base.TestCase):
             self.assertEqual(str(exc), '[\'exception\']')
             return
         assert False
+
+
+class FakeService(object):
+
+    def __init__(self, manager, **kwargs):
+        self.kwargs = kwargs
+
+    def run(self):
+        if self.kwargs['is_dry_run']:
+            self.kwargs['data']['servers'] = {
+                'server-' + self.kwargs['project_id']: 'server'}
+        self.kwargs['got_exceptions'].append(self.kwargs['project_id'])
+
+
+class FailingService(FakeService):
+
+    def run(self):
+        raise ValueError(self.kwargs['project_id'])
+
+
+class TestTempestCleanupProjects(base.TestCase):
+
+    def setUp(self):
+        super(TestTempestCleanupProjects, self).setUp()
+        self.cleanup = cleanup.TempestCleanup(mock.Mock(), None, 'test')
+        self.cleanup.options = mock.Mock(dry_run=True, concurrency=4,
+                                         delete_tempest_conf_objects=False)
+        self.cleanup._lock = threading.Lock()
+        self.cleanup.admin_mgr = mock.Mock()
+        self.cleanup.json_data = {}
+        self.cleanup.dry_run_data = {'_projects_to_clean': {}}
+        self.cleanup.GOT_EXCEPTIONS = []
+        self.cleanup.project_associated_services = [FakeService]
+        self.projects = [{'id': str(i), 'name': 'project-%d' % i}
+                         for i in range(10)]
+
+    def test_clean_projects_concurrently(self):
+        self.cleanup._clean_projects(self.projects)
+        expected = dict((str(i), {'name': 'project-%d' % i,
+                                  'servers': {'server-%d' % i: 'server'}})
+                        for i in range(10))
+        self.assertEqual(expected,
+                         self.cleanup.dry_run_data['_projects_to_clean'])
+        self.assertEqual(sorted(str(i) for i in range(10)),
+                         sorted(self.cleanup.GOT_EXCEPTIONS))
+
+    def test_clean_projects_serially(self):
+        self.cleanup.options.concurrency = 1
+        self.cleanup._clean_projects(self.projects)
+        self.assertEqual([str(i) for i in range(10)],
+                         self.cleanup.GOT_EXCEPTIONS)
+
+    def test_clean_projects_not_dry_run(self):
+        self.cleanup.options.dry_run = False
+        self.cleanup._clean_projects(self.projects)
+        self.assertEqual({}, self.cleanup.dry_run_data['_projects_to_clean'])
+        self.assertEqual(10, len(self.cleanup.GOT_EXCEPTIONS))
+
+    def test_clean_projects_failure(self):
+        self.cleanup.project_associated_services = [FailingService]
+        self.assertRaises(ValueError, self.cleanup._clean_projects,
+                          self.projects)
+
+    def test_concurrency_option(self):
+        parser = self.cleanup.get_parser('cleanup')
+        self.assertEqual(1, parser.parse_args([]).concurrency)
+        self.assertEqual(8, parser.parse_args(
+            ['--concurrency', '8']).concurrency)
+        self.assertRaises(SystemExit, parser.parse_args,
+                          ['--concurrency', '0'])
@@ -26,6 +26,8 @@ import six
 from tempest.cmd import run
 from tempest.cmd import workspace
 from tempest import config
+from tempest.lib.common import api_metrics
+from tempest.lib.common import waiter_timeline
 from tempest.lib.common.utils import data_utils
 from tempest.tests import base
 
@@ -349,6 +351,69 @@ class TestTakeAction(base.TestCase):
             self.assertEqual(0, tempest_run.take_action(parsed_args))
             m.assert_called()
 
+    def test_api_metrics(self):
+        self._setup_test_dirs()
+        _, path = tempfile.mkstemp()
+        self.addCleanup(os.remove, path)
+        metrics_path = os.path.join(self.directory, 'metrics.json')
+        tempest_run = run.TempestRun(app=mock.Mock(), app_args=mock.Mock())
+        parsed_args = mock.Mock()
+
+        parsed_args.workspace = None
+        parsed_args.state = None
+        parsed_args.list_tests = False
+        parsed_args.config_file = path
+        parsed_args.api_metrics = metrics_path
+
+        def _run_workers(**kwargs):
+            # Each worker dumps its metrics
+            metrics_dir = os.environ[api_metrics.DUMP_DIR_ENV]
+            for worker in range(2):
+                metrics = api_metrics.APIMetrics()
+                metrics.record('compute', 'GET', '/servers', 200, 0.1)
+                metrics.dump(os.path.join(
+                    metrics_dir, 'api-metrics-%d.json' % worker))
+            return 0
+
+        with mock.patch('stestr.commands.run_command',
+                        side_effect=_run_workers):
+            self.assertEqual(0, tempest_run.take_action(parsed_args))
+        self.assertNotIn(api_metrics.DUMP_DIR_ENV, os.environ)
+        merged = api_metrics.APIMetrics.load([metrics_path])
+        self.assertEqual(2, merged.to_list()[0]['count'])
+
+    def test_waiter_timeline(self):
+        self._setup_test_dirs()
+        _, path = tempfile.mkstemp()
+        self.addCleanup(os.remove, path)
+        timeline_path = os.path.join(self.directory, 'timeline.json')
+        tempest_run = run.TempestRun(app=mock.Mock(), app_args=mock.Mock())
+        parsed_args = mock.Mock()
+
+        parsed_args.workspace = None
+        parsed_args.state = None
+        parsed_args.list_tests = False
+        parsed_args.config_file = path
+        parsed_args.api_metrics = None
+        parsed_args.waiter_timeline = timeline_path
+
+        def _run_workers(**kwargs):
+            # Each worker dumps its timelines
+            timeline_dir = os.environ[waiter_timeline.DUMP_DIR_ENV]
+            for worker in range(2):
+                timelines = waiter_timeline.TimelineCollector()
+                timelines.add({'resource_type': 'server', 'transitions': []})
+                timelines.dump(os.path.join(
+                    timeline_dir, 'waiter-timeline-%d.json' % worker))
+            return 0
+
+        with mock.patch('stestr.commands.run_command',
+                        side_effect=_run_workers):
+            self.assertEqual(0, tempest_run.take_action(parsed_args))
+        self.assertNotIn(waiter_timeline.DUMP_DIR_ENV, os.environ)
+        merged = waiter_timeline.TimelineCollector.load([timeline_path])
+        self.assertEqual(2, len(merged.to_list()))
+
     def test_no_config_file_no_workspace_no_state(self):
         self._setup_test_dirs()
         tempest_run = run.TempestRun(app=mock.Mock(), app_args=mock.Mock())
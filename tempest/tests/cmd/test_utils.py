@@ -0,0 +1,33 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import argparse
+
+from tempest.cmd import utils
+from tempest.tests import base
+
+
+class TestPositiveInt(base.TestCase):
+
+    def test_positive_int(self):
+        self.assertEqual(3, utils.positive_int('3'))
+
+    def test_not_positive(self):
+        self.assertRaises(argparse.ArgumentTypeError, utils.positive_int, '0')
+        self.assertRaises(argparse.ArgumentTypeError, utils.positive_int,
+                          '-1')
+
+    def test_not_int(self):
+        self.assertRaises(ValueError, utils.positive_int, 'fake')
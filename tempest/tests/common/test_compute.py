@@ -105,3 +105,12 @@ class TestCompute(base.TestCase):
         self.assertEqual(recv_version, RFP_VERSION)
         # cached_stream should be empty in the end.
         self.assertEqual(webSocket.cached_stream, b'')
+
+    def test_create_test_server_async(self):
+        create = self.patch('tempest.common.compute.create_test_server',
+                            return_value=('body', ['server']))
+        future = compute.create_test_server_async(
+            mock.sentinel.clients, wait_until='ACTIVE')
+        self.assertEqual(('body', ['server']), future.result())
+        create.assert_called_once_with(mock.sentinel.clients,
+                                       wait_until='ACTIVE')
@@ -118,6 +118,50 @@ class TestCredentialsFactory(base.TestCase):
             name=expected_name, network_resources=expected_network_resources,
             **expected_params)
 
+    @mock.patch.object(dynamic_creds, 'DynamicCredentialProvider')
+    @mock.patch.object(cf, 'get_dynamic_provider_params')
+    @mock.patch.object(cf, 'get_credential_pool')
+    def test_get_credentials_provider_dynamic_pool(
+            self, mock_get_credential_pool, mock_dynamic_provider_params,
+            mock_dynamic_credentials_provider_class):
+        cfg.CONF.set_default('use_dynamic_credentials', True, group='auth')
+        mock_dynamic_provider_params.return_value = {'foo': 'bar'}
+        cf.get_credentials_provider('my_name', identity_version='v3',
+                                    use_credential_pool=True)
+        mock_get_credential_pool.assert_called_once_with('v3')
+        mock_dynamic_credentials_provider_class.assert_called_once_with(
+            name='my_name', network_resources=None, foo='bar',
+            credential_pool=mock_get_credential_pool.return_value)
+        # Credentials with custom network resources are not pooled
+        cf.get_credentials_provider(
+            'my_name', network_resources={'network': 'resources'},
+            identity_version='v3', use_credential_pool=True)
+        mock_get_credential_pool.assert_called_once_with('v3')
+
+    @mock.patch.object(dynamic_creds, 'DynamicCredentialPool')
+    @mock.patch.object(dynamic_creds, 'DynamicCredentialProvider')
+    @mock.patch.object(cf, 'get_dynamic_provider_params')
+    @mock.patch('atexit.register')
+    def test_get_credential_pool(self, mock_atexit_register,
+                                 mock_dynamic_provider_params,
+                                 mock_dynamic_credentials_provider_class,
+                                 mock_pool_class):
+        self.patchobject(cf, '_credential_pools', {})
+        self.assertIsNone(cf.get_credential_pool('v3'))
+        cfg.CONF.set_default('dynamic_credentials_pool_size', 3, group='auth')
+        cfg.CONF.set_default('dynamic_credentials_pool_timeout', 10,
+                             group='auth')
+        mock_dynamic_provider_params.return_value = {'foo': 'bar'}
+        pool = cf.get_credential_pool('v3')
+        self.assertIs(pool, cf.get_credential_pool('v3'))
+        mock_dynamic_credentials_provider_class.assert_called_once_with(
+            name='pool', foo='bar')
+        mock_pool_class.assert_called_once_with(
+            mock_dynamic_credentials_provider_class.return_value, size=3,
+            workers=2, timeout=10)
+        pool.start.assert_called_once_with()
+        mock_atexit_register.assert_called_once_with(pool.stop)
+
     @mock.patch.object(preprov_creds, 'PreProvisionedCredentialProvider')
     @mock.patch.object(cf, 'get_preprov_provider_params')
     def test_get_credentials_provider_preprov(
@@ -12,6 +12,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from concurrent import futures
+import threading
 import time
 from unittest import mock
 
@@ -19,6 +21,9 @@ from oslo_utils.fixture import uuidsentinel as uuids
 
 from tempest.common import waiters
 from tempest import exceptions
+from tempest.lib.common import polling
+from tempest.lib.common.utils import test_utils
+from tempest.lib.common import waiter_timeline
 from tempest.lib import exceptions as lib_exc
 from tempest.lib.services.volume.v2 import volumes_client
 from tempest.tests import base
@@ -202,7 +207,8 @@ class TestVolumeWaiters(base.TestCase):
         # the volume status is 'error_restoring'.
         client = mock.Mock(spec=volumes_client.VolumesClient,
                            resource_type="volume",
-                           build_interval=1)
+                           build_interval=1,
+                           build_timeout=1)
         volume1 = {'volume': {'status': 'restoring-backup'}}
         volume2 = {'volume': {'status': 'error_restoring'}}
         mock_show = mock.Mock(side_effect=(volume1, volume2))
@@ -221,7 +227,8 @@ class TestVolumeWaiters(base.TestCase):
         # the volume status is 'error_extending'.
         client = mock.Mock(spec=volumes_client.VolumesClient,
                            resource_type="volume",
-                           build_interval=1)
+                           build_interval=1,
+                           build_timeout=1)
         volume1 = {'volume': {'status': 'extending'}}
         volume2 = {'volume': {'status': 'error_extending'}}
         mock_show = mock.Mock(side_effect=(volume1, volume2))
@@ -234,6 +241,45 @@ class TestVolumeWaiters(base.TestCase):
                                     mock.call(volume_id)])
         mock_sleep.assert_called_once_with(1)
 
+    @mock.patch.object(time, 'sleep')
+    def test_wait_for_volume_status_timeline(self, mock_sleep):
+        self.addCleanup(waiter_timeline.disable)
+        collector = waiter_timeline.enable()
+        client = mock.Mock(spec=volumes_client.VolumesClient,
+                           resource_type="volume",
+                           build_interval=1,
+                           build_timeout=60)
+        client.show_volume = mock.Mock(side_effect=[
+            {'volume': {'status': status}}
+            for status in ['creating', 'creating', 'error']])
+        self.assertRaises(exceptions.VolumeResourceBuildErrorException,
+                          waiters.wait_for_volume_resource_status,
+                          client, 'volume_id', 'available')
+        timeline, = collector.to_list()
+        self.assertEqual(('volume', 'volume_id', 'error', 3),
+                         (timeline['resource_type'], timeline['resource_id'],
+                          timeline['outcome'], timeline['polls']))
+        self.assertEqual(['creating', 'error'],
+                         [transition['status'] for transition
+                          in timeline['transitions']])
+
+    @mock.patch.object(time, 'sleep')
+    def test_wait_for_volume_status_polling_policy(self, mock_sleep):
+        self.addCleanup(polling.set_policy, polling.set_policy(
+            polling.PollingPolicy(initial_interval=0.5, initial_polls=1,
+                                  backoff=2, max_interval=3)))
+        client = mock.Mock(spec=volumes_client.VolumesClient,
+                           resource_type="volume",
+                           build_interval=1,
+                           build_timeout=60)
+        statuses = ['creating'] * 4 + ['available']
+        client.show_volume = mock.Mock(side_effect=[
+            {'volume': {'status': status}} for status in statuses])
+        waiters.wait_for_volume_resource_status(client, 'volume_id',
+                                                'available')
+        self.assertEqual([mock.call(0.5), mock.call(1), mock.call(2),
+                          mock.call(3)], mock_sleep.call_args_list)
+
     def test_wait_for_volume_attachment(self):
         vol_detached = {'volume': {'attachments': []}}
         vol_attached = {'volume': {'attachments': [
@@ -281,3 +327,290 @@ class TestVolumeWaiters(base.TestCase):
                                                   uuids.attachment_id)
         # Assert that show volume is only called once before we return
         show_volume.assert_called_once_with(uuids.volume_id)
+
+
+class TestBatchWaiters(base.TestCase):
+
+    def setUp(self):
+        super(TestBatchWaiters, self).setUp()
+        self.sleep = self.patch('time.sleep')
+        self.client = mock.Mock(build_interval=1, build_timeout=10)
+
+    @staticmethod
+    def _server(server_id, status, updated, task_state=None):
+        return {'id': server_id, 'status': status, 'updated': updated,
+                'OS-EXT-STS:task_state': task_state}
+
+    def test_wait_for_servers_status(self):
+        self.patch('time.time', return_value=0.)
+        self.client.list_servers.side_effect = [
+            {'servers': [self._server('s1', 'BUILD', '2020-01-01T00:00:01Z'),
+                         self._server('s2', 'BUILD', '2020-01-01T00:00:02Z'),
+                         self._server('other', 'BUILD',
+                                      '2020-01-01T00:00:03Z')]},
+            {'servers': [self._server('s1', 'ACTIVE', '2020-01-01T00:00:04Z',
+                                      task_state='spawning')]},
+            {'servers': [self._server('s1', 'ACTIVE', '2020-01-01T00:00:05Z'),
+                         self._server('s2', 'ACTIVE',
+                                      '2020-01-01T00:00:06Z')]}]
+        waiters.wait_for_servers_status(self.client, ['s1', 's2'], 'ACTIVE')
+        self.assertEqual(
+            [mock.call(detail=True),
+             mock.call(detail=True, **{'changes-since':
+                                       '2020-01-01T00:00:02Z'}),
+             mock.call(detail=True, **{'changes-since':
+                                       '2020-01-01T00:00:04Z'})],
+            self.client.list_servers.call_args_list)
+
+    def test_wait_for_servers_status_error(self):
+        self.patch('time.time', return_value=0.)
+        self.client.list_servers.return_value = {'servers': [
+            self._server('s1', 'ACTIVE', '2020-01-01T00:00:01Z'),
+            self._server('s2', 'ERROR', '2020-01-01T00:00:02Z')]}
+        self.assertRaises(exceptions.BuildErrorException,
+                          waiters.wait_for_servers_status,
+                          self.client, ['s1', 's2'], 'ACTIVE')
+
+    def test_wait_for_servers_status_timeout(self):
+        self.patch('time.time', side_effect=[0., 11.])
+        self.client.list_servers.return_value = {'servers': [
+            self._server('s1', 'ACTIVE', '2020-01-01T00:00:01Z'),
+            self._server('s2', 'BUILD', '2020-01-01T00:00:02Z')]}
+        error = self.assertRaises(lib_exc.TimeoutException,
+                                  waiters.wait_for_servers_status,
+                                  self.client, ['s1', 's2'], 'ACTIVE',
+                                  ready_wait=False)
+        self.assertIn('s2 (BUILD/None)', str(error))
+        self.assertNotIn('s1', str(error))
+
+    def test_wait_for_servers_status_pages(self):
+        self.patch('time.time', return_value=0.)
+        next_link = [{'rel': 'next', 'href': 'fake_href'}]
+        self.client.list_servers.side_effect = [
+            {'servers': [self._server('s1', 'BUILD', '2020-01-01T00:00:01Z')],
+             'servers_links': next_link},
+            {'servers': [self._server('s2', 'ACTIVE', '2020-01-01T00:00:02Z')],
+             'servers_links': next_link},
+            {'servers': [], 'servers_links': next_link},
+            {'servers': [self._server('s1', 'ACTIVE', '2020-01-01T00:00:03Z')],
+             'servers_links': []}]
+        waiters.wait_for_servers_status(self.client, ['s1', 's2'], 'ACTIVE',
+                                        ready_wait=False)
+        self.assertEqual(
+            [mock.call(detail=True),
+             mock.call(detail=True, marker='s1'),
+             mock.call(detail=True, marker='s2'),
+             mock.call(detail=True, **{'changes-since':
+                                       '2020-01-01T00:00:02Z'})],
+            self.client.list_servers.call_args_list)
+
+    def test_wait_for_servers_status_not_listed(self):
+        self.patch('time.time', return_value=0.)
+        self.client.list_servers.return_value = {'servers': [
+            self._server('s1', 'BUILD', '2020-01-01T00:00:01Z')]}
+        error = self.assertRaises(lib_exc.NotFound,
+                                  waiters.wait_for_servers_status,
+                                  self.client, ['s1', 's2'], 'ACTIVE')
+        self.assertIn('s2', str(error))
+        self.client.list_servers.assert_called_once_with(detail=True)
+
+    def test_wait_for_servers_status_deleted(self):
+        self.patch('time.time', return_value=0.)
+        self.client.list_servers.side_effect = [
+            {'servers': [self._server('s1', 'BUILD', '2020-01-01T00:00:01Z'),
+                         self._server('s2', 'BUILD',
+                                      '2020-01-01T00:00:02Z')]},
+            {'servers': [self._server('s2', 'DELETED',
+                                      '2020-01-01T00:00:03Z')]}]
+        error = self.assertRaises(lib_exc.NotFound,
+                                  waiters.wait_for_servers_status,
+                                  self.client, ['s1', 's2'], 'ACTIVE')
+        self.assertIn('s2', str(error))
+
+    def test_wait_for_servers_status_timeline(self):
+        self.addCleanup(waiter_timeline.disable)
+        collector = waiter_timeline.enable()
+        self.client.list_servers.side_effect = [
+            {'servers': [self._server('s1', 'BUILD', '2020-01-01T00:00:01Z'),
+                         self._server('s2', 'ACTIVE',
+                                      '2020-01-01T00:00:02Z')]},
+            {'servers': [self._server('s1', 'ACTIVE',
+                                      '2020-01-01T00:00:03Z')]}]
+        waiters.wait_for_servers_status(self.client, ['s1', 's2'], 'ACTIVE',
+                                        ready_wait=False)
+        timelines = dict((timeline['resource_id'], timeline)
+                         for timeline in collector.to_list())
+        self.assertEqual(['BUILD', 'ACTIVE'],
+                         [transition['status'] for transition
+                          in timelines['s1']['transitions']])
+        self.assertEqual(2, timelines['s1']['polls'])
+        self.assertEqual(1, timelines['s2']['polls'])
+        self.assertEqual('reached', timelines['s2']['outcome'])
+
+    def test_wait_for_servers_status_timeline_unchanged(self):
+        self.addCleanup(waiter_timeline.disable)
+        collector = waiter_timeline.enable()
+        self.client.list_servers.side_effect = [
+            {'servers': [self._server('s1', 'BUILD', '2020-01-01T00:00:01Z'),
+                         self._server('s2', 'BUILD',
+                                      '2020-01-01T00:00:02Z')]},
+            {'servers': [self._server('s1', 'ACTIVE',
+                                      '2020-01-01T00:00:03Z')]},
+            {'servers': [self._server('s2', 'ACTIVE',
+                                      '2020-01-01T00:00:04Z')]}]
+        waiters.wait_for_servers_status(self.client, ['s1', 's2'], 'ACTIVE',
+                                        ready_wait=False)
+        timelines = dict((timeline['resource_id'], timeline)
+                         for timeline in collector.to_list())
+        # s2 was not listed by the second poll, it did not change
+        self.assertEqual(3, timelines['s2']['polls'])
+        self.assertEqual(['BUILD', 'ACTIVE'],
+                         [transition['status'] for transition
+                          in timelines['s2']['transitions']])
+        self.assertEqual(2, timelines['s1']['polls'])
+
+    def test_wait_for_volumes_status(self):
+        self.patch('time.time', return_value=0.)
+        self.client.list_volumes.side_effect = [
+            {'volumes': [{'id': 'v1', 'status': 'creating'},
+                         {'id': 'v2', 'status': 'available'}]},
+            {'volumes': [{'id': 'v1', 'status': 'available'},
+                         {'id': 'v2', 'status': 'available'}]}]
+        waiters.wait_for_volumes_status(self.client, ['v1', 'v2'],
+                                        'available')
+        self.assertEqual(2, self.client.list_volumes.call_count)
+        self.client.list_volumes.assert_called_with(detail=True, params=None)
+        self.sleep.assert_called_once_with(1)
+
+    def test_wait_for_volumes_status_error(self):
+        self.patch('time.time', return_value=0.)
+        self.client.list_volumes.return_value = {'volumes': [
+            {'id': 'v1', 'status': 'error'}]}
+        self.assertRaises(exceptions.VolumeResourceBuildErrorException,
+                          waiters.wait_for_volumes_status,
+                          self.client, ['v1'], 'available')
+
+    def test_wait_for_volumes_status_pages(self):
+        self.patch('time.time', return_value=0.)
+        next_link = [{'rel': 'next', 'href': 'fake_href'}]
+        self.client.list_volumes.side_effect = [
+            {'volumes': [{'id': 'v1', 'status': 'available'}],
+             'volumes_links': next_link},
+            {'volumes': [{'id': 'v2', 'status': 'available'}]}]
+        waiters.wait_for_volumes_status(self.client, ['v1', 'v2'],
+                                        'available')
+        self.assertEqual(
+            [mock.call(detail=True, params=None),
+             mock.call(detail=True, params={'marker': 'v1'})],
+            self.client.list_volumes.call_args_list)
+
+    def test_wait_for_volumes_status_not_listed(self):
+        self.patch('time.time', return_value=0.)
+        self.client.list_volumes.return_value = {'volumes': [
+            {'id': 'v1', 'status': 'creating'}]}
+        error = self.assertRaises(lib_exc.NotFound,
+                                  waiters.wait_for_volumes_status,
+                                  self.client, ['v1', 'v2'], 'available')
+        self.assertIn('v2', str(error))
+
+    def test_wait_for_volumes_status_deleted(self):
+        self.patch('time.time', return_value=0.)
+        self.client.list_volumes.side_effect = [
+            {'volumes': [{'id': 'v1', 'status': 'creating'}]},
+            {'volumes': []}]
+        self.assertRaises(lib_exc.NotFound,
+                          waiters.wait_for_volumes_status,
+                          self.client, ['v1'], 'available')
+        self.assertEqual(2, self.client.list_volumes.call_count)
+
+    def test_wait_for_volumes_status_timeout(self):
+        self.patch('time.time', side_effect=[0., 11.])
+        self.client.list_volumes.return_value = {'volumes': [
+            {'id': 'v1', 'status': 'creating'}]}
+        self.assertRaises(lib_exc.TimeoutException,
+                          waiters.wait_for_volumes_status,
+                          self.client, ['v1'], 'available')
+
+
+class TestAsyncWaiters(base.TestCase):
+
+    def test_wait_for_futures(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def _waiter(value):
+            # Both waiters run at the same time
+            barrier.wait()
+            return value
+
+        fs = [waiters.submit(_waiter, value) for value in ('one', 'two')]
+        self.assertEqual(['one', 'two'], waiters.wait_for_futures(fs))
+
+    def test_wait_for_futures_failure(self):
+        done = threading.Event()
+
+        def _fail():
+            raise lib_exc.TimeoutException()
+
+        def _slow():
+            time.sleep(0.1)
+            done.set()
+
+        fs = [waiters.submit(_fail), waiters.submit(_slow)]
+        self.assertRaises(lib_exc.TimeoutException,
+                          waiters.wait_for_futures, fs)
+        # The other waiters are complete
+        self.assertTrue(done.is_set())
+
+    def test_wait_for_futures_timeout(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        future = waiters.submit(release.wait, 5)
+        self.assertRaises(lib_exc.TimeoutException,
+                          waiters.wait_for_futures, [future], timeout=0.01)
+        self.assertFalse(future.done())
+
+    def test_cancel_futures(self):
+        executor = futures.ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        self.patch('tempest.common.waiters._get_async_executor',
+                   return_value=executor)
+        release = threading.Event()
+        queued = mock.Mock()
+        with test_utils.test_caller_context('TestFake:test_fake'):
+            running = waiters.submit(release.wait, 5)
+            pending = waiters.submit(queued)
+        other = waiters.submit(queued)
+        timer = threading.Timer(0.1, release.set)
+        timer.start()
+        self.addCleanup(timer.cancel)
+        waiters.cancel_futures('TestFake:test_fake')
+        self.assertTrue(running.result())
+        self.assertTrue(pending.cancelled())
+        self.assertNotIn('TestFake:test_fake', waiters._async['futures'])
+        # The waiters of the other callers are left alone
+        self.assertEqual(queued.return_value, other.result())
+        queued.assert_called_once_with()
+
+    def test_submit_test_caller(self):
+        with test_utils.test_caller_context('TestFake:test_fake'):
+            future = waiters.submit(test_utils.find_test_caller)
+        self.assertEqual('TestFake:test_fake', future.result())
+
+    def test_wait_for_volume_resource_status_async(self):
+        client = mock.Mock(spec=volumes_client.VolumesClient,
+                           resource_type="volume",
+                           build_interval=1,
+                           build_timeout=1)
+        client.show_volume.return_value = {'volume': {'status': 'available'}}
+        future = waiters.wait_for_volume_resource_status_async(
+            client, 'volume_id', 'available')
+        self.assertIsNone(future.result())
+        client.show_volume.assert_called_once_with('volume_id')
+
+    def test_wait_for_server_status_async_error(self):
+        client = mock.Mock(build_interval=1, build_timeout=1)
+        client.show_server.return_value = {'server': {'status': 'ERROR'}}
+        self.patch('time.sleep')
+        future = waiters.wait_for_server_status_async(
+            client, 'server_id', 'ACTIVE')
+        self.assertRaises(exceptions.BuildErrorException, future.result)
@@ -0,0 +1,127 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import shutil
+import tempfile
+
+from tempest.lib.common import api_metrics
+from tempest.tests import base
+
+
+class TestNormalizeURL(base.TestCase):
+
+    def test_ids_replaced(self):
+        self.assertEqual(
+            '/compute/v2.1/servers/{id}/os-volume_attachments/{id}',
+            api_metrics.normalize_url(
+                'http://cloud/compute/v2.1/servers/'
+                '7b1c2a3e-5f6d-4e8a-9b0c-1d2e3f4a5b6c/os-volume_attachments/'
+                '0e8f6e0a5c0b4d1a9b3c2d1e0f9a8b7c'))
+
+    def test_query_removed(self):
+        self.assertEqual('/v2.0/ports',
+                         api_metrics.normalize_url(
+                             'https://cloud:9696/v2.0/ports?device_id=1'))
+
+    def test_names_replaced(self):
+        self.assertEqual('/v1/AUTH_admin/{name}/{id}',
+                         api_metrics.normalize_url(
+                             '/v1/AUTH_admin/tempest-TestContainer-1234567/'
+                             '42'))
+
+    def test_versions_kept(self):
+        self.assertEqual('/v3/auth/tokens',
+                         api_metrics.normalize_url('/v3/auth/tokens'))
+
+
+class TestAPIMetrics(base.TestCase):
+
+    def setUp(self):
+        super(TestAPIMetrics, self).setUp()
+        self.metrics = api_metrics.APIMetrics()
+
+    def test_record(self):
+        self.metrics.record('compute', 'GET', '/servers/1', 200, 0.2)
+        self.metrics.record('compute', 'GET', '/servers/2', 200, 0.4)
+        self.metrics.record('compute', 'GET', '/servers/3', 404, 120)
+        entries = self.metrics.to_list()
+        self.assertEqual(2, len(entries))
+        # Slowest first
+        self.assertEqual(404, entries[0]['status'])
+        self.assertEqual(1, entries[0]['histogram'][-1])
+        ok = entries[1]
+        self.assertEqual(
+            {'service': 'compute', 'method': 'GET', 'url': '/servers/{id}',
+             'status': 200, 'count': 2},
+            {k: ok[k] for k in ('service', 'method', 'url', 'status',
+                                'count')})
+        self.assertAlmostEqual(0.6, ok['total_time'])
+        self.assertEqual(0.2, ok['min_time'])
+        self.assertEqual(0.4, ok['max_time'])
+        # 0.2s and 0.4s fall in the 0.25s and 0.5s buckets
+        self.assertEqual([0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0], ok['histogram'])
+
+    def test_merge(self):
+        self.metrics.record('compute', 'GET', '/servers', 200, 0.2)
+        other = api_metrics.APIMetrics()
+        other.record('compute', 'GET', '/servers', 200, 0.1)
+        other.record('image', 'GET', '/v2/images', 200, 0.1)
+        self.metrics.merge(other.to_list())
+        entries = {e['service']: e for e in self.metrics.to_list()}
+        self.assertEqual(2, entries['compute']['count'])
+        self.assertEqual(0.1, entries['compute']['min_time'])
+        self.assertEqual(1, entries['image']['count'])
+
+    def test_dump_load(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.metrics.record('compute', 'GET', '/servers', 200, 0.2)
+        for name in ('api-metrics-1.json', 'api-metrics-2.json'):
+            self.metrics.dump(os.path.join(directory, name))
+        merged = api_metrics.load_dir(directory)
+        self.assertEqual(2, merged.to_list()[0]['count'])
+        summary = merged.format_summary(elapsed=4)
+        self.assertIn('/servers', summary)
+        self.assertIn('0.50', summary)
+
+
+class TestActiveCollector(base.TestCase):
+
+    def setUp(self):
+        super(TestActiveCollector, self).setUp()
+        self.addCleanup(api_metrics.disable)
+
+    def test_enable(self):
+        self.assertIsNone(api_metrics.get_collector())
+        metrics = api_metrics.enable()
+        self.assertIs(metrics, api_metrics.get_collector())
+        self.assertIs(metrics, api_metrics.enable())
+        self.assertIs(metrics, api_metrics.disable())
+        self.assertIsNone(api_metrics.get_collector())
+
+    def test_dump_to_dir(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        # Nothing to dump
+        api_metrics.dump_to_dir(directory)
+        api_metrics.enable()
+        api_metrics.dump_to_dir(directory)
+        self.assertEqual([], os.listdir(directory))
+        api_metrics.get_collector().record('compute', 'GET', '/servers',
+                                           200, 0.2)
+        api_metrics.dump_to_dir(directory)
+        self.assertEqual(['api-metrics-%d.json' % os.getpid()],
+                         os.listdir(directory))
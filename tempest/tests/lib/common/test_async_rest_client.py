@@ -0,0 +1,109 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import asyncio
+import threading
+from unittest import mock
+
+import fixtures
+
+from tempest.lib.common import async_rest_client
+from tempest.lib.common import http
+from tempest.lib.common import rest_client
+from tempest.lib import exceptions
+from tempest.tests import base
+from tempest.tests.lib import fake_auth_provider
+from tempest.tests.lib import fake_http
+
+
+class FakeServiceClient(rest_client.RestClient):
+
+    def show_thing(self, thing_id):
+        resp, body = self.get('things/%s' % thing_id)
+        return rest_client.ResponseBody(resp, {'thing': body['uri']})
+
+
+class TestAsyncRestClient(base.TestCase):
+
+    def setUp(self):
+        super(TestAsyncRestClient, self).setUp()
+        self.fake_http = fake_http.fake_httplib2()
+        self.patchobject(http.ClosingHttp, 'request', self.fake_http.request)
+        self.client = FakeServiceClient(
+            fake_auth_provider.FakeAuthProvider(), None, None)
+        self.useFixture(fixtures.MockPatchObject(self.client,
+                                                 '_log_request'))
+        self.useFixture(fixtures.MockPatchObject(self.client,
+                                                 '_error_checker'))
+        self.async_client = async_rest_client.AsyncRestClient(self.client)
+        self.addCleanup(self.async_client.close)
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def test_request(self):
+        resp, body = self.loop.run_until_complete(
+            self.async_client.get('fake_endpoint'))
+        self.assertEqual('GET', body['method'])
+        self.assertEqual('fake_endpoint', body['uri'])
+
+    def test_service_client_method(self):
+        body = self.loop.run_until_complete(
+            self.async_client.show_thing('fake_id'))
+        self.assertIsInstance(body, rest_client.ResponseBody)
+        self.assertEqual({'thing': 'things/fake_id'}, body)
+
+    def test_gather(self):
+        thread_ids = set()
+        barrier = threading.Barrier(3, timeout=10)
+        original_request = self.fake_http.request
+
+        def _request(http_obj, *args, **kwargs):
+            thread_ids.add(threading.get_ident())
+            # All the requests must be in flight at the same time
+            barrier.wait()
+            return original_request(*args, **kwargs)
+
+        async def _gather():
+            return await asyncio.gather(
+                *[self.async_client.show_thing(i) for i in range(3)])
+
+        self.patchobject(http.ClosingHttp, 'request', _request)
+        bodies = self.loop.run_until_complete(_gather())
+        self.assertEqual(
+            [{'thing': 'things/%d' % i} for i in range(3)], bodies)
+        self.assertEqual(3, len(thread_ids))
+
+    def test_error_propagated(self):
+        self.patchobject(self.client, '_error_checker',
+                         side_effect=exceptions.NotFound())
+        self.assertRaises(exceptions.NotFound,
+                          self.loop.run_until_complete,
+                          self.async_client.show_thing('fake_id'))
+
+    def test_attributes_not_wrapped(self):
+        self.assertIs(self.client.auth_provider,
+                      self.async_client.auth_provider)
+        self.assertEqual(self.client.build_timeout,
+                         self.async_client.build_timeout)
+        # Private methods are not turned into coroutines
+        self.assertEqual(self.client._parse_resp,
+                         self.async_client._parse_resp)
+
+    def test_external_executor_not_closed(self):
+        executor = mock.Mock()
+        with async_rest_client.AsyncRestClient(self.client,
+                                               executor=executor):
+            pass
+        executor.shutdown.assert_not_called()
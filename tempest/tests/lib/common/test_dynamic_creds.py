@@ -12,6 +12,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
 from unittest import mock
 
 import fixtures
@@ -191,6 +192,45 @@ class TestDynamicCredentialProvider(base.TestCase):
         self.assertEqual(primary_creds.tenant_id, '1234')
         self.assertEqual(primary_creds.user_id, '1234')
 
+    @mock.patch('tempest.lib.common.rest_client.RestClient')
+    def test_primary_creds_from_pool(self, MockRestClient):
+        pool = mock.Mock()
+        pool_creds = pool.get.return_value
+        creds = dynamic_creds.DynamicCredentialProvider(
+            credential_pool=pool, **self.fixed_params)
+        self.assertIs(pool_creds, creds.get_primary_creds())
+        self.assertIs(pool_creds, creds.get_primary_creds())
+        pool.get.assert_called_once_with()
+        self.assertEqual({'primary': pool_creds}, creds._creds)
+
+    @mock.patch('tempest.lib.common.rest_client.RestClient')
+    def test_primary_creds_pool_empty(self, MockRestClient):
+        pool = mock.Mock()
+        pool.get.return_value = None
+        creds = dynamic_creds.DynamicCredentialProvider(
+            credential_pool=pool, **self.fixed_params)
+        self._mock_assign_user_role()
+        self._mock_list_role()
+        self._mock_tenant_create('1234', 'fake_prim_tenant')
+        self._mock_user_create('1234', 'fake_prim_user')
+        primary_creds = creds.get_primary_creds()
+        self.assertEqual(primary_creds.username, 'fake_prim_user')
+        pool.get.assert_called_once_with()
+
+    @mock.patch('tempest.lib.common.rest_client.RestClient')
+    def test_provision_take_credentials(self, MockRestClient):
+        creds = dynamic_creds.DynamicCredentialProvider(**self.fixed_params)
+        create_creds = self.patchobject(creds, '_create_creds')
+        network = self.patchobject(creds, '_create_creds_network_resources')
+        provisioned = creds.provision_credentials('pool-1')
+        self.assertIs(create_creds.return_value, provisioned)
+        network.assert_called_once_with(provisioned)
+        # Deleted by clear_creds until taken
+        self.assertEqual({'pool-1': provisioned}, creds._creds)
+        self.assertIs(provisioned, creds.take_credentials('pool-1'))
+        self.assertEqual({}, creds._creds)
+        self.assertIsNone(creds.take_credentials('pool-1'))
+
     @mock.patch('tempest.lib.common.rest_client.RestClient')
     def test_admin_creds(self, MockRestClient):
         creds = dynamic_creds.DynamicCredentialProvider(**self.fixed_params)
@@ -278,6 +318,56 @@ class TestDynamicCredentialProvider(base.TestCase):
         self.assertIn('12345', args)
         self.assertIn('123456', args)
 
+    @mock.patch('tempest.lib.common.rest_client.RestClient')
+    def test_clear_creds_concurrent(self, MockRestClient):
+        creds = dynamic_creds.DynamicCredentialProvider(**self.fixed_params)
+        creds._creds = {'primary': mock.Mock(), 'alt': mock.Mock(),
+                        'admin': mock.Mock()}
+        all_creds = list(creds._creds.values())
+        # Each set of credentials waits for the others to be cleared
+        barrier = threading.Barrier(3, timeout=5)
+        clear = self.patchobject(creds, '_clear_creds_resources',
+                                 side_effect=lambda c: barrier.wait())
+        creds.clear_creds()
+        self.assertEqual(sorted(map(id, all_creds)),
+                         sorted(id(c[0][0]) for c in clear.call_args_list))
+        self.assertEqual({}, creds._creds)
+
+    @mock.patch('tempest.lib.common.rest_client.RestClient')
+    def test_clear_creds_failure(self, MockRestClient):
+        creds = dynamic_creds.DynamicCredentialProvider(**self.fixed_params)
+        failing = mock.Mock()
+        creds._creds = {'primary': failing, 'alt': mock.Mock()}
+
+        def _clear(c):
+            if c is failing:
+                raise lib_exc.ServerFault()
+
+        clear = self.patchobject(creds, '_clear_creds_resources',
+                                 side_effect=_clear)
+        self.assertRaises(lib_exc.ServerFault, creds.clear_creds)
+        self.assertEqual(2, clear.call_count)
+        self.assertEqual(2, len(creds._creds))
+
+    @mock.patch('tempest.lib.common.rest_client.RestClient')
+    def test_clear_creds_resources_order(self, MockRestClient):
+        creds = dynamic_creds.DynamicCredentialProvider(
+            neutron_available=True, **self.fixed_params)
+        calls = mock.Mock()
+        creds.creds_client = calls.creds_client
+        self.patchobject(creds, '_clear_creds_net_resources',
+                         calls.clear_net_resources)
+        self.patchobject(creds, '_cleanup_default_secgroup',
+                         calls.cleanup_default_secgroup)
+        cred = mock.Mock(user_id='user', tenant_id='project')
+        creds._clear_creds_resources(cred)
+        self.assertEqual(
+            [mock.call.clear_net_resources(cred),
+             mock.call.creds_client.delete_user('user'),
+             mock.call.cleanup_default_secgroup('project'),
+             mock.call.creds_client.delete_project('project')],
+            calls.mock_calls)
+
     @mock.patch('tempest.lib.common.rest_client.RestClient')
     def test_alt_creds(self, MockRestClient):
         creds = dynamic_creds.DynamicCredentialProvider(**self.fixed_params)
@@ -668,3 +758,98 @@ class TestDynamicCredentialProviderV3(TestDynamicCredentialProvider):
                 "member role already exists, ignoring conflict.")
         creds.creds_client.assign_user_role.assert_called_once_with(
             mock.ANY, mock.ANY, 'member')
+
+
+class TestDynamicCredentialPool(base.TestCase):
+
+    def setUp(self):
+        super(TestDynamicCredentialPool, self).setUp()
+        self.provider = mock.Mock()
+        self.provisioned = {}
+
+        def _provision(key):
+            self.provisioned[key] = mock.Mock(name='creds')
+            return self.provisioned[key]
+        self.provider.provision_credentials.side_effect = _provision
+        self.provider.take_credentials.side_effect = (
+            lambda key: self.provisioned.pop(key, None))
+        self.pool = dynamic_creds.DynamicCredentialPool(
+            self.provider, size=2, workers=1, timeout=5, retry_delay=0)
+
+    def _wait_ready(self, count):
+        for _ in range(500):
+            if len(self.pool._ready) == count:
+                return
+            self.pool._stopped.wait(0.01)
+        self.fail('%d pooled credentials not ready' % count)
+
+    def test_get(self):
+        self.pool.start()
+        self.addCleanup(self.pool.stop)
+        self._wait_ready(2)
+        credentials = self.pool.get()
+        self.assertIsNotNone(credentials)
+        self.assertNotIn(credentials, self.provisioned.values())
+        # The slot freed is provisioned again
+        self._wait_ready(2)
+        self.assertEqual(3, self.provider.provision_credentials.call_count)
+        self.assertEqual(2, len(self.provisioned))
+
+    def test_stop(self):
+        self.pool.start()
+        self._wait_ready(2)
+        self.pool.stop()
+        self.provider.clear_creds.assert_called_once_with()
+        self.assertIsNone(self.pool.get())
+
+    def test_get_timeout(self):
+        self.pool._last_succeeded = True
+        self.pool.timeout = 0
+        self.assertIsNone(self.pool.get())
+
+    def test_get_nothing_provisioned_yet(self):
+        # Does not wait for the first credentials
+        self.pool.timeout = 3600
+        self.assertIsNone(self.pool.get())
+
+    def test_provision_failure(self):
+        failed = threading.Event()
+        retry = threading.Event()
+
+        def _provision(key):
+            if not failed.is_set():
+                failed.set()
+                raise lib_exc.ServerFault()
+            retry.wait()
+            self.provisioned[key] = mock.Mock(name='creds')
+            return self.provisioned[key]
+
+        self.provider.provision_credentials.side_effect = _provision
+        self.pool.timeout = 3600
+        self.pool.start()
+        self.addCleanup(self.pool.stop)
+        self.addCleanup(retry.set)
+        self.assertTrue(failed.wait(5))
+        for _ in range(500):
+            if self.pool._last_succeeded is False:
+                break
+            self.pool._stopped.wait(0.01)
+        # The last attempt failed, the caller creates its own credentials
+        self.assertIsNone(self.pool.get())
+        retry.set()
+        self._wait_ready(2)
+        self.assertIsNotNone(self.pool.get())
+
+    def test_waiter_woken_by_failure(self):
+        self.pool._last_succeeded = True
+        self.pool.timeout = 3600
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(
+            self.pool.get()))
+        waiter.start()
+        with self.pool._cond:
+            self.pool._last_succeeded = False
+            self.pool._cond.notify_all()
+        waiter.join(5)
+        self.assertFalse(waiter.is_alive())
+        self.assertEqual([None], result)
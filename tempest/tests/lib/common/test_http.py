@@ -149,6 +149,66 @@ class TestClosingHttp(base.TestCase):
              'xtra key': 'Xtra Value'},
             response)
 
+    def test_request_without_preload_content(self):
+        # Given
+        connection = self.closing_http()
+        http_response = urllib3.HTTPResponse()
+        request = self.patch('urllib3.PoolManager.request',
+                             return_value=http_response)
+        retry = self.patch('urllib3.util.Retry')
+
+        # When
+        _, data = connection.request(
+            method=REQUEST_METHOD,
+            url=REQUEST_URL,
+            preload_content=False)
+
+        # Then
+        request.assert_called_once_with(
+            REQUEST_METHOD,
+            REQUEST_URL,
+            preload_content=False,
+            headers=dict(connection='close'),
+            retries=retry(raise_on_redirect=False, redirect=5))
+        self.assertIs(http_response, data)
+
+    def test_closing_http_with_keep_alive(self):
+        connection = self.closing_http(keep_alive=True, pool_maxsize=4)
+        self.assertTrue(connection.keep_alive)
+        self.assertEqual(4, connection.connection_pool_kw['maxsize'])
+
+    def test_closing_http_pool_maxsize_without_keep_alive(self):
+        connection = self.closing_http(pool_maxsize=4)
+        self.assertFalse(connection.keep_alive)
+        self.assertNotIn('maxsize', connection.connection_pool_kw)
+
+    def test_request_with_keep_alive(self):
+        # Given
+        connection = self.closing_http(keep_alive=True)
+        headers = {'Xtra Key': 'Xtra Value'}
+        http_response = urllib3.HTTPResponse(headers=headers)
+        request = self.patch('urllib3.PoolManager.request',
+                             return_value=http_response)
+        retry = self.patch('urllib3.util.Retry')
+
+        # When
+        response, _ = connection.request(
+            method=REQUEST_METHOD,
+            url=REQUEST_URL,
+            headers=headers)
+
+        # Then
+        request.assert_called_once_with(
+            REQUEST_METHOD,
+            REQUEST_URL,
+            headers=headers,
+            retries=retry(raise_on_redirect=False, redirect=5))
+        self.assertEqual(
+            {'content-location': REQUEST_URL,
+             'status': str(http_response.status),
+             'xtra key': 'Xtra Value'},
+            response)
+
 
 class TestClosingProxyHttp(TestClosingHttp):
 
@@ -188,3 +248,51 @@ class TestClosingProxyHttpRedirects(base.TestCase):
         connection = http.ClosingProxyHttp(follow_redirects=False,
                                            proxy_url=PROXY_URL)
         self.assertFalse(connection.follow_redirects)
+
+
+class TestSharedHttp(base.TestCase):
+
+    def setUp(self):
+        super(TestSharedHttp, self).setUp()
+        self.addCleanup(http.clear_shared_http)
+
+    def test_same_settings_share_manager(self):
+        first = http.get_shared_http(ca_certs=CERT_LOCATION, timeout=30)
+        second = http.get_shared_http(ca_certs=CERT_LOCATION, timeout=30)
+        self.assertIs(first, second)
+        self.assertIsInstance(first, http.ClosingHttp)
+        self.assertEqual(CERT_LOCATION,
+                         first.connection_pool_kw['ca_certs'])
+
+    def test_different_settings_do_not_share_manager(self):
+        first = http.get_shared_http(keep_alive=True)
+        second = http.get_shared_http(keep_alive=False)
+        third = http.get_shared_http(disable_ssl_certificate_validation=True)
+        self.assertIsNot(first, second)
+        self.assertIsNot(first, third)
+        self.assertIsNot(second, third)
+
+    def test_shared_proxy_manager(self):
+        connection = http.get_shared_http(proxy_url=PROXY_URL)
+        self.assertIsInstance(connection, http.ClosingProxyHttp)
+        self.assertIsNot(connection, http.get_shared_http())
+
+    def test_clear_shared_http(self):
+        first = http.get_shared_http()
+        http.clear_shared_http()
+        self.assertIsNot(first, http.get_shared_http())
+
+    def test_shared_http_stats(self):
+        connection = http.get_shared_http(keep_alive=True, pool_maxsize=4)
+        connection.connection_from_url(REQUEST_URL)
+
+        stats = http.get_shared_http_stats()
+
+        self.assertEqual(1, len(stats))
+        self.assertTrue(stats[0]['keep_alive'])
+        self.assertEqual(4, stats[0]['pool_maxsize'])
+        self.assertEqual(http.SHARED_NUM_POOLS, stats[0]['num_pools'])
+        self.assertEqual(
+            [{'scheme': 'http', 'host': '10.0.0.107', 'port': 5000,
+              'num_connections': 0, 'num_requests': 0}],
+            stats[0]['pools'])
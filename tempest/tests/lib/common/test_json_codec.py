@@ -0,0 +1,128 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import importlib
+import json
+import os
+
+import testtools
+
+from tempest.lib.common import json_codec
+from tempest.lib import exceptions
+from tempest.lib import services
+from tempest.tests import base
+
+
+def _installed(name):
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        return False
+    return True
+
+
+class TestJSONCodec(base.TestCase):
+
+    backend = 'stdlib'
+    document = {'servers': [{'id': 'fake-id', 'name': u'caf\xe9',
+                             'links': [{'href': 'http://fake/servers'}],
+                             'metadata': {}, 'progress': 0,
+                             'flavor': None, 'locked': False}]}
+
+    def setUp(self):
+        super(TestJSONCodec, self).setUp()
+        self.addCleanup(json_codec.set_backend, json_codec.get_backend())
+        self.assertEqual(self.backend, json_codec.set_backend(self.backend))
+
+    def test_get_backend(self):
+        self.assertEqual(self.backend, json_codec.get_backend())
+
+    def test_round_trip(self):
+        serialized = json_codec.dumps(self.document)
+        self.assertIsInstance(serialized, str)
+        self.assertEqual(self.document, json.loads(serialized))
+        self.assertEqual(self.document, json_codec.loads(serialized))
+
+    def test_loads_bytes(self):
+        serialized = json.dumps(self.document).encode('utf-8')
+        self.assertEqual(self.document, json_codec.loads(serialized))
+
+    def test_loads_invalid(self):
+        self.assertRaises(ValueError, json_codec.loads, 'not json')
+
+    def test_dumps_non_native_types(self):
+        now = datetime.datetime(2020, 1, 1, 10, 0, 0)
+        self.assertEqual({'date': '2020-01-01T10:00:00.000000'},
+                         json.loads(json_codec.dumps({'date': now})))
+
+    def test_dumps_kwargs(self):
+        self.assertEqual('{"a": 1, "b": 2}',
+                         json_codec.dumps({'b': 2, 'a': 1}, sort_keys=True))
+
+
+@testtools.skipUnless(_installed('orjson'), 'orjson is not installed')
+class TestJSONCodecOrjson(TestJSONCodec):
+
+    backend = 'orjson'
+
+
+@testtools.skipUnless(_installed('ujson'), 'ujson is not installed')
+class TestJSONCodecUjson(TestJSONCodec):
+
+    backend = 'ujson'
+
+
+class TestJSONCodecBackend(base.TestCase):
+
+    def setUp(self):
+        super(TestJSONCodecBackend, self).setUp()
+        self.addCleanup(json_codec.set_backend, json_codec.get_backend())
+
+    def test_invalid_backend(self):
+        self.assertRaises(exceptions.InvalidConfiguration,
+                          json_codec.set_backend, 'fake')
+
+    def test_backend_not_installed(self):
+        self.patch('importlib.import_module', side_effect=ImportError)
+        self.assertEqual('stdlib', json_codec.set_backend('orjson'))
+        self.assertEqual('stdlib', json_codec.get_backend())
+        self.assertEqual('{"a": 1}', json_codec.dumps({'a': 1}))
+
+    def test_auto_backend(self):
+        expected = 'stdlib'
+        for name in ('orjson', 'ujson'):
+            if _installed(name):
+                expected = name
+                break
+        self.assertEqual(expected, json_codec.set_backend('auto'))
+
+
+class TestServiceClientsCodec(base.TestCase):
+
+    def test_no_direct_jsonutils(self):
+        # Every service client must use json_codec, for the backend set in
+        # the configuration to apply to all of them
+        root = os.path.dirname(services.__file__)
+        offenders = []
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if not filename.endswith('.py'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                with open(path) as f:
+                    if 'jsonutils' in f.read():
+                        offenders.append(os.path.relpath(path, root))
+        self.assertEqual([], offenders)
@@ -12,7 +12,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import jsonschema
+
 from tempest.lib.api_schema.response.compute.v2_1 import parameter_types
+from tempest.lib.common import jsonschema_validator
 from tempest.lib.common import rest_client
 from tempest.lib import exceptions
 from tempest.tests import base
@@ -81,3 +84,65 @@ class TestJSONSchemaDateTimeFormat(base.TestCase):
         self.assertRaises(exceptions.InvalidHTTPResponseBody,
                           rest_client.RestClient.validate_response,
                           self.date_time_schema[0], resp, body)
+
+
+class TestJSONSchemaValidatorCache(base.TestCase):
+
+    schema = {
+        'type': 'object',
+        'properties': {
+            'name': {'type': 'string'},
+            'size': {'type': 'integer'}
+        },
+        'required': ['name']
+    }
+
+    def setUp(self):
+        super(TestJSONSchemaValidatorCache, self).setUp()
+        jsonschema_validator.clear_validator_cache()
+        self.addCleanup(jsonschema_validator.clear_validator_cache)
+
+    def test_validator_reused(self):
+        first = jsonschema_validator._get_validator(
+            self.schema, jsonschema_validator.JSONSCHEMA_VALIDATOR,
+            jsonschema_validator.FORMAT_CHECKER)
+        second = jsonschema_validator._get_validator(
+            self.schema, jsonschema_validator.JSONSCHEMA_VALIDATOR,
+            jsonschema_validator.FORMAT_CHECKER)
+        self.assertIs(first, second)
+
+    def test_equal_schemas_not_shared(self):
+        other_schema = dict(self.schema)
+        first = jsonschema_validator._get_validator(
+            self.schema, jsonschema_validator.JSONSCHEMA_VALIDATOR,
+            jsonschema_validator.FORMAT_CHECKER)
+        second = jsonschema_validator._get_validator(
+            other_schema, jsonschema_validator.JSONSCHEMA_VALIDATOR,
+            jsonschema_validator.FORMAT_CHECKER)
+        self.assertIsNot(first, second)
+
+    def test_cache_size_bounded(self):
+        self.patchobject(jsonschema_validator, 'VALIDATOR_CACHE_SIZE', 2)
+        schemas = [dict(self.schema) for _ in range(3)]
+        for schema in schemas:
+            jsonschema_validator.validate({'name': 'foo'}, schema)
+        self.assertEqual(2, len(jsonschema_validator._validators))
+        self.assertEqual(
+            [id(schema) for schema in schemas[1:]],
+            [key[0] for key in jsonschema_validator._validators])
+
+    def test_validate(self):
+        jsonschema_validator.validate({'name': 'foo', 'size': 1},
+                                      self.schema)
+        self.assertRaises(jsonschema.ValidationError,
+                          jsonschema_validator.validate,
+                          {'name': 'foo', 'size': 'big'}, self.schema)
+        self.assertRaises(jsonschema.ValidationError,
+                          jsonschema_validator.validate,
+                          {'size': 1}, self.schema)
+
+    def test_invalid_schema(self):
+        self.assertRaises(jsonschema.SchemaError,
+                          jsonschema_validator.validate,
+                          {}, {'type': 'invalid'})
+        self.assertEqual(0, len(jsonschema_validator._validators))
@@ -0,0 +1,96 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from unittest import mock
+
+from tempest.lib.common import polling
+from tempest.tests import base
+
+
+class TestPollingPolicy(base.TestCase):
+
+    def test_default(self):
+        policy = polling.PollingPolicy()
+        self.assertEqual([3] * 5, [policy.get_delay(poll, 3)
+                                   for poll in range(1, 6)])
+
+    def test_initial_polls(self):
+        # Without backoff, the client interval is used after the initial
+        # polls
+        policy = polling.PollingPolicy(initial_interval=0.5, initial_polls=2)
+        self.assertEqual([0.5, 0.5, 3, 3], [policy.get_delay(poll, 3)
+                                            for poll in range(1, 5)])
+        policy = polling.PollingPolicy(initial_interval=0.5, initial_polls=3)
+        self.assertEqual(10, policy.get_delay(7, 10))
+
+    def test_initial_polls_max_interval(self):
+        policy = polling.PollingPolicy(initial_interval=0.5, initial_polls=1,
+                                       max_interval=2)
+        self.assertEqual([0.5, 2, 2], [policy.get_delay(poll, 3)
+                                       for poll in range(1, 4)])
+
+    def test_backoff(self):
+        policy = polling.PollingPolicy(initial_interval=0.5, initial_polls=2,
+                                       backoff=2, max_interval=5)
+        self.assertEqual([0.5, 0.5, 1, 2, 4, 5, 5],
+                         [policy.get_delay(poll, 3) for poll in range(1, 8)])
+
+    def test_backoff_client_interval(self):
+        policy = polling.PollingPolicy(initial_interval=1, backoff=2)
+        self.assertEqual([2, 3, 3], [policy.get_delay(poll, 3)
+                                     for poll in range(1, 4)])
+
+
+class TestPoller(base.TestCase):
+
+    def setUp(self):
+        super(TestPoller, self).setUp()
+        self.sleep = self.patch('time.sleep')
+
+    def test_sleep(self):
+        policy = polling.PollingPolicy(initial_interval=0.5, backoff=2)
+        poller = polling.Poller(1, 10, policy=policy)
+        for _ in range(3):
+            poller.sleep()
+        self.assertEqual([mock.call(1), mock.call(1), mock.call(1)],
+                         self.sleep.call_args_list)
+        self.assertEqual(3, poller.polls)
+
+    def test_sleep_default_policy(self):
+        time = self.patch('time.time')
+        poller = polling.Poller(2, 10)
+        poller.sleep()
+        self.sleep.assert_called_once_with(2)
+        # No deadline is computed by default
+        time.assert_not_called()
+
+    def test_sleep_deadline_aware(self):
+        self.patch('time.time', side_effect=[0, 5, 9, 11])
+        policy = polling.PollingPolicy(deadline_aware=True)
+        poller = polling.Poller(4, 10, policy=policy)
+        for _ in range(3):
+            poller.sleep()
+        # The last poll before the deadline is brought forward to it, and
+        # a waiter past its deadline still sleeps
+        self.assertEqual([mock.call(4), mock.call(1), mock.call(4)],
+                         self.sleep.call_args_list)
+
+    def test_set_policy(self):
+        policy = polling.PollingPolicy(initial_interval=0.1)
+        self.addCleanup(polling.set_policy, polling.set_policy(policy))
+        self.assertIs(policy, polling.get_policy())
+        self.assertIs(policy, polling.Poller(1, 10).policy)
+        self.assertIs(policy, polling.set_policy(None))
+        self.assertIs(polling._DEFAULT_POLICY, polling.get_policy())
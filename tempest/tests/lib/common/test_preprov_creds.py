@@ -12,9 +12,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from concurrent import futures
+import errno
 import hashlib
 import os
 import shutil
+import threading
 from unittest import mock
 
 import six
@@ -141,89 +144,139 @@ class TestPreProvisionedCredentials(base.TestCase):
             self.assertIn(hash, hash_dict['creds'].keys())
             self.assertIn(hash_dict['creds'][hash], self.test_accounts)
 
+    def _lock_path(self, hash_string):
+        return os.path.join(self.fixed_params['accounts_lock_dir'],
+                            hash_string)
+
+    def _lock_accounts(self, hash_list):
+        os.makedirs(self.fixed_params['accounts_lock_dir'], exist_ok=True)
+        for hash_string in hash_list:
+            with open(self._lock_path(hash_string), 'w') as fd:
+                fd.write('other class')
+
     def test_create_hash_file_previous_file(self):
         # Emulate the lock existing on the filesystem
-        self.useFixture(fixtures.MockPatch(
-            'os.path.isfile', return_value=True))
-        with mock.patch('six.moves.builtins.open', mock.mock_open(),
-                        create=True):
-            test_account_class = (
-                preprov_creds.PreProvisionedCredentialProvider(
-                    **self.fixed_params))
-            res = test_account_class._create_hash_file('12345')
+        self._lock_accounts(['12345'])
+        test_account_class = (
+            preprov_creds.PreProvisionedCredentialProvider(
+                **self.fixed_params))
+        res = test_account_class._create_hash_file('12345')
         self.assertFalse(res, "_create_hash_file should return False if the "
                          "pseudo-lock file already exists")
+        with open(self._lock_path('12345')) as fd:
+            self.assertEqual('other class', fd.read())
 
     def test_create_hash_file_no_previous_file(self):
         # Emulate the lock not existing on the filesystem
-        self.useFixture(fixtures.MockPatch(
-            'os.path.isfile', return_value=False))
-        with mock.patch('six.moves.builtins.open', mock.mock_open(),
-                        create=True):
-            test_account_class = (
-                preprov_creds.PreProvisionedCredentialProvider(
-                    **self.fixed_params))
-            res = test_account_class._create_hash_file('12345')
+        self._lock_accounts([])
+        test_account_class = (
+            preprov_creds.PreProvisionedCredentialProvider(
+                **self.fixed_params))
+        res = test_account_class._create_hash_file('12345')
         self.assertTrue(res, "_create_hash_file should return True if the "
                         "pseudo-lock doesn't already exist")
+        with open(self._lock_path('12345')) as fd:
+            self.assertEqual('test class', fd.read())
 
-    @mock.patch('oslo_concurrency.lockutils.lock')
-    def test_get_free_hash_no_previous_accounts(self, lock_mock):
-        # Emulate no pre-existing lock
-        self.useFixture(fixtures.MockPatch(
-            'os.path.isdir', return_value=False))
+    def test_get_free_hash_no_previous_accounts(self):
+        # Emulate no pre-existing lock dir
         hash_list = self._get_hash_list(self.test_accounts)
-        mkdir_mock = self.useFixture(fixtures.MockPatch('os.mkdir'))
-        self.useFixture(fixtures.MockPatch(
-            'os.path.isfile', return_value=False))
         test_account_class = preprov_creds.PreProvisionedCredentialProvider(
             **self.fixed_params)
-        with mock.patch('six.moves.builtins.open', mock.mock_open(),
-                        create=True) as open_mock:
-            test_account_class._get_free_hash(hash_list)
-            lock_path = os.path.join(self.fixed_params['accounts_lock_dir'],
-                                     hash_list[0])
-            open_mock.assert_called_once_with(lock_path, 'w')
-        mkdir_path = os.path.join(self.fixed_params['accounts_lock_dir'])
-        mkdir_mock.mock.assert_called_once_with(mkdir_path)
+        free_hash = test_account_class._get_free_hash(hash_list)
+        self.assertIn(free_hash, hash_list)
+        self.assertEqual([free_hash],
+                         os.listdir(self.fixed_params['accounts_lock_dir']))
 
-    @mock.patch('oslo_concurrency.lockutils.lock')
-    def test_get_free_hash_no_free_accounts(self, lock_mock):
+    def test_get_free_hash_no_free_accounts(self):
         hash_list = self._get_hash_list(self.test_accounts)
-        # Emulate pre-existing lock dir
-        self.useFixture(fixtures.MockPatch('os.path.isdir', return_value=True))
         # Emulate all locks in list are in use
-        self.useFixture(fixtures.MockPatch(
-            'os.path.isfile', return_value=True))
+        self._lock_accounts(hash_list)
         test_account_class = preprov_creds.PreProvisionedCredentialProvider(
             **self.fixed_params)
-        with mock.patch('six.moves.builtins.open', mock.mock_open(),
-                        create=True):
-            self.assertRaises(lib_exc.InvalidCredentials,
-                              test_account_class._get_free_hash, hash_list)
+        self.assertRaises(lib_exc.InvalidCredentials,
+                          test_account_class._get_free_hash, hash_list)
 
-    @mock.patch('oslo_concurrency.lockutils.lock')
-    def test_get_free_hash_some_in_use_accounts(self, lock_mock):
-        # Emulate no pre-existing lock
-        self.useFixture(fixtures.MockPatch('os.path.isdir', return_value=True))
+    def test_get_free_hash_some_in_use_accounts(self):
+        hash_list = self._get_hash_list(self.test_accounts)
+        # Emulate all locks but one in use
+        self._lock_accounts(hash_list[:3] + hash_list[4:])
+        test_account_class = preprov_creds.PreProvisionedCredentialProvider(
+            **self.fixed_params)
+        self.assertEqual(hash_list[3],
+                         test_account_class._get_free_hash(hash_list))
+        with open(self._lock_path(hash_list[3])) as fd:
+            self.assertEqual('test class', fd.read())
+
+    def test_get_free_hash_concurrent(self):
         hash_list = self._get_hash_list(self.test_accounts)
         test_account_class = preprov_creds.PreProvisionedCredentialProvider(
             **self.fixed_params)
+        with futures.ThreadPoolExecutor(max_workers=8) as executor:
+            allocated = list(executor.map(
+                lambda _: test_account_class._get_free_hash(hash_list),
+                hash_list))
+        # Each account was allocated once
+        self.assertEqual(sorted(hash_list), sorted(allocated))
+
+    def _waiting_provider(self, wait_timeout):
+        self.addCleanup(shutil.rmtree,
+                        self.fixed_params['accounts_lock_dir'] + '-waiters',
+                        ignore_errors=True)
+        self.patchobject(preprov_creds.PreProvisionedCredentialProvider,
+                         'WAIT_POLL_INTERVAL', 0.01)
+        return preprov_creds.PreProvisionedCredentialProvider(
+            wait_timeout=wait_timeout, **self.fixed_params)
+
+    def test_get_free_hash_wait(self):
+        hash_list = self._get_hash_list(self.test_accounts)
+        self._lock_accounts(hash_list)
+        test_account_class = self._waiting_provider(wait_timeout=10)
+        release = threading.Timer(
+            0.1, os.remove, args=[self._lock_path(hash_list[2])])
+        release.start()
+        self.addCleanup(release.cancel)
+        self.assertEqual(hash_list[2],
+                         test_account_class._get_free_hash(hash_list))
+        # The ticket of the waiter was removed
+        self.assertFalse(test_account_class._has_waiters(hash_list))
+
+    def test_get_free_hash_wait_timeout(self):
+        hash_list = self._get_hash_list(self.test_accounts)
+        self._lock_accounts(hash_list)
+        test_account_class = self._waiting_provider(wait_timeout=0.05)
+        self.assertRaises(lib_exc.InvalidCredentials,
+                          test_account_class._get_free_hash, hash_list)
+        self.assertFalse(test_account_class._has_waiters(hash_list))
 
-        def _fake_is_file(path):
-            # Fake isfile() to return that the path exists unless a specific
-            # hash is in the path
-            if hash_list[3] in path:
-                return False
-            return True
-
-        self.patchobject(os.path, 'isfile', _fake_is_file)
-        with mock.patch('six.moves.builtins.open', mock.mock_open(),
-                        create=True) as open_mock:
-            test_account_class._get_free_hash(hash_list)
-            lock_path = os.path.join(self.fixed_params['accounts_lock_dir'],
-                                     hash_list[3])
-            open_mock.assert_has_calls([mock.call(lock_path, 'w')])
+    def test_get_free_hash_wait_first_come_first_served(self):
+        hash_list = self._get_hash_list(self.test_accounts)
+        self._lock_accounts(hash_list[1:])
+        test_account_class = self._waiting_provider(wait_timeout=0.05)
+        # Another live process is already waiting for the same accounts
+        queue_dir = test_account_class._get_queue_dir(hash_list)
+        os.makedirs(queue_dir)
+        older_ticket = os.path.join(queue_dir,
+                                    '%017.6f-%d-1' % (1, os.getpid()))
+        open(older_ticket, 'w').close()
+        self.assertRaises(lib_exc.InvalidCredentials,
+                          test_account_class._get_free_hash, hash_list)
+        # Until it exits without removing its ticket
+        self.patchobject(test_account_class, '_is_process_alive',
+                         return_value=False)
+        self.assertEqual(hash_list[0],
+                         test_account_class._get_free_hash(hash_list))
+        self.assertFalse(os.path.exists(older_ticket))
+
+    def test_remove_hash_no_lock_file(self):
+        test_account_class = preprov_creds.PreProvisionedCredentialProvider(
+            **self.fixed_params)
+        self._lock_accounts([])
+        with mock.patch.object(preprov_creds, 'LOG') as log_mock:
+            test_account_class.remove_hash('12345')
+        log_mock.warning.assert_called_once_with(mock.ANY,
+                                                 self._lock_path('12345'))
+        self.assertTrue(os.path.isdir(self.fixed_params['accounts_lock_dir']))
 
     @mock.patch('oslo_concurrency.lockutils.lock')
     def test_remove_hash_last_account(self, lock_mock):
@@ -231,8 +284,6 @@ class TestPreProvisionedCredentials(base.TestCase):
         # Pretend the pseudo-lock is there
         self.useFixture(
             fixtures.MockPatch('os.path.isfile', return_value=True))
-        # Pretend the lock dir is empty
-        self.useFixture(fixtures.MockPatch('os.listdir', return_value=[]))
         test_account_class = preprov_creds.PreProvisionedCredentialProvider(
             **self.fixed_params)
         remove_mock = self.useFixture(fixtures.MockPatch('os.remove'))
@@ -250,18 +301,28 @@ class TestPreProvisionedCredentials(base.TestCase):
         # Pretend the pseudo-lock is there
         self.useFixture(fixtures.MockPatch(
             'os.path.isfile', return_value=True))
-        # Pretend the lock dir is empty
-        self.useFixture(fixtures.MockPatch('os.listdir', return_value=[
-            hash_list[1], hash_list[4]]))
         test_account_class = preprov_creds.PreProvisionedCredentialProvider(
             **self.fixed_params)
         remove_mock = self.useFixture(fixtures.MockPatch('os.remove'))
-        rmdir_mock = self.useFixture(fixtures.MockPatch('os.rmdir'))
+        # Pretend the lock dir is not empty
+        rmdir_mock = self.useFixture(fixtures.MockPatch(
+            'os.rmdir', side_effect=OSError(errno.ENOTEMPTY, 'not empty')))
         test_account_class.remove_hash(hash_list[2])
         hash_path = os.path.join(self.fixed_params['accounts_lock_dir'],
                                  hash_list[2])
         remove_mock.mock.assert_called_once_with(hash_path)
-        rmdir_mock.mock.assert_not_called()
+        rmdir_mock.mock.assert_called_once_with(
+            self.fixed_params['accounts_lock_dir'])
+
+    def test_remove_hash_lock_dir_removed(self):
+        test_account_class = preprov_creds.PreProvisionedCredentialProvider(
+            **self.fixed_params)
+        remove_mock = self.useFixture(fixtures.MockPatch('os.remove'))
+        # Another process released the last account at the same time
+        self.useFixture(fixtures.MockPatch(
+            'os.rmdir', side_effect=FileNotFoundError()))
+        test_account_class.remove_hash('12345')
+        remove_mock.mock.assert_called_once_with(self._lock_path('12345'))
 
     def test_is_multi_user(self):
         test_accounts_class = preprov_creds.PreProvisionedCredentialProvider(
@@ -0,0 +1,119 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+from unittest import mock
+
+from tempest.lib.common import request_log
+from tempest.lib.common import rest_client
+from tempest.tests import base
+from tempest.tests.lib import fake_auth_provider
+
+
+class TestRequestLogBuffer(base.TestCase):
+
+    def setUp(self):
+        super(TestRequestLogBuffer, self).setUp()
+        self.client = rest_client.RestClient(
+            fake_auth_provider.FakeAuthProvider(), None, None)
+        self.buf = request_log.RequestLogBuffer(size=2)
+
+    def _append(self, index, req_headers=None):
+        self.buf.append(self.client, 'FakeTest:test_fake', 'GET',
+                        'servers/%d' % index, {'status': '200'},
+                        req_headers=req_headers or {},
+                        resp_body='{"server": %d}' % index)
+
+    def test_format(self):
+        self._append(0, req_headers={'X-Auth-Token': 'secret'})
+        text = self.buf.format()
+        self.assertIn('Request (FakeTest:test_fake): 200 GET servers/0',
+                      text)
+        self.assertIn('{"server": 0}', text)
+        self.assertNotIn('secret', text)
+
+    def test_masked_when_buffered(self):
+        req_headers = {'X-Auth-Token': 'secret'}
+        self._append(0, req_headers=req_headers)
+        self.buf.append(self.client, 'FakeTest:test_fake', 'GET',
+                        'servers/1', {'status': '200',
+                                      'x-subject-token': 'secret'},
+                        resp_body='x' * 10000)
+        for entry in self.buf._entries:
+            self.assertNotIn('secret', repr(entry))
+        self.assertEqual(4096, len(entry.resp_body))
+        # The headers of the caller are left as they are
+        self.assertEqual({'X-Auth-Token': 'secret'}, req_headers)
+
+    def test_not_formatted_when_buffered(self):
+        with mock.patch.object(self.client, '_format_request_full',
+                               return_value='fake details') as fmt:
+            self._append(0)
+            fmt.assert_not_called()
+            self.buf.format()
+        fmt.assert_called_once_with({'status': '200'}, {}, None,
+                                    '{"server": 0}')
+
+    def test_concurrent_append(self):
+        self.buf = request_log.RequestLogBuffer(size=100)
+
+        def _append_many():
+            for index in range(50):
+                self._append(index)
+
+        threads = [threading.Thread(target=_append_many) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(100, len(self.buf))
+        self.assertEqual(100, self.buf.discarded)
+
+    def test_bounded(self):
+        for index in range(3):
+            self._append(index)
+        self.assertEqual(2, len(self.buf))
+        text = self.buf.format()
+        self.assertIn('1 older requests discarded', text)
+        self.assertNotIn('servers/0', text)
+        self.assertIn('servers/2', text)
+
+    def test_flush(self):
+        self._append(0)
+        with mock.patch.object(self.client.LOG, 'debug') as debug:
+            self.buf.flush()
+        debug.assert_called_once_with('%s', mock.ANY, extra=None)
+        self.assertIn('{"server": 0}', debug.call_args[0][1])
+        self.assertEqual(0, len(self.buf))
+
+
+class TestRequestLogActiveBuffer(base.TestCase):
+
+    def setUp(self):
+        super(TestRequestLogActiveBuffer, self).setUp()
+        self.addCleanup(request_log.stop)
+
+    def test_start_stop(self):
+        self.assertIsNone(request_log.get_buffer())
+        buf = request_log.start(size=5)
+        self.assertIs(buf, request_log.get_buffer())
+        self.assertIs(buf, request_log.stop())
+        self.assertIsNone(request_log.get_buffer())
+
+    def test_start_replaces_buffer(self):
+        first = request_log.start()
+        second = request_log.start()
+        self.assertIsNot(first, second)
+        self.assertIs(second, request_log.get_buffer())
@@ -0,0 +1,81 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from tempest.lib.common import response_cache
+from tempest.tests import base
+from tempest.tests.lib import fake_http
+
+
+class TestResponseCache(base.TestCase):
+
+    def setUp(self):
+        super(TestResponseCache, self).setUp()
+        self.time = self.patch('time.time', return_value=1000)
+        self.cache = response_cache.ResponseCache(maxsize=2, ttl=60)
+        self.resp = fake_http.fake_http_response({}, status=200)
+
+    def test_get_set(self):
+        self.assertIsNone(self.cache.get('key'))
+        self.cache.set('key', self.resp, 'body')
+        resp, body = self.cache.get('key')
+        self.assertEqual(self.resp, resp)
+        self.assertEqual(200, resp.status)
+        self.assertEqual('body', body)
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+
+    def test_copy_returned(self):
+        self.cache.set('key', self.resp, 'body')
+        resp, _ = self.cache.get('key')
+        resp['x-fake'] = 'changed'
+        self.assertNotIn('x-fake', self.cache.get('key')[0])
+
+    def test_expired(self):
+        self.cache.set('key', self.resp, 'body')
+        self.time.return_value = 1059
+        self.assertIsNotNone(self.cache.get('key'))
+        self.time.return_value = 1060
+        self.assertIsNone(self.cache.get('key'))
+        self.assertEqual(0, len(self.cache))
+
+    def test_lru_eviction(self):
+        self.cache.set('a', self.resp, 'a')
+        self.cache.set('b', self.resp, 'b')
+        # 'a' is now the most recently used
+        self.cache.get('a')
+        self.cache.set('c', self.resp, 'c')
+        self.assertEqual(2, len(self.cache))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNotNone(self.cache.get('c'))
+
+    def test_clear(self):
+        self.cache.set('key', self.resp, 'body')
+        self.cache.clear()
+        self.assertIsNone(self.cache.get('key'))
+
+
+class TestActiveResponseCache(base.TestCase):
+
+    def setUp(self):
+        super(TestActiveResponseCache, self).setUp()
+        self.addCleanup(response_cache.disable)
+
+    def test_enable_disable(self):
+        self.assertIsNone(response_cache.get_cache())
+        cache = response_cache.enable(30, maxsize=10)
+        self.assertIs(cache, response_cache.get_cache())
+        self.assertEqual((30, 10), (cache.ttl, cache.maxsize))
+        self.assertIs(cache, response_cache.disable())
+        self.assertIsNone(response_cache.get_cache())
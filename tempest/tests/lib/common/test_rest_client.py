@@ -13,14 +13,23 @@
 #    under the License.
 
 import copy
+import functools
+import time
+from unittest import mock
 
 import fixtures
 import jsonschema
 from oslo_serialization import jsonutils as json
 import six
+import urllib3
 
+from tempest.lib.common import api_metrics
 from tempest.lib.common import http
+from tempest.lib.common import jsonschema_validator
+from tempest.lib.common import request_log
+from tempest.lib.common import response_cache
 from tempest.lib.common import rest_client
+from tempest.lib.common import retry_policy
 from tempest.lib import exceptions
 from tempest.tests import base
 from tempest.tests.lib import fake_auth_provider
@@ -80,6 +89,281 @@ class TestRestClientHTTPMethods(BaseRestClientTestClass):
         self.assertEqual('COPY', return_dict['method'])
 
 
+class TestRestClientMapRequests(BaseRestClientTestClass):
+
+    def setUp(self):
+        self.fake_http = fake_http.fake_httplib2()
+        super(TestRestClientMapRequests, self).setUp()
+        self.useFixture(fixtures.MockPatchObject(self.rest_client,
+                                                 '_error_checker'))
+
+    def test_map_requests_empty(self):
+        self.assertEqual([], self.rest_client.map_requests([]))
+
+    def test_map_requests_specs(self):
+        requests = [{'method': 'GET', 'url': 'things/%d' % i}
+                    for i in range(20)]
+        results = self.rest_client.map_requests(requests, max_workers=4)
+        self.assertEqual(['things/%d' % i for i in range(20)],
+                         [body['uri'] for _, body in results])
+        self.assertEqual(set(['GET']),
+                         set(body['method'] for _, body in results))
+
+    def test_map_requests_callables_and_exceptions(self):
+        def _delete(thing_id):
+            if thing_id % 2:
+                raise exceptions.NotFound(thing_id)
+            return self.rest_client.delete('things/%d' % thing_id)
+
+        results = self.rest_client.map_requests(
+            [functools.partial(_delete, i) for i in range(4)])
+        self.assertEqual('things/0', results[0][1]['uri'])
+        self.assertIsInstance(results[1], exceptions.NotFound)
+        self.assertEqual('things/2', results[2][1]['uri'])
+        self.assertIsInstance(results[3], exceptions.NotFound)
+
+    def test_map_requests_rate_limited(self):
+        self.patchobject(self.rest_client, '_get_retry_after_delay',
+                         return_value=0)
+        self.patchobject(self.rest_client, 'is_absolute_limit',
+                         return_value=False)
+        self.patchobject(time, 'sleep')
+        responses = iter([
+            (fake_http.fake_http_response({'retry-after': '0'}, status=413),
+             ''),
+            (fake_http.fake_http_response({}), 'ok')])
+        self.patchobject(self.rest_client, '_request',
+                         side_effect=lambda *args, **kwargs: next(responses))
+        results = self.rest_client.map_requests(
+            [{'method': 'GET', 'url': 'things'}])
+        self.assertEqual(200, results[0][0].status)
+        self.assertEqual('ok', results[0][1])
+
+
+class TestRestClientStream(BaseRestClientTestClass):
+
+    def setUp(self):
+        self.fake_http = fake_http.fake_httplib2()
+        super(TestRestClientStream, self).setUp()
+        self.stream = urllib3.HTTPResponse(body=six.BytesIO(b'data1'),
+                                           preload_content=False)
+
+    def _fake_request(self, status):
+        resp = fake_http.fake_http_response(
+            {'content-type': 'text/plain'}, status=status)
+        self.request = self.patchobject(http.ClosingHttp, 'request',
+                                        return_value=(resp, self.stream))
+
+    def test_get_stream(self):
+        self._fake_request(200)
+        resp, body = self.rest_client.get(self.url, stream=True)
+        self.assertIsInstance(body, rest_client.ResponseBodyData)
+        self.assertEqual(resp, body.response)
+        self.assertEqual([b'data1'], list(body))
+        self.assertFalse(self.request.call_args[1]['preload_content'])
+
+    def test_get_stream_no_content(self):
+        self.stream = urllib3.HTTPResponse(body=six.BytesIO(b''),
+                                           preload_content=False)
+        self._fake_request(204)
+        _, body = self.rest_client.get(self.url, stream=True)
+        self.assertEqual(b'', body)
+
+    def test_get_stream_error(self):
+        self._fake_request(404)
+        self.assertRaises(exceptions.NotFound, self.rest_client.get,
+                          self.url, stream=True)
+
+    def test_get_no_stream(self):
+        self._fake_request(200)
+        self.rest_client.get(self.url)
+        self.assertNotIn('preload_content', self.request.call_args[1])
+
+
+class TestRestClientSharedPool(base.TestCase):
+
+    def setUp(self):
+        super(TestRestClientSharedPool, self).setUp()
+        self.fake_auth_provider = fake_auth_provider.FakeAuthProvider()
+        self.addCleanup(http.clear_shared_http)
+
+    def test_default_pool_not_shared(self):
+        clients = [rest_client.RestClient(self.fake_auth_provider, None, None)
+                   for _ in range(2)]
+        self.assertIsNot(clients[0].http_obj, clients[1].http_obj)
+
+    def test_shared_pool(self):
+        clients = [rest_client.RestClient(self.fake_auth_provider, None, None,
+                                          http_shared_pool=True)
+                   for _ in range(2)]
+        self.assertIs(clients[0].http_obj, clients[1].http_obj)
+        self.assertIs(http.get_shared_http(), clients[0].http_obj)
+
+
+class TestRestClientRequestLog(base.TestCase):
+
+    def setUp(self):
+        super(TestRestClientRequestLog, self).setUp()
+        self.rest_client = rest_client.RestClient(
+            fake_auth_provider.FakeAuthProvider(), None, None)
+        self.patchobject(self.rest_client.LOG, 'isEnabledFor',
+                         return_value=True)
+        self.log_full = self.patchobject(self.rest_client,
+                                         '_log_request_full')
+        self.addCleanup(request_log.stop)
+        self.resp = {'status': '200'}
+
+    def test_logged_without_buffer(self):
+        self.rest_client._log_request('GET', 'fake_url', self.resp,
+                                      req_headers={}, resp_body='{}')
+        self.log_full.assert_called_once_with(self.resp, {}, None, '{}',
+                                              mock.ANY)
+
+    def test_buffered(self):
+        buf = request_log.start()
+        self.rest_client._log_request('GET', 'fake_url', self.resp,
+                                      req_headers={}, resp_body='{}')
+        self.log_full.assert_not_called()
+        self.assertEqual(1, len(buf))
+        self.assertIn('200 GET fake_url', buf.format())
+
+
+class TestRestClientAPIMetrics(BaseRestClientTestClass):
+
+    def setUp(self):
+        self.fake_http = fake_http.fake_httplib2()
+        super(TestRestClientAPIMetrics, self).setUp()
+        self.rest_client.service = 'compute'
+        self.addCleanup(api_metrics.disable)
+
+    def test_not_recorded_when_disabled(self):
+        self.rest_client.raw_request('servers/1', 'GET')
+        self.assertIsNone(api_metrics.get_collector())
+
+    def test_recorded(self):
+        metrics = api_metrics.enable()
+        self.rest_client.raw_request('servers/1', 'GET')
+        self.rest_client.raw_request('servers/2', 'GET')
+        entries = metrics.to_list()
+        self.assertEqual(1, len(entries))
+        self.assertEqual(('compute', 'GET', 'servers/{id}', 200, 2),
+                         tuple(entries[0][k] for k in (
+                             'service', 'method', 'url', 'status',
+                             'count')))
+
+
+class TestRestClientRetryPolicy(BaseRestClientTestClass):
+
+    def setUp(self):
+        self.fake_http = fake_http.fake_httplib2()
+        super(TestRestClientRetryPolicy, self).setUp()
+        self.rest_client.retry_policy = retry_policy.RetryPolicy(
+            max_retries=2, backoff=0.5)
+        self.sleep = self.patch('time.sleep')
+        self.ok = (fake_http.fake_http_response({}, status=200), '{}')
+        self.unavailable = (fake_http.fake_http_response({}, status=503),
+                            'busy')
+
+    def _patch_request(self, *results):
+        return self.patchobject(self.rest_client, '_request',
+                                side_effect=list(results))
+
+    def test_retried_on_status(self):
+        request = self._patch_request(self.unavailable, self.ok)
+        resp, _ = self.rest_client.get('servers')
+        self.assertEqual(200, resp.status)
+        self.assertEqual(2, request.call_count)
+        self.sleep.assert_called_once()
+
+    def test_retried_on_connection_error(self):
+        request = self._patch_request(
+            urllib3.exceptions.ProtocolError('Connection reset'), self.ok)
+        resp, _ = self.rest_client.delete('servers/1')
+        self.assertEqual(200, resp.status)
+        self.assertEqual(2, request.call_count)
+
+    def test_max_retries(self):
+        request = self._patch_request(*[self.unavailable] * 3)
+        self.assertRaises(exceptions.RestClientException,
+                          self.rest_client.get, 'servers')
+        self.assertEqual(3, request.call_count)
+        self.assertEqual(2, self.sleep.call_count)
+
+    def test_non_idempotent_not_retried(self):
+        request = self._patch_request(self.unavailable, self.ok)
+        self.assertRaises(exceptions.RestClientException,
+                          self.rest_client.post, 'servers', '{}')
+        self.assertEqual(1, request.call_count)
+
+    def test_chunked_not_retried(self):
+        request = self._patch_request(self.unavailable, self.ok)
+        self.assertRaises(exceptions.RestClientException,
+                          self.rest_client.put, 'object', iter([b'data']),
+                          chunked=True)
+        self.assertEqual(1, request.call_count)
+
+    def test_disabled(self):
+        self.rest_client.retry_policy = None
+        request = self._patch_request(self.unavailable, self.ok)
+        self.assertRaises(exceptions.RestClientException,
+                          self.rest_client.get, 'servers')
+        self.assertEqual(1, request.call_count)
+
+
+class TestRestClientResponseCache(BaseRestClientTestClass):
+
+    def setUp(self):
+        self.fake_http = fake_http.fake_httplib2()
+        super(TestRestClientResponseCache, self).setUp()
+        self.useFixture(fixtures.MockPatchObject(self.rest_client,
+                                                 '_error_checker'))
+        self.request = self.patchobject(
+            self.rest_client, 'request',
+            wraps=self.rest_client.request)
+        self.addCleanup(response_cache.disable)
+
+    def test_cache_disabled(self):
+        self.rest_client.get('extensions', cache=True)
+        self.rest_client.get('extensions', cache=True)
+        self.assertEqual(2, self.request.call_count)
+
+    def test_cached(self):
+        response_cache.enable(60)
+        first = self.rest_client.get('extensions', cache=True)
+        second = self.rest_client.get('extensions', cache=True)
+        self.assertEqual(first, second)
+        self.assertEqual(1, self.request.call_count)
+
+    def test_not_cacheable(self):
+        response_cache.enable(60)
+        self.rest_client.get('extensions')
+        self.rest_client.get('extensions')
+        self.assertEqual(2, self.request.call_count)
+
+    def test_not_shared(self):
+        response_cache.enable(60)
+        self.rest_client.get('extensions', cache=True)
+        # Other headers
+        self.rest_client.get('extensions', headers={'X-Fake': 'fake'},
+                             cache=True)
+        # Other url
+        self.rest_client.get('versions', cache=True)
+        # Other credentials
+        self.rest_client.auth_provider = (
+            fake_auth_provider.FakeAuthProvider())
+        self.rest_client.get('extensions', cache=True)
+        self.assertEqual(4, self.request.call_count)
+
+    def test_get_versions_cached(self):
+        response_cache.enable(60)
+        self.patchobject(self.rest_client, '_parse_resp',
+                         return_value=[{'id': 'v1'}])
+        for _ in range(2):
+            _, versions = self.rest_client.get_versions()
+            self.assertEqual(['v1'], list(versions))
+        self.assertEqual(1, self.request.call_count)
+
+
 class TestRestClientNotFoundHandling(BaseRestClientTestClass):
     def setUp(self):
         self.fake_http = fake_http.fake_httplib2(404)
@@ -735,6 +1019,36 @@ class TestResponseBodyData(base.TestCase):
         self.assertEqual("response: %s\nBody: %s" % (response, data),
                          str(actual))
 
+    def test_read(self):
+        actual = rest_client.ResponseBodyData({'status': 200}, b'data1')
+        self.assertEqual(b'da', actual.read(2))
+        self.assertEqual(b'ta1', actual.read())
+        self.assertEqual(b'', actual.read())
+        self.assertEqual(b'data1', actual.data)
+
+    def test_stream(self):
+        response = {'status': 200}
+        stream = urllib3.HTTPResponse(body=six.BytesIO(b'data1'),
+                                      preload_content=False)
+        self.patchobject(stream, 'release_conn')
+        actual = rest_client.ResponseBodyData(response, stream)
+        self.assertEqual("response: %s\nBody: <stream>" % response,
+                         str(actual))
+        self.assertEqual([b'da', b'ta', b'1'],
+                         list(actual.iter_chunks(chunk_size=2)))
+        stream.release_conn.assert_called_once_with()
+        self.assertEqual(b'', actual.read())
+
+    def test_stream_data(self):
+        stream = urllib3.HTTPResponse(body=six.BytesIO(b'data1'),
+                                      preload_content=False)
+        self.patchobject(stream, 'release_conn')
+        actual = rest_client.ResponseBodyData({'status': 200}, stream)
+        self.assertEqual(b'd', actual.read(1))
+        self.assertEqual(b'ata1', actual.data)
+        self.assertEqual(b'ata1', actual.data)
+        stream.release_conn.assert_called_once_with()
+
 
 class TestResponseBodyList(base.TestCase):
 
@@ -1150,9 +1464,20 @@ class TestRestClientJSONSchemaValidatorVersion(TestJSONSchemaValidationBase):
     }
 
     def test_current_json_schema_validator_version(self):
+        jsonschema_validator.clear_validator_cache()
         with fixtures.MockPatchObject(jsonschema.Draft4Validator,
                                       "check_schema") as chk_schema:
             body = {'foo': 'test'}
             self._test_validate_pass(self.schema, body)
             chk_schema.mock.assert_called_once_with(
                 self.schema['response_body'])
+
+    def test_schema_checked_once(self):
+        jsonschema_validator.clear_validator_cache()
+        with fixtures.MockPatchObject(jsonschema.Draft4Validator,
+                                      "check_schema") as chk_schema:
+            for body in [{'foo': 'test'}, {'foo': 'test2'}]:
+                self._test_validate_pass(self.schema, body)
+            self._test_validate_fail(self.schema, {'foo': 1})
+            chk_schema.mock.assert_called_once_with(
+                self.schema['response_body'])
@@ -0,0 +1,79 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from unittest import mock
+
+import urllib3
+
+from tempest.lib.common import retry_policy
+from tempest.tests import base
+from tempest.tests.lib import fake_http
+
+
+class TestRetryPolicy(base.TestCase):
+
+    def setUp(self):
+        super(TestRetryPolicy, self).setUp()
+        self.policy = retry_policy.RetryPolicy(
+            max_retries=3, backoff=1, max_backoff=10)
+        # Always pick the highest delay
+        self.patch('random.uniform', side_effect=lambda a, b: b)
+
+    def _resp(self, status, headers=None):
+        return fake_http.fake_http_response(headers or {}, status=status)
+
+    def test_get_delay_exponential(self):
+        self.assertEqual([1, 2, 4, 8, 10, 10],
+                         [self.policy.get_delay(r) for r in range(1, 7)])
+
+    def test_get_delay_retry_after(self):
+        resp = self._resp(503, {'retry-after': '5'})
+        self.assertEqual(5, self.policy.get_delay(1, resp))
+        resp = self._resp(503, {'retry-after': '60'})
+        self.assertEqual(10, self.policy.get_delay(1, resp))
+
+    def test_retry_response(self):
+        self.assertEqual(
+            2, self.policy.retry_response('GET', self._resp(503), 2, 0))
+
+    def test_retry_response_not_retried(self):
+        self.assertIsNone(
+            self.policy.retry_response('GET', self._resp(500), 1, 0))
+        self.assertIsNone(
+            self.policy.retry_response('POST', self._resp(503), 1, 0))
+        self.assertIsNone(
+            self.policy.retry_response('GET', self._resp(503), 4, 0))
+
+    def test_retry_response_deadline(self):
+        self.policy.deadline = 10
+        self.assertEqual(
+            4, self.policy.retry_response('GET', self._resp(429), 3, 6))
+        self.assertIsNone(
+            self.policy.retry_response('GET', self._resp(429), 3, 7))
+
+    def test_retry_exception(self):
+        exc = urllib3.exceptions.ProtocolError('Connection reset')
+        self.assertEqual(
+            1, self.policy.retry_exception('DELETE', exc, 1, 0))
+        self.assertIsNone(
+            self.policy.retry_exception('DELETE', ValueError(), 1, 0))
+        self.policy.retry_connection_errors = False
+        self.assertIsNone(
+            self.policy.retry_exception('DELETE', exc, 1, 0))
+
+    def test_jitter(self):
+        with mock.patch('random.uniform', return_value=0.5) as uniform:
+            self.assertEqual(0.5, self.policy.get_delay(3))
+        uniform.assert_called_once_with(0, 4)
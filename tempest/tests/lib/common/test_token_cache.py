@@ -0,0 +1,84 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import shutil
+import stat
+import tempfile
+
+from tempest.lib.common import token_cache
+from tempest.tests import base
+
+
+class TestTokenCache(base.TestCase):
+
+    def setUp(self):
+        super(TestTokenCache, self).setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.directory = os.path.join(directory, 'tokens')
+        self.cache = token_cache.TokenCache(self.directory)
+        self.key = token_cache.make_key('v3', 'http://fake', 'password')
+
+    def test_make_key(self):
+        self.assertEqual(self.key, token_cache.make_key(
+            'v3', 'http://fake', 'password'))
+        self.assertNotEqual(self.key, token_cache.make_key(
+            'v3', 'http://fake', 'other'))
+        self.assertNotIn('password', self.key)
+
+    def test_get_set(self):
+        self.assertIsNone(self.cache.get(self.key))
+        self.cache.set(self.key, 'token', {'expires_at': 'never'})
+        self.assertEqual(('token', {'expires_at': 'never'}),
+                         self.cache.get(self.key))
+        self.cache.delete(self.key)
+        self.assertIsNone(self.cache.get(self.key))
+        self.cache.delete(self.key)
+
+    def test_files_private(self):
+        self.cache.set(self.key, 'token', {})
+        self.assertEqual(0o700, stat.S_IMODE(os.stat(self.directory).st_mode))
+        for name in os.listdir(self.directory):
+            mode = os.stat(os.path.join(self.directory, name)).st_mode
+            self.assertEqual(0, stat.S_IMODE(mode) & 0o077)
+
+    def test_get_invalid(self):
+        self.cache.set(self.key, 'token', {})
+        with open(self.cache._path(self.key), 'w') as fd:
+            fd.write('{"token"')
+        self.assertIsNone(self.cache.get(self.key))
+
+    def test_lock(self):
+        with self.cache.lock(self.key):
+            self.cache.set(self.key, 'token', {})
+        self.assertEqual('token', self.cache.get(self.key)[0])
+
+
+class TestActiveTokenCache(base.TestCase):
+
+    def setUp(self):
+        super(TestActiveTokenCache, self).setUp()
+        self.addCleanup(token_cache.disable)
+
+    def test_enable_disable(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.assertIsNone(token_cache.get_cache())
+        cache = token_cache.enable(directory)
+        self.assertIs(cache, token_cache.get_cache())
+        self.assertEqual(directory, cache.directory)
+        self.assertIs(cache, token_cache.disable())
+        self.assertIsNone(token_cache.get_cache())
@@ -0,0 +1,112 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import gc
+import threading
+
+from tempest.lib.common import token_refresher
+from tempest.tests import base
+
+
+class FakeAuthProvider(object):
+
+    token_expiry_threshold = datetime.timedelta(seconds=60)
+    credentials = 'fake credentials'
+
+    def __init__(self, expires_in, fail=False):
+        self.cache = ('token', self._expiry(expires_in))
+        self.fail = fail
+        self.renewed = threading.Event()
+
+    @staticmethod
+    def _expiry(expires_in):
+        return (datetime.datetime.utcnow() +
+                datetime.timedelta(seconds=expires_in))
+
+    def get_expiry(self, auth_data):
+        return auth_data[1]
+
+    def renew_auth(self, auth_data):
+        if self.fail:
+            raise Exception('Unauthorized')
+        self.cache = ('new token', self._expiry(3600))
+        self.renewed.set()
+
+
+class TestTokenRefresher(base.TestCase):
+
+    def setUp(self):
+        super(TestTokenRefresher, self).setUp()
+        self.refresher = token_refresher.TokenRefresher(
+            margin=30, interval=3600)
+        self.addCleanup(self.refresher.stop)
+
+    def test_refresh(self):
+        expiring = FakeAuthProvider(expires_in=80)
+        valid = FakeAuthProvider(expires_in=100)
+        self.refresher.touch(expiring)
+        self.refresher.touch(valid)
+        self.refresher.refresh()
+        self.assertEqual('new token', expiring.cache[0])
+        self.assertEqual('token', valid.cache[0])
+
+    def test_refresh_idle(self):
+        provider = FakeAuthProvider(expires_in=0)
+        self.refresher.touch(provider)
+        self.refresher.idle_timeout = 0
+        self.refresher.refresh()
+        self.assertEqual('token', provider.cache[0])
+
+    def test_refresh_no_auth_data(self):
+        provider = FakeAuthProvider(expires_in=0)
+        provider.cache = None
+        self.refresher.touch(provider)
+        self.refresher.refresh()
+        self.assertIsNone(provider.cache)
+
+    def test_refresh_failure(self):
+        provider = FakeAuthProvider(expires_in=0, fail=True)
+        self.refresher.touch(provider)
+        self.refresher.refresh()
+        self.assertNotIn(provider, self.refresher._last_used)
+
+    def test_weak_references(self):
+        self.refresher.touch(FakeAuthProvider(expires_in=0))
+        gc.collect()
+        self.assertEqual(0, len(self.refresher._last_used))
+
+    def test_background_thread(self):
+        self.refresher.interval = 0.01
+        provider = FakeAuthProvider(expires_in=0)
+        self.refresher.touch(provider)
+        self.assertTrue(provider.renewed.wait(5))
+        self.refresher.stop()
+        self.assertFalse(self.refresher._thread.is_alive())
+
+
+class TestActiveTokenRefresher(base.TestCase):
+
+    def setUp(self):
+        super(TestActiveTokenRefresher, self).setUp()
+        self.addCleanup(token_refresher.disable)
+
+    def test_enable_disable(self):
+        self.assertIsNone(token_refresher.get_refresher())
+        refresher = token_refresher.enable(30)
+        self.assertIs(refresher, token_refresher.get_refresher())
+        self.assertEqual(datetime.timedelta(seconds=30), refresher.margin)
+        self.assertIs(refresher, token_refresher.disable())
+        self.assertIsNone(token_refresher.get_refresher())
@@ -0,0 +1,178 @@
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import shutil
+import tempfile
+
+from tempest.lib.common import waiter_timeline
+from tempest.lib import exceptions
+from tempest.tests import base
+
+
+class TestRecorder(base.TestCase):
+
+    def setUp(self):
+        super(TestRecorder, self).setUp()
+        self.collector = waiter_timeline.enable()
+        self.addCleanup(waiter_timeline.disable)
+
+    def test_record(self):
+        self.patch('time.time', side_effect=[100., 101., 105., 109., 110.])
+
+        @waiter_timeline.recorded
+        def _wait():
+            waiter_timeline.observe('server', 'fake_id', 'BUILD',
+                                    'scheduling')
+            waiter_timeline.observe('server', 'fake_id', 'BUILD',
+                                    'scheduling')
+            waiter_timeline.observe('server', 'fake_id', 'BUILD', 'spawning')
+            waiter_timeline.observe('server', 'fake_id', 'ACTIVE')
+            return 'fake result'
+
+        self.assertEqual('fake result', _wait())
+        recorded, = self.collector.to_list()
+        self.assertEqual('server', recorded['resource_type'])
+        self.assertEqual('fake_id', recorded['resource_id'])
+        self.assertEqual(4, recorded['polls'])
+        self.assertEqual('reached', recorded['outcome'])
+        self.assertEqual(10., recorded['duration'])
+        self.assertEqual(
+            [{'time': 1., 'status': 'BUILD', 'task_state': 'scheduling'},
+             {'time': 5., 'status': 'BUILD', 'task_state': 'spawning'},
+             {'time': 9., 'status': 'ACTIVE', 'task_state': None}],
+            recorded['transitions'])
+        self.assertEqual([('BUILD/scheduling', 4.), ('BUILD/spawning', 4.)],
+                         waiter_timeline.get_state_durations(recorded))
+
+    def test_record_outcome(self):
+        @waiter_timeline.recorded
+        def _wait(error):
+            waiter_timeline.observe('volume', 'fake_id', 'creating')
+            raise error
+
+        self.assertRaises(exceptions.TimeoutException, _wait,
+                          exceptions.TimeoutException())
+        self.assertRaises(ValueError, _wait, ValueError())
+        self.assertEqual(['timeout', 'error'],
+                         [timeline['outcome']
+                          for timeline in self.collector.to_list()])
+
+    def test_record_several_resources(self):
+        @waiter_timeline.recorded
+        def _wait():
+            waiter_timeline.observe('volume', 'v1', 'creating')
+            waiter_timeline.observe('volume', 'v2', 'available')
+
+        _wait()
+        self.assertEqual(
+            {'v1': 'creating', 'v2': 'available'},
+            dict((timeline['resource_id'],
+                  timeline['transitions'][0]['status'])
+                 for timeline in self.collector.to_list()))
+
+    def test_record_nested(self):
+        @waiter_timeline.recorded
+        def _inner():
+            waiter_timeline.observe('volume', 'v1', 'available')
+
+        @waiter_timeline.recorded
+        def _outer():
+            _inner()
+            waiter_timeline.observe('server', 's1', 'ACTIVE')
+
+        _outer()
+        self.assertEqual(['v1', 's1'],
+                         [timeline['resource_id']
+                          for timeline in self.collector.to_list()])
+
+    def test_observe_outside_waiter(self):
+        waiter_timeline.observe('server', 'fake_id', 'ACTIVE')
+        self.assertEqual([], self.collector.to_list())
+
+    def test_disabled(self):
+        waiter_timeline.disable()
+        time = self.patch('time.time')
+
+        @waiter_timeline.recorded
+        def _wait():
+            waiter_timeline.observe('server', 'fake_id', 'ACTIVE')
+
+        _wait()
+        time.assert_not_called()
+        self.assertEqual([], self.collector.to_list())
+
+
+class TestTimelineCollector(base.TestCase):
+
+    def setUp(self):
+        super(TestTimelineCollector, self).setUp()
+        self.collector = waiter_timeline.TimelineCollector()
+
+    @staticmethod
+    def _timeline(resource_type, *transitions):
+        return {'resource_type': resource_type, 'transitions': [
+            {'time': time, 'status': status, 'task_state': None}
+            for time, status in transitions]}
+
+    def test_mark(self):
+        self.collector.add(self._timeline('server'))
+        marker = self.collector.mark()
+        self.collector.add(self._timeline('volume'))
+        self.assertEqual(['volume'],
+                         [timeline['resource_type'] for timeline
+                          in self.collector.to_list(since=marker)])
+
+    def test_summary(self):
+        self.collector.add(self._timeline(
+            'server', (0, 'BUILD'), (10, 'ACTIVE')))
+        self.collector.add(self._timeline(
+            'server', (0, 'BUILD'), (20, 'ACTIVE'), (21, 'SHUTOFF')))
+        self.collector.add(self._timeline(
+            'volume', (0, 'creating'), (5, 'available')))
+        summary = self.collector.get_summary()
+        self.assertEqual(
+            [('server', 'BUILD', 2, 30, 20), ('volume', 'creating', 1, 5, 5),
+             ('server', 'ACTIVE', 1, 1, 1)],
+            [(e['resource_type'], e['state'], e['count'], e['total_time'],
+              e['max_time']) for e in summary])
+        lines = self.collector.format_summary(limit=2).splitlines()
+        self.assertEqual(3, len(lines))
+        self.assertIn('BUILD', lines[1])
+
+    def test_dump_load_dir(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.collector.add(self._timeline('server', (0, 'BUILD')))
+        self.collector.dump(os.path.join(directory,
+                                         'waiter-timeline-1.json'))
+        self.collector.dump(os.path.join(directory,
+                                         'waiter-timeline-2.json'))
+        merged = waiter_timeline.load_dir(directory)
+        self.assertEqual(2, len(merged.to_list()))
+
+    def test_dump_to_dir(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.addCleanup(waiter_timeline.disable)
+        waiter_timeline.dump_to_dir(directory)
+        collector = waiter_timeline.enable()
+        self.assertIs(collector, waiter_timeline.get_collector())
+        waiter_timeline.dump_to_dir(directory)
+        self.assertEqual([], os.listdir(directory))
+        collector.add(self._timeline('server', (0, 'BUILD')))
+        waiter_timeline.dump_to_dir(directory)
+        self.assertEqual(['waiter-timeline-%d.json' % os.getpid()],
+                         os.listdir(directory))
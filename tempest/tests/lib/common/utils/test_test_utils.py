@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
 import time
 from unittest import mock
 
@@ -62,6 +63,52 @@ class TestTestUtils(base.TestCase):
         self.assertEqual('TestTestUtils:tearDownClass',
                          tearDownClass(self.__class__))
 
+    def test_find_test_caller_published(self):
+        token = test_utils.set_test_caller('FakeTest:test_fake')
+        self.addCleanup(test_utils.reset_test_caller, token)
+        with mock.patch.object(test_utils.inspect, 'currentframe') as frame:
+            self.assertEqual('FakeTest:test_fake',
+                             test_utils.find_test_caller())
+        # The stack is not walked when a caller is published
+        frame.assert_not_called()
+
+    def test_reset_test_caller(self):
+        outer = test_utils.set_test_caller('FakeTest:setUpClass')
+        inner = test_utils.set_test_caller('FakeTest:tearDownClass')
+        self.assertEqual('FakeTest:tearDownClass',
+                         test_utils.find_test_caller())
+        test_utils.reset_test_caller(inner)
+        self.assertEqual('FakeTest:setUpClass', test_utils.find_test_caller())
+        test_utils.reset_test_caller(outer)
+        self.assertEqual('TestTestUtils:test_reset_test_caller',
+                         test_utils.find_test_caller())
+
+    def test_test_caller_context(self):
+        with test_utils.test_caller_context('FakeTest:test_fake'):
+            self.assertEqual('FakeTest:test_fake',
+                             test_utils.find_test_caller())
+        self.assertEqual('TestTestUtils:test_test_caller_context',
+                         test_utils.find_test_caller())
+
+    def test_test_caller_not_shared_with_threads(self):
+        callers = []
+
+        def _find_caller():
+            callers.append(test_utils._test_caller.get())
+
+        with test_utils.test_caller_context('FakeTest:test_fake'):
+            unbound = threading.Thread(target=_find_caller)
+            bound = threading.Thread(
+                target=test_utils.bind_test_caller(_find_caller))
+        for t in (unbound, bound):
+            t.start()
+            t.join()
+        self.assertEqual([None, 'FakeTest:test_fake'], callers)
+
+    def test_bind_test_caller_nothing_published(self):
+        func = mock.Mock()
+        self.assertIs(func, test_utils.bind_test_caller(func))
+
     def test_call_and_ignore_notfound_exc_when_notfound_raised(self):
         def raise_not_found():
             raise exceptions.NotFound()
@@ -14,6 +14,7 @@
 
 import six
 
+from tempest.lib.common import rest_client
 from tempest.lib.common.utils import data_utils
 from tempest.lib.services.image.v2 import images_client
 from tempest.tests.lib import fake_auth_provider
@@ -201,6 +202,20 @@ class TestImagesClient(base.BaseServiceTest):
             headers={'Content-Type': 'application/octet-stream'},
             status=200)
 
+    def test_show_image_file_stream(self):
+        resp, _ = self.create_response({}, False, 200, None)
+        stream = six.BytesIO(b'image data')
+        body = rest_client.ResponseBodyData(resp, stream)
+        mock_get = self.patchobject(rest_client.RestClient, 'get',
+                                    return_value=(resp, body))
+        image_file = self.client.show_image_file(
+            self.FAKE_CREATE_UPDATE_SHOW_IMAGE["id"], stream=True)
+        mock_get.assert_called_once_with(
+            'images/%s/file' % self.FAKE_CREATE_UPDATE_SHOW_IMAGE["id"],
+            stream=True)
+        self.assertIs(body, image_file)
+        self.assertEqual([b'image data'], list(image_file))
+
     def test_add_image_tag(self):
         self.check_service_client_function(
             self.client.add_image_tag,
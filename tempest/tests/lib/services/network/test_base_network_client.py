@@ -35,6 +35,27 @@ class TestBaseNetworkClient(base.BaseServiceTest):
     def _assert_empty(self, resp):
         self.assertEqual([], list(resp.keys()))
 
+    @mock.patch('tempest.lib.common.rest_client.RestClient.get')
+    def test_list_resources(self, mock_get):
+        response = fake_http.fake_http_response(headers=None, status=200)
+        mock_get.return_value = response, '{"baz": []}'
+
+        # A filter named cache is sent to the API like any other
+        resp = self.client.list_resources('/fake_url', cache='qux')
+
+        self.assertEqual([], resp['baz'])
+        mock_get.assert_called_once_with('v2.0/fake_url?cache=qux')
+
+    @mock.patch('tempest.lib.common.rest_client.RestClient.get')
+    def test_list_resources_cached(self, mock_get):
+        response = fake_http.fake_http_response(headers=None, status=200)
+        mock_get.return_value = response, '{"baz": []}'
+
+        resp = self.client._list_resources_cached('/fake_url', foo='bar')
+
+        self.assertEqual([], resp['baz'])
+        mock_get.assert_called_once_with('v2.0/fake_url?foo=bar', cache=True)
+
     @mock.patch('tempest.lib.common.rest_client.RestClient.post')
     def test_create_resource(self, mock_post):
         response = fake_http.fake_http_response(headers=None, status=201)
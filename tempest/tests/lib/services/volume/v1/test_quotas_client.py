@@ -12,6 +12,10 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import json
+from unittest import mock
+
+from tempest.lib.common import json_codec
 from tempest.lib.services.volume.v1 import quotas_client
 from tempest.tests.lib import fake_auth_provider
 from tempest.tests.lib.services import base
@@ -94,3 +98,18 @@ class TestQuotasClient(base.BaseServiceTest):
             'tempest.lib.common.rest_client.RestClient.delete',
             {},
             tenant_id="fake_tenant")
+
+    def test_update_quota_set_with_json_backend(self):
+        # The request and response bodies go through the selected backend
+        loads = mock.Mock(side_effect=json.loads)
+        dumps = mock.Mock(side_effect=json.dumps)
+        with mock.patch.dict(json_codec._codec, name='fake', loads=loads,
+                             dumps=dumps):
+            self.check_service_client_function(
+                self.client.update_quota_set,
+                'tempest.lib.common.rest_client.RestClient.put',
+                self.FAKE_UPDATE_QUOTAS_REQUEST,
+                tenant_id="fake_tenant", volumes=21)
+        dumps.assert_called_once_with({'quota_set': {'volumes': 21}})
+        loads.assert_called_once_with(
+            json.dumps(self.FAKE_UPDATE_QUOTAS_REQUEST))
@@ -15,11 +15,15 @@
 
 import copy
 import datetime
+import shutil
+import tempfile
 
 import fixtures
 import testtools
 
 from tempest.lib import auth
+from tempest.lib.common import token_cache
+from tempest.lib.common import token_refresher
 from tempest.lib import exceptions
 from tempest.lib.services.identity.v2 import token_client as v2_client
 from tempest.lib.services.identity.v3 import token_client as v3_client
@@ -433,6 +437,57 @@ class TestKeystoneV2AuthProvider(BaseAuthTestsSetUp):
         expected = 'http://fake_url/'
         self._test_base_url_helper(expected, self.filters)
 
+    def test_base_url_catalog_indexed(self):
+        filters = {
+            'service': 'compute',
+            'endpoint_type': 'publicURL',
+            'region': 'FakeRegion'
+        }
+        self.patchobject(self.auth_provider, 'is_expired', return_value=False)
+        find = self.patchobject(self.auth_provider, '_find_base_url',
+                                wraps=self.auth_provider._find_base_url)
+        expected = self._get_result_url_from_endpoint(
+            self._endpoints[0]['endpoints'][1])
+        self._test_base_url_helper(expected, filters)
+        self._test_base_url_helper(expected, filters)
+        self.assertEqual(1, find.call_count)
+        # URL filters are applied to the indexed endpoint on every lookup
+        filters['skip_path'] = True
+        self._test_base_url_helper(
+            auth.apply_url_filters(expected, filters), filters)
+        self.assertEqual(1, find.call_count)
+        # Other endpoints are searched once each
+        filters['region'] = 'AintNoBodyKnowThisRegion'
+        self.auth_provider.base_url(filters)
+        self.assertEqual(2, find.call_count)
+
+    def test_base_url_catalog_index_reset(self):
+        filters = {'service': 'compute', 'region': 'FakeRegion'}
+        self.patchobject(self.auth_provider, 'is_expired', return_value=False)
+        find = self.patchobject(self.auth_provider, '_find_base_url',
+                                wraps=self.auth_provider._find_base_url)
+        self.auth_provider.base_url(filters)
+        self.auth_provider.set_auth()
+        self.auth_provider.base_url(filters)
+        self.assertEqual(2, find.call_count)
+        self.auth_provider.clear_auth()
+        self.auth_provider.base_url(filters)
+        self.assertEqual(3, find.call_count)
+
+    def test_base_url_catalog_index_per_auth_data(self):
+        filters = {'service': 'compute', 'region': 'FakeRegion'}
+        self.patchobject(self.auth_provider, 'is_expired', return_value=False)
+        find = self.patchobject(self.auth_provider, '_find_base_url',
+                                wraps=self.auth_provider._find_base_url)
+        alt_auth_data = ('token', copy.deepcopy(self._get_fake_identity()))
+        url = self.auth_provider.base_url(filters)
+        self.assertEqual(
+            url, self.auth_provider.base_url(filters, auth_data=alt_auth_data))
+        # The index built for other auth data is not used for the provider
+        # own token
+        self.assertEqual(url, self.auth_provider.base_url(filters))
+        self.assertEqual(3, find.call_count)
+
     def test_base_url_with_unversioned_endpoint(self):
         auth_data = {
             'serviceCatalog': [
@@ -508,6 +563,65 @@ class TestKeystoneV2AuthProvider(BaseAuthTestsSetUp):
         expected = 'http://fake_url/some_path/v2.0'
         self._test_base_url_helper(expected, filters, ('token', auth_data))
 
+    def _enable_token_cache(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.addCleanup(token_cache.disable)
+        token_cache.enable(directory)
+        return self.patchobject(
+            self._auth_provider_class, '_request_token', autospec=True,
+            side_effect=self._auth_provider_class._request_token)
+
+    def _new_auth_provider(self):
+        return self._auth(self.credentials.__class__(),
+                          fake_identity.FAKE_AUTH_URL)
+
+    def test_token_cache_shared(self):
+        request_token = self._enable_token_cache()
+        self.patchobject(self._auth_provider_class, 'is_expired',
+                         return_value=False)
+        token = self.auth_provider.get_token()
+        self.assertEqual(token, self._new_auth_provider().get_token())
+        self.assertEqual(1, request_token.call_count)
+
+    def test_token_cache_expired(self):
+        request_token = self._enable_token_cache()
+        # The fake tokens are expired
+        self.auth_provider.get_token()
+        self._new_auth_provider().get_token()
+        self.assertEqual(2, request_token.call_count)
+
+    def test_token_cache_set_auth(self):
+        request_token = self._enable_token_cache()
+        self.patchobject(self._auth_provider_class, 'is_expired',
+                         return_value=False)
+        self.auth_provider.get_token()
+        # A new token is requested, and shared with the other providers
+        self.auth_provider.set_auth()
+        self._new_auth_provider().get_token()
+        self.assertEqual(2, request_token.call_count)
+
+    def test_renew_auth(self):
+        set_auth = self.patchobject(self.auth_provider, 'set_auth')
+        self.auth_provider.renew_auth(None)
+        self.auth_provider.cache = ('token', {})
+        # Already replaced
+        self.auth_provider.renew_auth(('old token', {}))
+        self.assertEqual(1, set_auth.call_count)
+
+    def test_get_auth_token_refresher(self):
+        self.addCleanup(token_refresher.disable)
+        refresher = token_refresher.enable(30, interval=3600)
+        touch = self.patchobject(refresher, 'touch')
+        self.auth_provider.get_auth()
+        touch.assert_called_once_with(self.auth_provider)
+
+    def test_get_expiry(self):
+        self.assertEqual(
+            datetime.datetime(2020, 1, 1, 0, 0, 10),
+            self.auth_provider.get_expiry(self.auth_provider.auth_data
+                                          ).replace(microsecond=0))
+
     def test_token_not_expired(self):
         expiry_data = datetime.datetime.utcnow() + datetime.timedelta(days=1)
         self._verify_expiry(expiry_data=expiry_data, should_be_expired=False)
@@ -12,6 +12,7 @@
 # License for the specific language governing permissions and limitations under
 # the License.
 
+from oslo_config import cfg
 import testtools
 
 from tempest import config
@@ -25,7 +26,9 @@ class TestServiceClientConfig(base.TestCase):
     expected_common_params = set(['disable_ssl_certificate_validation',
                                   'ca_certs', 'trace_requests'])
     expected_extra_params = set(['service', 'endpoint_type', 'region',
-                                 'build_timeout', 'build_interval'])
+                                 'build_timeout', 'build_interval',
+                                 'http_keep_alive', 'http_pool_maxsize',
+                                 'http_shared_pool', 'retry_policy'])
 
     def setUp(self):
         super(TestServiceClientConfig, self).setUp()
@@ -82,6 +85,34 @@ class TestServiceClientConfig(base.TestCase):
         self.assertEqual(self.CONF.compute.build_interval,
                          params['build_interval'])
 
+    def test_service_client_config_retry_policy(self):
+        params = config.service_client_config(
+            service_client_name='fake-service1')
+        self.assertIsNone(params['retry_policy'])
+        # The overrides are reset by ServiceClientsConfigFixture
+        cfg.CONF.set_override('http_retries', 4, 'service-clients')
+        cfg.CONF.set_override('http_retry_status_codes', [503],
+                              'service-clients')
+        policy = config.service_client_config(
+            service_client_name='fake-service1')['retry_policy']
+        self.assertEqual(4, policy.max_retries)
+        self.assertEqual(frozenset([503]), policy.status_codes)
+        self.assertNotIn('POST', policy.methods)
+
+    def test_polling_policy(self):
+        policy = config._polling_policy(self.CONF.service_clients)
+        self.assertEqual(5, policy.get_delay(1, 5))
+        self.assertEqual(5, policy.get_delay(10, 5))
+        self.assertFalse(policy.deadline_aware)
+        cfg.CONF.set_override('poll_initial_interval', 0.5,
+                              'service-clients')
+        cfg.CONF.set_override('poll_backoff', 2, 'service-clients')
+        cfg.CONF.set_override('poll_max_interval', 10, 'service-clients')
+        policy = config._polling_policy(self.CONF.service_clients)
+        self.assertEqual(0.5, policy.initial_interval)
+        self.assertEqual(2, policy.backoff)
+        self.assertEqual(10, policy.max_interval)
+
     def test_service_client_config_service_unknown(self):
         unknown_service = 'unknown_service'
         with testtools.ExpectedException(exceptions.UnknownServiceClient,
@@ -13,16 +13,22 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
 import os
 import sys
+import threading
 from unittest import mock
 
 from oslo_config import cfg
 import testtools
 
 from tempest import clients
+from tempest.common import waiters
 from tempest import config
+from tempest.lib.common import request_log
+from tempest.lib.common.utils import test_utils
 from tempest.lib.common import validation_resources as vr
+from tempest.lib.common import waiter_timeline
 from tempest.lib import exceptions as lib_exc
 from tempest import test
 from tempest.tests import base
@@ -273,6 +279,154 @@ class TestTempestBaseTestClass(base.TestCase):
         # Cleanup stack is empty
         self.assertEqual(0, len(test_cleanups._class_cleanups))
 
+    def test_test_caller_published(self):
+        cfg.CONF.set_default('neutron', False, 'service_available')
+        callers = []
+
+        def _record_caller():
+            callers.append(test_utils.find_test_caller())
+
+        class TestCaller(self.parent_test):
+
+            @classmethod
+            def resource_setup(cls):
+                _record_caller()
+                cls.addClassResourceCleanup(_record_caller)
+
+            def runTest(self):
+                self.addCleanup(_record_caller)
+                _record_caller()
+
+        with mock.patch.object(test_utils.inspect, 'currentframe',
+                               side_effect=AssertionError):
+            suite = unittest.TestSuite((TestCaller(),))
+            log = []
+            suite.run(LoggingTestResult(log))
+        self.assertFalse(log)
+        self.assertEqual(['TestCaller:setUpClass', 'TestCaller:runTest',
+                          'TestCaller:runTest', 'TestCaller:tearDownClass'],
+                         callers)
+        # Nothing is left published once the class is done
+        self.assertIsNone(test_utils._test_caller.get())
+
+    def _run_with_request(self, fail):
+        cfg.CONF.set_default('neutron', False, 'service_available')
+        cfg.CONF.set_default('deferred_request_logging', True, 'debug')
+        client = mock.Mock()
+        client._format_request_full.return_value = 'fake details'
+
+        class TestRequest(self.parent_test):
+
+            def runTest(self):
+                request_log.get_buffer().append(
+                    client, 'TestRequest:runTest', 'GET', 'fake_url',
+                    {'status': '500' if fail else '200'})
+                if fail:
+                    raise Exception('fake failure')
+
+        log = []
+        unittest.TestSuite((TestRequest(),)).run(LoggingTestResult(log))
+        self.assertIsNone(request_log.get_buffer())
+        return client, log
+
+    def test_request_log_attached_on_failure(self):
+        client, log = self._run_with_request(fail=True)
+        self.assertEqual(1, len(log))
+        details = log[0][2]
+        self.assertIn('TestRequest:runTest): 500 GET fake_url',
+                      details['request-log'].as_text())
+        self.assertIn('fake details', details['request-log'].as_text())
+        client.LOG.debug.assert_called_once_with('%s', 'fake details',
+                                                 extra=None)
+
+    def test_request_log_not_logged_on_success(self):
+        client, log = self._run_with_request(fail=False)
+        self.assertFalse(log)
+        client.LOG.debug.assert_not_called()
+
+    def test_request_log_flushed_on_teardown_failure(self):
+        cfg.CONF.set_default('neutron', False, 'service_available')
+        cfg.CONF.set_default('deferred_request_logging', True, 'debug')
+        client = mock.Mock()
+        client._format_request_full.return_value = 'fake details'
+
+        class TestTeardown(self.parent_test):
+
+            @classmethod
+            def resource_cleanup(cls):
+                super(TestTeardown, cls).resource_cleanup()
+                request_log.get_buffer().append(
+                    client, 'TestTeardown:tearDownClass', 'DELETE',
+                    'fake_url', {'status': '404'})
+                # Logged as info rather than exception by tearDownClass
+                raise AttributeError('fake_resources')
+
+        unittest.TestSuite((TestTeardown(),)).run(LoggingTestResult([]))
+        client.LOG.debug.assert_called_once_with('%s', 'fake details',
+                                                 extra=None)
+
+    def test_waiter_timeline_attached(self):
+        cfg.CONF.set_default('neutron', False, 'service_available')
+        waiter_timeline.enable()
+        self.addCleanup(waiter_timeline.disable)
+
+        @waiter_timeline.recorded
+        def _wait(resource_id):
+            waiter_timeline.observe('server', resource_id, 'ACTIVE')
+
+        class TestTimeline(self.parent_test):
+
+            def runTest(self):
+                self.addCleanup(_wait, 'cleanup_id')
+                _wait('test_id')
+                raise Exception('fake failure')
+
+        # Recorded outside of the test
+        _wait('other_id')
+        log = []
+        unittest.TestSuite((TestTimeline(),)).run(LoggingTestResult(log))
+        details = log[0][2]
+        recorded = json.loads(b''.join(
+            details['waiter-timeline'].iter_bytes()).decode('utf-8'))
+        self.assertEqual(['test_id', 'cleanup_id'],
+                         [timeline['resource_id'] for timeline in recorded])
+        self.assertEqual('TestTimeline:runTest', recorded[0]['caller'])
+
+    def test_background_waiters_joined(self):
+        cfg.CONF.set_default('neutron', False, 'service_available')
+        release = threading.Event()
+        timer = threading.Timer(0.1, release.set)
+        self.addCleanup(timer.cancel)
+        fs = []
+
+        class TestWaiters(self.parent_test):
+
+            def runTest(self):
+                fs.append(waiters.submit(release.wait, 5))
+                timer.start()
+                raise Exception('fake failure')
+
+        unittest.TestSuite((TestWaiters(),)).run(LoggingTestResult([]))
+        self.assertTrue(fs[0].done())
+        self.assertNotIn('TestWaiters:runTest', waiters._async['futures'])
+
+    def test_background_waiters_join_bounded(self):
+        cfg.CONF.set_default('neutron', False, 'service_available')
+        cfg.CONF.set_default('build_interval', 0, 'compute')
+        release = threading.Event()
+        self.addCleanup(release.set)
+        fs = []
+
+        class TestWaiters(self.parent_test):
+
+            def runTest(self):
+                fs.append(waiters.submit(release.wait, 60))
+                raise Exception('fake failure')
+
+        unittest.TestSuite((TestWaiters(),)).run(LoggingTestResult([]))
+        # The teardown did not wait for the waiter to complete
+        self.assertFalse(fs[0].done())
+
     def test_resource_cleanup_failures(self):
         cfg.CONF.set_default('neutron', False, 'service_available')
         exp_args = (1, 2,)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Micro-benchmark of the allocation of pre-provisioned accounts
+
+Compares the latency of allocating and releasing accounts from concurrent
+worker processes with the atomic lock files per account used by
+`PreProvisionedCredentialProvider`, and with the global external lock it
+used before, re-implemented here.
+
+Usage::
+
+    python tools/benchmark_account_allocation.py --workers 32 --accounts 256
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+from oslo_concurrency import lockutils
+import yaml
+
+from tempest.lib.common import preprov_creds
+
+
+class GlobalLockProvider(preprov_creds.PreProvisionedCredentialProvider):
+    """Allocation of the accounts under a single global external lock"""
+
+    def _create_hash_file(self, hash_string):
+        path = os.path.join(self.accounts_dir, hash_string)
+        if not os.path.isfile(path):
+            with open(path, 'w') as fd:
+                fd.write(self.name)
+            return True
+        return False
+
+    @lockutils.synchronized('test_accounts_io', external=True)
+    def _get_free_hash(self, hashes):
+        hashes = list(hashes)
+        if not os.path.isdir(self.accounts_dir):
+            os.mkdir(self.accounts_dir)
+        for _hash in hashes:
+            if self._create_hash_file(_hash):
+                return _hash
+        raise Exception('No free account')
+
+    @lockutils.synchronized('test_accounts_io', external=True)
+    def remove_hash(self, hash_string):
+        os.remove(os.path.join(self.accounts_dir, hash_string))
+
+
+PROVIDERS = {
+    'global lock': GlobalLockProvider,
+    'lock per account': preprov_creds.PreProvisionedCredentialProvider,
+}
+
+
+def _worker(args):
+    provider_name, accounts_file, lock_dir, allocations = args
+    lockutils.set_defaults(lock_dir)
+    provider = PROVIDERS[provider_name](
+        identity_version='v3', test_accounts_file=accounts_file,
+        accounts_lock_dir=os.path.join(lock_dir, 'test_accounts'),
+        name='worker-%d' % os.getpid(), admin_role='admin')
+    hashes = list(provider.hash_dict['creds'])
+    latencies = []
+    for _ in range(allocations):
+        start = time.time()
+        allocated = provider._get_free_hash(hashes)
+        latencies.append(time.time() - start)
+        provider.remove_hash(allocated)
+    return latencies
+
+
+def _percentile(values, percent):
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=32,
+                        help='Number of concurrent worker processes')
+    parser.add_argument('--accounts', type=int, default=256,
+                        help='Number of accounts in the accounts file')
+    parser.add_argument('--allocations', type=int, default=200,
+                        help='Number of allocations per worker')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        accounts_file = os.path.join(work_dir, 'accounts.yaml')
+        with open(accounts_file, 'w') as fd:
+            yaml.safe_dump([{'username': 'user-%d' % i,
+                             'project_name': 'project-%d' % i,
+                             'password': 'password'}
+                            for i in range(args.accounts)], fd)
+        for name in PROVIDERS:
+            lock_dir = tempfile.mkdtemp(dir=work_dir)
+            pool = multiprocessing.Pool(args.workers)
+            try:
+                results = pool.map(
+                    _worker, [(name, accounts_file, lock_dir,
+                               args.allocations)] * args.workers)
+            finally:
+                pool.close()
+                pool.join()
+            latencies = sorted(sum(results, []))
+            print('%-17s median %8.1f us, p99 %8.1f us, max %8.1f us' % (
+                name, _percentile(latencies, 50) * 1e6,
+                _percentile(latencies, 99) * 1e6, latencies[-1] * 1e6))
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+
+# Copyright 2020 OpenStack Foundation
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Micro-benchmark of the JSON schema validation of API responses
+
+Compares validating response bodies with `jsonschema.validate`, which checks
+the schema and builds a new validator on every call, with the cached
+validators used by `RestClient.validate_response`.
+
+Usage::
+
+    python tools/benchmark_schema_validation.py --flavors 1 --number 2000
+"""
+
+import argparse
+import timeit
+
+import jsonschema
+
+from tempest.lib.api_schema.response.compute.v2_1 import flavors
+from tempest.lib.common import jsonschema_validator
+
+
+def _flavor(index):
+    return {
+        'id': str(index),
+        'name': 'flavor-%d' % index,
+        'links': [{'href': 'http://compute/flavors/%d' % index,
+                   'rel': 'self'}],
+        'ram': 512,
+        'vcpus': 1,
+        'swap': '',
+        'disk': 1,
+        'OS-FLV-DISABLED:disabled': False,
+        'os-flavor-access:is_public': True,
+        'rxtx_factor': 1.0,
+        'OS-FLV-EXT-DATA:ephemeral': 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--flavors', type=int, default=1,
+                        help='Number of flavors in the response body')
+    parser.add_argument('--number', type=int, default=2000,
+                        help='Number of validations per measurement')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Number of measurements, the best is reported')
+    args = parser.parse_args()
+
+    schema = flavors.list_flavors_details['response_body']
+    body = {'flavors': [_flavor(i) for i in range(args.flavors)]}
+
+    def uncached():
+        jsonschema.validate(body, schema,
+                            cls=jsonschema_validator.JSONSCHEMA_VALIDATOR,
+                            format_checker=jsonschema_validator.FORMAT_CHECKER)
+
+    def cached():
+        jsonschema_validator.validate(body, schema)
+
+    results = {}
+    for name, func in [('jsonschema.validate', uncached),
+                       ('cached validator', cached)]:
+        best = min(timeit.repeat(func, number=args.number,
+                                 repeat=args.repeat))
+        results[name] = best
+        print('%-20s %8.1f us per validation' % (
+            name, best / args.number * 1e6))
+    print('speedup: %.1fx' % (results['jsonschema.validate'] /
+                              results['cached validator']))
+
+
+if __name__ == '__main__':
+    main()